@@ -1,11 +1,67 @@
 """Flask app for the Citation Hallucination Game."""
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, Response, g, render_template, request, jsonify, redirect, url_for, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from datetime import datetime, timedelta, timezone
+import gc
+import hmac
+import json
+import os
+import threading
+import time
 import database as db
 import game_state as gs
+import metrics
+import profiler
+
+
+class RecordJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, serializing game_state's brief records through to_json()."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, gs.Record):
+            return o.to_json()
+        return DefaultJSONProvider.default(o)
+
 
 app = Flask(__name__)
+app.json = RecordJSONProvider(app)
+
+# Phase stream tuning: streams end after STREAM_MAX_SECONDS (EventSource
+# reconnects on its own) and send a keepalive/recheck every STREAM_KEEPALIVE_SECONDS.
+# Streams beyond MAX_PHASE_STREAMS per process get a 503 and the client polls instead.
+STREAM_MAX_SECONDS = 300
+STREAM_KEEPALIVE_SECONDS = 15
+MAX_PHASE_STREAMS = 64
+_stream_slots = threading.BoundedSemaphore(MAX_PHASE_STREAMS)
+
+# Cookie carrying the session token to /api/game/stream, scoped to that path
+STREAM_COOKIE = 'stream_token'
+STREAM_COOKIE_MAX_AGE = 12 * 3600
+
+# Largest list accepted by the batch swap/flag endpoints
+MAX_BATCH_SIZE = 200
+
+# Most events returned by one /api/game/events call
+EVENTS_PAGE_SIZE = 500
+
+# /api/team/progress answers ?since= with the full lists instead of a delta
+# when more events than this have been logged since the cursor
+PROGRESS_DELTA_MAX_EVENTS = 1000
+
+
+# Per-route latency, size and SQL statement counts, served at /metrics
+request_metrics = metrics.RequestMetrics()
+
+# Bearer token that lets a scraper read /metrics without a professor session
+METRICS_TOKEN = os.environ.get('GAME_METRICS_TOKEN')
+
+
+@app.errorhandler(db.GameRevealed)
+def game_revealed(e):
+    # A swap or flag that lost the race with the reveal
+    return jsonify({'error': 'Game already revealed'}), 400
 
 
 @app.teardown_appcontext
@@ -13,6 +69,44 @@ def shutdown_db(exception=None):
     db.close_db()
 
 
+@app.before_request
+def start_request_metrics():
+    g.metrics_start = (time.perf_counter(), db.statement_count())
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('metrics_start')
+    if started is not None:
+        g.metrics_recorded = True
+        # One proxy lookup instead of one per attribute: this runs on every poll
+        req = request._get_current_object()
+        rule = req.url_rule
+        request_metrics.observe(
+            rule.rule if rule else '<unmatched>', req.method, response.status_code,
+            time.perf_counter() - started[0],
+            None if response.is_streamed else response.calculate_content_length(),
+            db.statement_count() - started[1],
+        )
+    return response
+
+
+@app.teardown_request
+def record_failed_request_metrics(exception=None):
+    # A view that raised skips after_request when exceptions propagate (debug
+    # mode, or a failing after_request hook); count it as the 500 it became
+    started = g.get('metrics_start')
+    if exception is not None and started is not None and not g.get('metrics_recorded'):
+        rule = request.url_rule
+        request_metrics.observe(rule.rule if rule else '<unmatched>', request.method, 500,
+                                time.perf_counter() - started[0], None,
+                                db.statement_count() - started[1])
+
+
+# Opt-in capture of slow requests' stacks and SQL (GAME_PROFILE_DIR)
+profiler.install(app)
+
+
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
 def get_player():
@@ -41,11 +135,87 @@ def require_professor():
     return player, None, None
 
 
+def all_text(*values):
+    """True if every value is a string, as swap and flag fields must be."""
+    return all(isinstance(v, str) for v in values)
+
+
 def timer_iso(minutes):
     """Return ISO timestamp minutes from now."""
     return (datetime.now(timezone.utc) + timedelta(minutes=minutes)).isoformat()
 
 
+def phase_payload(player, game):
+    """Phase info for a player, as returned by /api/game/phase and the phase stream."""
+    result = {'phase': game['phase'], 'timer_end': game['timer_end'], 'mode': game['mode']}
+
+    # Include team info if player is assigned
+    if player['team_id']:
+        team = db.get_team(player['team_id'])
+        if team:
+            result['team_id'] = team['team_id']
+            result['team_name'] = team['team_name']
+
+    return result
+
+
+def version_etag(game_id, *scope):
+    """ETag for a polled response: the game's version plus whatever else the payload depends on.
+
+    Returns None if the game doesn't exist.
+    """
+    version = db.get_game_version(game_id)
+    if version is None:
+        return None
+    return '.'.join([game_id, str(version), *scope])
+
+
+def not_modified(etag):
+    """Return a 304 response if the client already holds this ETag, else None."""
+    if etag and request.if_none_match.contains(etag):
+        return conditional(app.response_class(status=304), etag)
+    return None
+
+
+def conditional(response, etag):
+    """Attach ETag and revalidation headers so browsers send If-None-Match on the next poll."""
+    if etag:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.vary.update(('X-Session-Token', 'Cookie'))
+    return response
+
+
+def public_event(event):
+    """A logged game event as served by /api/game/events, without session tokens."""
+    data = event['data']
+    if 'session_token' in data:
+        data = {k: v for k, v in data.items() if k != 'session_token'}
+    return {'seq': event['seq'], 'kind': event['kind'], 'data': data, 'created_at': event['created_at']}
+
+
+def progress_delta(events, team_id):
+    """Net change to one team's swaps and flags over a run of logged events."""
+    swaps, flags = {}, {}
+    for event in events:
+        data = event['data']
+        if data.get('team_id') != team_id:
+            continue
+        if event['kind'] == 'swaps_changed':
+            for change in data['changes']:
+                swaps[change['citation_id']] = (
+                    None if change.get('unswap') else [change['hallucination_type'], change['option_id']])
+        elif event['kind'] == 'flags_set':
+            for citation_id, verdict in data['flags']:
+                flags[citation_id] = verdict
+    return {'swaps': swaps, 'flags': flags}
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 # ── Page Routes ──────────────────────────────────────────────────────────────
 
 @app.route('/')
@@ -235,7 +405,7 @@ def api_reveal():
     if not game:
         return jsonify({'error': 'Game not found'}), 404
 
-    db.set_game_phase(game['game_id'], 'reveal')
+    reveal_game(game['game_id'])
     return jsonify({'ok': True, 'phase': 'reveal'})
 
 
@@ -261,31 +431,18 @@ def api_game_status():
     if err:
         return err, code
 
+    etag = version_etag(player['game_id'])
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     game = db.get_game(player['game_id'])
     if not game:
         return jsonify({'error': 'Game not found'}), 404
 
-    teams = db.get_teams(game['game_id'])
-    players = db.get_players(game['game_id'])
-
-    teams_data = []
-    for team in teams:
-        team_players = [p for p in players if p['team_id'] == team['team_id']]
-        swaps = db.get_swaps(game['game_id'], team['team_id'])
-        flags = db.get_flags(game['game_id'], team['team_id'])
-        teams_data.append({
-            'team_id': team['team_id'],
-            'team_name': team['team_name'],
-            'fabrication_team': team['fabrication_team'],
-            'players': [{'player_id': p['player_id'], 'player_name': p['player_name']} for p in team_players],
-            'swap_count': len(swaps),
-            'flag_count': len([f for f in flags if f['verdict'] == 'fake'])
-        })
-
-    unassigned = [{'player_id': p['player_id'], 'player_name': p['player_name']}
-                  for p in players if not p['team_id'] and not p['is_professor']]
+    teams_data, unassigned = db.get_status_summary(game['game_id'])
 
-    return jsonify({
+    return conditional(jsonify({
         'game_id': game['game_id'],
         'game_code': game['game_code'],
         'phase': game['phase'],
@@ -293,7 +450,110 @@ def api_game_status():
         'brief_id': game['brief_id'],
         'teams': teams_data,
         'unassigned_players': unassigned
-    })
+    }), etag)
+
+
+@app.route('/api/game/events')
+def api_game_events():
+    """Events logged for the player's game after seq ``since``, oldest first.
+
+    The professor can read the log at any time; players only once results are
+    revealed, since it records every team's swaps and flags. Returns at most
+    EVENTS_PAGE_SIZE events with ``more`` set if there are others, and the
+    seq to pass as ``since`` next time. A ``since`` beyond the end of the log
+    (which was rebuilt, e.g. by a migration or a restore) is answered from
+    the start with ``reset`` set, so the client starts over.
+    """
+    player, err, code = require_player()
+    if err:
+        return err, code
+
+    try:
+        since = int(request.args.get('since', 0))
+    except ValueError:
+        return jsonify({'error': 'since must be an integer'}), 400
+
+    etag = version_etag(player['game_id'], 'events', str(since), str(player['is_professor']))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    game = db.get_game(player['game_id'])
+    if not game:
+        return jsonify({'error': 'Game not found'}), 404
+    if not player['is_professor'] and game['phase'] != 'reveal':
+        return jsonify({'error': 'Events are available after the reveal'}), 403
+
+    events = db.get_game_events(game['game_id'], since, EVENTS_PAGE_SIZE + 1)
+    reset = not events and since > db.get_game_event_seq(game['game_id'])
+    if reset:
+        since = 0
+        events = db.get_game_events(game['game_id'], since, EVENTS_PAGE_SIZE + 1)
+    more = len(events) > EVENTS_PAGE_SIZE
+    events = events[:EVENTS_PAGE_SIZE]
+
+    return conditional(jsonify({
+        'events': [public_event(e) for e in events],
+        'seq': events[-1]['seq'] if events else since,
+        'more': more,
+        'reset': reset,
+    }), etag)
+
+
+@app.route('/api/game/cache-stats')
+def api_cache_stats():
+    """Loaded-brief, rendered-brief and session-token cache counters, for checking hit rates during a game."""
+    player, err, code = require_professor()
+    if err:
+        return err, code
+
+    return jsonify({'brief_cache': gs.brief_cache_stats(), 'render_cache': gs.render_cache_stats(),
+                    'token_cache': db.token_cache_stats()})
+
+
+@app.route('/api/game/write-stats')
+def api_write_stats():
+    """Write-behind queue depth and group-commit latency."""
+    player, err, code = require_professor()
+    if err:
+        return err, code
+
+    return jsonify(db.write_stats())
+
+
+@app.route('/api/game/pool-stats')
+def api_pool_stats():
+    """Database connection pool occupancy and wait counters."""
+    player, err, code = require_professor()
+    if err:
+        return err, code
+
+    return jsonify(db.pool_stats())
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Per-route request metrics plus pool, write-behind and cache counters, in Prometheus text format.
+
+    Open to professors, and to scrapers sending ``Authorization: Bearer
+    <GAME_METRICS_TOKEN>`` when that is set. The client address is not
+    trusted: behind a reverse proxy every request comes from localhost.
+    """
+    bearer = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not (METRICS_TOKEN and hmac.compare_digest(bearer.encode(), METRICS_TOKEN.encode())):
+        player, err, code = require_professor()
+        if err:
+            return err, code
+
+    body = ''.join([
+        request_metrics.render(),
+        metrics.render_stats('db_pool', db.pool_stats(), 'Database connection pool'),
+        metrics.render_stats('db_write_behind', db.write_stats(), 'Write-behind queue'),
+        metrics.render_stats('brief_cache', gs.brief_cache_stats(), 'Loaded-brief cache'),
+        metrics.render_stats('render_cache', gs.render_cache_stats(), 'Rendered-brief cache'),
+        metrics.render_stats('token_cache', db.token_cache_stats(), 'Session-token cache'),
+    ])
+    return Response(body, mimetype='text/plain; version=0.0.4')
 
 
 # ── Solitaire API ────────────────────────────────────────────────────────
@@ -356,7 +616,7 @@ def api_solitaire_reveal():
     if game['phase'] != 'verification':
         return jsonify({'error': 'Game not in verification phase'}), 400
 
-    db.set_game_phase(game['game_id'], 'reveal')
+    reveal_game(game['game_id'])
     return jsonify({'ok': True, 'phase': 'reveal'})
 
 
@@ -426,20 +686,93 @@ def api_phase():
                 return jsonify({'phase': game['phase'], 'timer_end': game['timer_end']})
         return jsonify({'error': 'Not authenticated'}), 401
 
+    etag = version_etag(player['game_id'], player['player_id'])
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     game = db.get_game(player['game_id'])
     if not game:
         return jsonify({'error': 'Game not found'}), 404
 
-    result = {'phase': game['phase'], 'timer_end': game['timer_end'], 'mode': game['mode']}
+    return conditional(jsonify(phase_payload(player, game)), etag)
 
-    # Include team info if player is assigned
-    if player['team_id']:
-        team = db.get_team(player['team_id'])
-        if team:
-            result['team_id'] = team['team_id']
-            result['team_name'] = team['team_name']
 
-    return jsonify(result)
+@app.route('/api/game/stream-auth', methods=['POST'])
+def api_stream_auth():
+    """Set the cookie that authenticates /api/game/stream.
+
+    The cookie is only sent to the stream's path, so the session token never
+    appears in a URL (and so in access logs), and other routes never see it.
+    """
+    player, err, code = require_player()
+    if err:
+        return err, code
+    response = jsonify({'ok': True})
+    response.set_cookie(STREAM_COOKIE, player['session_token'], max_age=STREAM_COOKIE_MAX_AGE,
+                        path='/api/game/stream', secure=request.is_secure, httponly=True, samesite='Strict')
+    return response
+
+
+@app.route('/api/game/stream')
+def api_phase_stream():
+    """Push phase, timer and team changes as Server-Sent Events.
+
+    EventSource cannot send headers, so the stream authenticates with the
+    cookie set by /api/game/stream-auth. Emits ``phase`` (same payload as
+    /api/game/phase) whenever it changes and ``roster`` whenever team
+    membership or phase changes, so the lobby knows to refresh its team list.
+    """
+    token = request.cookies.get(STREAM_COOKIE)
+    player = get_player() or (db.get_player_by_token(token) if token else None)
+    if not player:
+        return jsonify({'error': 'Not authenticated'}), 401
+
+    game = db.get_game(player['game_id'])
+    if not game:
+        return jsonify({'error': 'Game not found'}), 404
+
+    if not _stream_slots.acquire(blocking=False):
+        return jsonify({'error': 'Too many open streams, poll /api/game/phase instead'}), 503
+
+    game_id = game['game_id']
+    player_token = player['session_token']
+
+    def generate():
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        counter = db.get_game_change_counter(game_id)
+        last_payload = None
+        yield "retry: 3000\n\n"
+        while True:
+            # Re-read on every wake: the player's team may have changed, and
+            # on timeout this also catches changes made by other worker processes.
+            current_player = db.get_player_by_token(player_token)
+            current_game = db.get_game(game_id)
+            if not current_player or not current_game:
+                return
+            payload = phase_payload(current_player, current_game)
+            if payload != last_payload:
+                yield sse_event('phase', payload)
+                last_payload = payload
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            # Don't hold a pooled connection while idle
+            db.close_db()
+            new_counter = db.wait_for_game_change(
+                game_id, counter, min(STREAM_KEEPALIVE_SECONDS, remaining))
+            if new_counter != counter:
+                yield sse_event('roster', {})
+            else:
+                yield ": keepalive\n\n"
+            counter = new_counter
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Runs when the server closes the response, even if the client left before the first event
+    response.call_on_close(_stream_slots.release)
+    return response
 
 
 @app.route('/api/brief')
@@ -521,6 +854,8 @@ def api_citation_swap():
 
     if not all([citation_id, hallucination_type, option_id]):
         return jsonify({'error': 'Missing required fields'}), 400
+    if not all_text(citation_id, hallucination_type, option_id):
+        return jsonify({'error': 'Fields must be strings'}), 400
 
     db.upsert_swap(game['game_id'], player['team_id'], citation_id, hallucination_type, option_id)
     return jsonify({'ok': True})
@@ -541,6 +876,8 @@ def api_citation_unswap():
     citation_id = data.get('citation_id')
     if not citation_id:
         return jsonify({'error': 'Missing citation_id'}), 400
+    if not all_text(citation_id):
+        return jsonify({'error': 'Fields must be strings'}), 400
 
     db.delete_swap(game['game_id'], player['team_id'], citation_id)
     return jsonify({'ok': True})
@@ -561,38 +898,140 @@ def api_citation_flag():
     citation_id = data.get('citation_id')
     verdict = data.get('verdict')
 
-    if not citation_id or verdict not in ('legit', 'fake'):
+    if not citation_id or not all_text(citation_id) or verdict not in ('legit', 'fake'):
         return jsonify({'error': 'Invalid citation_id or verdict'}), 400
 
     db.upsert_flag(game['game_id'], player['team_id'], citation_id, verdict)
     return jsonify({'ok': True})
 
 
+@app.route('/api/citation/swaps/batch', methods=['POST'])
+def api_citation_swaps_batch():
+    """Apply several swaps/unswaps at once (Phase 1).
+
+    Body: {"changes": [{citation_id, hallucination_type, option_id} or {citation_id, unswap: true}, ...]}.
+    The whole batch is rejected if any change is invalid.
+    """
+    player, err, code = require_player()
+    if err:
+        return err, code
+
+    game = db.get_game(player['game_id'])
+    if not game or game['phase'] != 'fabrication':
+        return jsonify({'error': 'Not in fabrication phase'}), 400
+    if not player['team_id']:
+        return jsonify({'error': 'Not on a team'}), 400
+
+    changes = (request.json or {}).get('changes')
+    if not isinstance(changes, list) or not changes or len(changes) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'changes must be a list of 1-{MAX_BATCH_SIZE} items'}), 400
+    for change in changes:
+        if not isinstance(change, dict) or not change.get('citation_id'):
+            return jsonify({'error': 'Missing citation_id'}), 400
+        if not change.get('unswap') and not (change.get('hallucination_type') and change.get('option_id')):
+            return jsonify({'error': 'Missing required fields'}), 400
+        fields = (change['citation_id'],) if change.get('unswap') else (
+            change['citation_id'], change['hallucination_type'], change['option_id'])
+        if not all_text(*fields):
+            return jsonify({'error': 'Fields must be strings'}), 400
+
+    db.apply_swap_changes(game['game_id'], player['team_id'], changes)
+    return jsonify({'ok': True, 'applied': len(changes)})
+
+
+@app.route('/api/citation/flags/batch', methods=['POST'])
+def api_citation_flags_batch():
+    """Flag several citations at once (Phase 2).
+
+    Body: {"flags": [{citation_id, verdict}, ...]}. The whole batch is rejected
+    if any flag is invalid.
+    """
+    player, err, code = require_player()
+    if err:
+        return err, code
+
+    game = db.get_game(player['game_id'])
+    if not game or game['phase'] != 'verification':
+        return jsonify({'error': 'Not in verification phase'}), 400
+    if not player['team_id']:
+        return jsonify({'error': 'Not on a team'}), 400
+
+    flags = (request.json or {}).get('flags')
+    if not isinstance(flags, list) or not flags or len(flags) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'flags must be a list of 1-{MAX_BATCH_SIZE} items'}), 400
+    for flag in flags:
+        if (not isinstance(flag, dict) or not flag.get('citation_id') or not all_text(flag['citation_id'])
+                or flag.get('verdict') not in ('legit', 'fake')):
+            return jsonify({'error': 'Invalid citation_id or verdict'}), 400
+
+    db.upsert_flags(game['game_id'], player['team_id'],
+                    [(f['citation_id'], f['verdict']) for f in flags])
+    return jsonify({'ok': True, 'applied': len(flags)})
+
+
 @app.route('/api/team/progress')
 def api_team_progress():
-    """Get team's current swap/flag count."""
+    """Get team's current swaps and flags, in full or as a delta.
+
+    Every response carries ``seq``, the game's event-log position it reflects.
+    Passing it back as ``since`` returns ``delta`` instead of the lists:
+    ``swaps`` maps citation_id to [hallucination_type, option_id], or null if
+    the swap was removed, and ``flags`` maps citation_id to verdict, each for
+    citations changed after ``since``. A reset, a large gap since the cursor,
+    or a cursor beyond the end of the log (rebuilt by a migration or a
+    restore) gets the full response again.
+    """
     player, err, code = require_player()
     if err:
         return err, code
 
+    if not player['team_id']:
+        return jsonify({'error': 'Not on a team'}), 400
+
+    since = request.args.get('since')
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({'error': 'since must be an integer'}), 400
+
+    scope = (player['team_id'],) if since is None else (player['team_id'], 'since', str(since))
+    etag = version_etag(player['game_id'], *scope)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     game = db.get_game(player['game_id'])
     if not game:
         return jsonify({'error': 'Game not found'}), 404
 
-    if not player['team_id']:
-        return jsonify({'error': 'Not on a team'}), 400
-
+    if since is not None:
+        events = db.get_game_events(game['game_id'], since, PROGRESS_DELTA_MAX_EVENTS + 1)
+        ahead = not events and since > db.get_game_event_seq(game['game_id'])
+        if (not ahead and len(events) <= PROGRESS_DELTA_MAX_EVENTS
+                and not any(e['kind'] == 'game_reset' for e in events)):
+            return conditional(jsonify({
+                'seq': events[-1]['seq'] if events else since,
+                'delta': progress_delta(events, player['team_id']),
+            }), etag)
+
+    # Read the cursor first. Every event up to it is already in the lists
+    # (the memory engine takes it from its store, not the log, which may lag),
+    # and a write landing in between shows up in both the lists and the next
+    # delta; applying it twice is harmless
+    seq = db.get_game_event_seq(game['game_id'])
     swaps = db.get_swaps(game['game_id'], player['team_id'])
     flags = db.get_flags(game['game_id'], player['team_id'])
 
-    return jsonify({
+    return conditional(jsonify({
+        'seq': seq,
         'swap_count': len(swaps),
         'flag_count': len([f for f in flags if f['verdict'] == 'fake']),
         'review_count': len(flags),
         'swaps': [{'citation_id': s['citation_id'], 'hallucination_type': s['hallucination_type'],
                     'option_id': s['option_id']} for s in swaps],
         'flags': [{'citation_id': f['citation_id'], 'verdict': f['verdict']} for f in flags]
-    })
+    }), etag)
 
 
 @app.route('/api/game/review-brief')
@@ -618,67 +1057,16 @@ def api_review_brief():
     if not fab_team_id:
         return jsonify({'error': 'fab_team_id is required'}), 400
 
+    if phase == 'reveal':
+        snapshot = db.get_reveal_snapshot(game['game_id'], f'review:{fab_team_id}')
+        if snapshot:
+            return json_body(snapshot)
+
     fab_team = db.get_team(fab_team_id)
     if not fab_team or fab_team['game_id'] != game['game_id']:
         return jsonify({'error': 'Team not found'}), 404
 
-    brief_id = game['brief_id']
-
-    # Load this team's swaps
-    fab_swaps = db.get_swaps(game['game_id'], fab_team_id)
-    swap_dicts = [{'citation_id': s['citation_id'], 'hallucination_type': s['hallucination_type'],
-                   'option_id': s['option_id']} for s in fab_swaps]
-
-    # Get the modified brief
-    brief = gs.get_brief_for_display(brief_id, swaps=swap_dicts)
-
-    # Build annotations keyed by citation_id
-    hallucinations = gs.load_hallucinations(brief_id)
-    annotations = {}
-    for swap in swap_dicts:
-        cid = swap['citation_id']
-        htype = swap['hallucination_type']
-        oid = swap['option_id']
-        cite_data = hallucinations.get(cid, {})
-        option = None
-        for opt in cite_data.get('options', {}).get(htype, []):
-            if opt['id'] == oid:
-                option = opt
-                break
-        if option:
-            annotations[cid] = {
-                'hallucination_type': htype,
-                'option_label': option.get('label', ''),
-                'original_text': option.get('original_text', ''),
-                'replacement_text': option.get('replacement_text', ''),
-                'replacement_citation': option.get('replacement_citation', ''),
-                'original_display': cite_data.get('original_display', ''),
-            }
-
-    # During reveal, include verifier verdicts
-    ver_team_name = None
-    if phase == 'reveal':
-        teams = db.get_teams(game['game_id'])
-        for team in teams:
-            if team['fabrication_team'] == fab_team_id:
-                # This team verified the fab_team's work
-                ver_flags = db.get_flags(game['game_id'], team['team_id'])
-                ver_team_name = team['team_name']
-                for f in ver_flags:
-                    cid = f['citation_id']
-                    if cid in annotations:
-                        annotations[cid]['caught'] = f['verdict'] == 'fake'
-                    # Also mark non-swapped citations that were flagged
-                    elif f['verdict'] == 'fake':
-                        annotations.setdefault(cid, {})['false_flag'] = True
-                break
-
-    return jsonify({
-        'brief': brief,
-        'annotations': annotations,
-        'fab_team_name': fab_team['team_name'],
-        'ver_team_name': ver_team_name,
-    })
+    return jsonify(review_brief_payload(game, fab_team))
 
 
 @app.route('/api/scoreboard')
@@ -695,6 +1083,20 @@ def api_scoreboard():
     if game['phase'] != 'reveal':
         return jsonify({'error': 'Game not in reveal phase'}), 400
 
+    # Games revealed before snapshots existed get theirs on first request
+    snapshot = db.get_reveal_snapshot(game['game_id'], 'scoreboard')
+    if not snapshot:
+        snapshot = store_reveal_snapshot(game['game_id'])['scoreboard']
+    return json_body(snapshot)
+
+
+# ── Results ──────────────────────────────────────────────────────────────────
+# Once a game is in reveal its swaps and flags are frozen, so the scoreboard
+# and every team's review brief are computed once at reveal and stored as JSON
+# bodies; later requests are served straight from that snapshot.
+
+def scoreboard_payload(game):
+    """Final scores and per-type detection stats for a game in reveal."""
     teams = db.get_teams(game['game_id'])
     brief_id = game['brief_id']
 
@@ -750,18 +1152,124 @@ def api_scoreboard():
         caught = type_stats[ht]['caught']
         type_stats[ht]['detection_rate'] = round(caught / total * 100) if total > 0 else 0
 
-    return jsonify({
+    return {
         'scores': scores,
         'type_stats': type_stats,
         'brief_id': brief_id,
         'mode': game['mode']
-    })
+    }
+
+
+def review_brief_payload(game, fab_team):
+    """Annotated brief showing one team's hallucinations (plus verifier verdicts once revealed)."""
+    phase = game['phase']
+    fab_team_id = fab_team['team_id']
+    brief_id = game['brief_id']
+
+    # Load this team's swaps
+    fab_swaps = db.get_swaps(game['game_id'], fab_team_id)
+    swap_dicts = [{'citation_id': s['citation_id'], 'hallucination_type': s['hallucination_type'],
+                   'option_id': s['option_id']} for s in fab_swaps]
+
+    # Get the modified brief
+    brief = gs.get_brief_for_display(brief_id, swaps=swap_dicts)
+
+    # Build annotations keyed by citation_id
+    annotations = {}
+    for swap in swap_dicts:
+        cid = swap['citation_id']
+        htype = swap['hallucination_type']
+        record = gs.find_option(brief_id, cid, htype, swap['option_id'])
+        if record:
+            option = record.option
+            annotations[cid] = {
+                'hallucination_type': htype,
+                'option_label': option.label or '',
+                'original_text': option.original_text or '',
+                'replacement_text': option.replacement_text or '',
+                'replacement_citation': option.replacement_citation or '',
+                'original_display': record.citation.original_display or '',
+            }
+
+    # During reveal, include verifier verdicts
+    ver_team_name = None
+    if phase == 'reveal':
+        teams = db.get_teams(game['game_id'])
+        for team in teams:
+            if team['fabrication_team'] == fab_team_id:
+                # This team verified the fab_team's work
+                ver_flags = db.get_flags(game['game_id'], team['team_id'])
+                ver_team_name = team['team_name']
+                for f in ver_flags:
+                    cid = f['citation_id']
+                    if cid in annotations:
+                        annotations[cid]['caught'] = f['verdict'] == 'fake'
+                    # Also mark non-swapped citations that were flagged
+                    elif f['verdict'] == 'fake':
+                        annotations.setdefault(cid, {})['false_flag'] = True
+                break
+
+    return {
+        'brief': brief,
+        'annotations': annotations,
+        'fab_team_name': fab_team['team_name'],
+        'ver_team_name': ver_team_name,
+    }
+
+
+def reveal_game(game_id):
+    """Move a game to reveal and freeze its results.
+
+    Swap and flag writes queued before the call are committed first, and any
+    that arrive after the phase change raise db.GameRevealed, so the snapshot
+    taken afterwards is the game's final state.
+    """
+    db.flush_writes()
+    db.set_game_phase(game_id, 'reveal')
+    store_reveal_snapshot(game_id)
+
+
+def store_reveal_snapshot(game_id):
+    """Compute and store the scoreboard and all review briefs for a game in reveal.
+
+    Returns the stored {key: JSON body} entries.
+    """
+    game = db.get_game(game_id)
+    entries = {'scoreboard': app.json.dumps(scoreboard_payload(game))}
+    for team in db.get_teams(game_id):
+        entries[f"review:{team['team_id']}"] = app.json.dumps(review_brief_payload(game, team))
+    db.save_reveal_snapshot(game_id, entries)
+    return entries
+
+
+def json_body(body):
+    """Response for an already-serialized JSON body."""
+    return app.response_class(body, mimetype='application/json')
 
 
 # ── App init ─────────────────────────────────────────────────────────────────
 
 with app.app_context():
     db.init_db()
+gs.refresh_catalog(force=True)
+
+
+def prefork_warm_up():
+    """Prepare a parent process whose workers will be forked from it (gunicorn.conf.py).
+
+    Loads every brief with its indexes and render plans so workers inherit them
+    instead of each loading them on first request, closes the parent's database
+    connections (SQLite connections can't be shared across a fork) and freezes
+    everything allocated so far out of the garbage collector, whose collections
+    would otherwise write to the shared pages and un-share them.
+    """
+    loaded = gs.preload_briefs()
+    db.stop_writer()
+    db.close_pool()
+    gc.collect()
+    gc.freeze()
+    return loaded
+
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
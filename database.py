@@ -1,36 +1,245 @@
 """SQLite database for the Citation Hallucination Game."""
 
+import json
 import sqlite3
 import uuid
 import random
 import string
 import os
+import queue
 import threading
+import time
+from collections import OrderedDict
+
+from game_store import GameRevealed, GameStore, sqlite_timestamp
 
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'game.db')
 
-_local = threading.local()
+# Write-behind mode (GAME_DB_WRITE_BEHIND=1): swap and flag writes are handed to
+# one writer thread that commits whatever has queued up every
+# GROUP_COMMIT_MS milliseconds, so a burst of clicks costs one WAL sync
+# instead of one per request.
+WRITE_BEHIND = os.environ.get('GAME_DB_WRITE_BEHIND') == '1'
+GROUP_COMMIT_MS = float(os.environ.get('GAME_DB_GROUP_COMMIT_MS', '2'))
+GROUP_COMMIT_MAX = 500
+# Longest a request waits for the writer to commit its write
+WRITE_TIMEOUT = float(os.environ.get('GAME_DB_WRITE_TIMEOUT', '30'))
+
+# Storage engine (GAME_DB_ENGINE): 'sqlite' reads and writes the tables
+# directly; 'memory' serves reads from a GameStore and appends each write to
+# the game_events log, which init_db() replays at startup. Memory state is per
+# process, so the memory engine needs a single worker process.
+ENGINE = os.environ.get('GAME_DB_ENGINE', 'sqlite')
+
+# Per-connection tuning. synchronous=NORMAL is safe against corruption in WAL
+# mode and skips the fsync on every commit (a power cut can lose the last few
+# commits); set GAME_DB_SYNCHRONOUS=FULL to sync every commit.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA foreign_keys=ON",
+    f"PRAGMA synchronous={os.environ.get('GAME_DB_SYNCHRONOUS', 'NORMAL')}",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=67108864",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Connection pool: each request thread borrows a configured connection in
+# get_db() and hands it back in close_db(), so connections (and their
+# prepared-statement caches) outlive requests. At most POOL_SIZE are open at
+# once; a thread that finds none free waits up to POOL_TIMEOUT seconds.
+POOL_SIZE = int(os.environ.get('GAME_DB_POOL_SIZE', '32'))
+POOL_TIMEOUT = float(os.environ.get('GAME_DB_POOL_TIMEOUT', '10'))
+STATEMENT_CACHE_SIZE = 256
+
+
+class _ThreadState(threading.local):
+    """Per-thread borrowed connection, count of SQL statements issued and optional SQL log."""
+
+    conn = None
+    statements = 0
+    sql_log = None
+
+
+_local = _ThreadState()
+
+
+class _PooledConnection(sqlite3.Connection):
+    """A pooled connection that remembers which database file it opened.
+
+    Counts every execute call against the calling thread (see statement_count)
+    and adds its SQL to the thread's log while one is set (see log_statements).
+    """
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self.path = path
+
+    def execute(self, sql, parameters=(), /):
+        _count_statement(sql)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, parameters, /):
+        _count_statement(sql)
+        return super().executemany(sql, parameters)
+
+    def executescript(self, sql_script, /):
+        _count_statement(sql_script)
+        return super().executescript(sql_script)
+
+
+def _count_statement(sql):
+    state = _local
+    state.statements += 1
+    if state.sql_log is not None:
+        state.sql_log.append(sql)
+
+
+_pool = []
+_pool_cond = threading.Condition()
+_pool_open = 0
+_pool_stats = {'acquired': 0, 'created': 0, 'waits': 0, 'timeouts': 0,
+               'wait_ms_total': 0.0, 'wait_ms_max': 0.0}
+
+
+def _connect():
+    """Open and configure a connection for the pool."""
+    conn = sqlite3.connect(DB_PATH, factory=_PooledConnection, check_same_thread=False,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row
+    _configure(conn)
+    return conn
+
+
+def _acquire():
+    """Take an idle connection, open a new one if under POOL_SIZE, or wait for one."""
+    global _pool_open
+    with _pool_cond:
+        _pool_stats['acquired'] += 1
+        if not _pool and _pool_open >= POOL_SIZE:
+            _pool_stats['waits'] += 1
+            start = time.perf_counter()
+            ready = _pool_cond.wait_for(lambda: _pool or _pool_open < POOL_SIZE, POOL_TIMEOUT)
+            waited_ms = (time.perf_counter() - start) * 1000
+            _pool_stats['wait_ms_total'] += waited_ms
+            _pool_stats['wait_ms_max'] = max(_pool_stats['wait_ms_max'], waited_ms)
+            if not ready:
+                _pool_stats['timeouts'] += 1
+                raise sqlite3.OperationalError(f'no database connection free after {POOL_TIMEOUT} s')
+        while _pool:
+            conn = _pool.pop()
+            if conn.path == DB_PATH:
+                return conn
+            # DB_PATH changed (scripts point it at a scratch file): drop the old one
+            conn.close()
+            _pool_open -= 1
+        _pool_open += 1
+        _pool_stats['created'] += 1
+    try:
+        return _connect()
+    except Exception:
+        with _pool_cond:
+            _pool_open -= 1
+            _pool_cond.notify()
+        raise
+
+
+def _release(conn):
+    """Return a connection to the pool, discarding any uncommitted work."""
+    if conn.in_transaction:
+        conn.rollback()
+    with _pool_cond:
+        _pool.append(conn)
+        _pool_cond.notify()
 
 
 def get_db():
-    """Get a thread-local database connection."""
-    if not hasattr(_local, 'conn') or _local.conn is None:
-        _local.conn = sqlite3.connect(DB_PATH)
-        _local.conn.row_factory = sqlite3.Row
-        _local.conn.execute("PRAGMA journal_mode=WAL")
-        _local.conn.execute("PRAGMA foreign_keys=ON")
+    """Get this thread's database connection, borrowing one from the pool if needed."""
+    if _local.conn is None:
+        _local.conn = _acquire()
     return _local.conn
 
 
+def _configure(conn):
+    """Apply CONNECTION_PRAGMAS to a new connection."""
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+
 def close_db():
-    """Close the thread-local connection."""
-    if hasattr(_local, 'conn') and _local.conn is not None:
-        _local.conn.close()
-        _local.conn = None
+    """Hand this thread's connection back to the pool."""
+    if _local.conn is not None:
+        conn, _local.conn = _local.conn, None
+        _release(conn)
+
+
+def close_pool():
+    """Close this thread's connection and every idle one in the pool.
+
+    SQLite connections must not be used on both sides of a fork, so a server
+    that sets up the database before forking workers calls this last; each
+    worker then opens its own connections on first use.
+    """
+    global _pool_open
+    close_db()
+    with _pool_cond:
+        while _pool:
+            _pool.pop().close()
+            _pool_open -= 1
+
+
+def statement_count():
+    """SQL statements this thread has issued so far; executemany and executescript count once."""
+    return _local.statements
+
+
+def log_statements(log):
+    """Append the SQL of every statement this thread issues to log (a list); None stops logging."""
+    _local.sql_log = log
+
+
+def pool_stats():
+    """Connection pool size, occupancy and wait counters (milliseconds)."""
+    with _pool_cond:
+        stats = dict(_pool_stats)
+        stats.update(size=POOL_SIZE, open=_pool_open, idle=len(_pool), in_use=_pool_open - len(_pool))
+    wait_ms_total = stats.pop('wait_ms_total')
+    stats['wait_ms_avg'] = wait_ms_total / stats['waits'] if stats['waits'] else 0.0
+    return stats
+
+
+# ── Change notification ──────────────────────────────────────────────────────
+# Per-game counters bumped when phase, timer or team membership changes, so
+# streaming clients can block until something happens instead of polling.
+
+_change_cond = threading.Condition()
+_change_counters = {}
+
+
+def notify_game_change(game_id):
+    """Wake everything waiting on changes to this game."""
+    with _change_cond:
+        _change_counters[game_id] = _change_counters.get(game_id, 0) + 1
+        _change_cond.notify_all()
+
+
+def get_game_change_counter(game_id):
+    """Current change counter for a game (0 if it never changed in this process)."""
+    with _change_cond:
+        return _change_counters.get(game_id, 0)
+
+
+def wait_for_game_change(game_id, last_seen, timeout):
+    """Block until the game's change counter differs from last_seen, or timeout.
+
+    Returns the current counter value (equal to last_seen on timeout).
+    """
+    with _change_cond:
+        _change_cond.wait_for(lambda: _change_counters.get(game_id, 0) != last_seen, timeout)
+        return _change_counters.get(game_id, 0)
 
 
 def init_db():
-    """Create tables if they don't exist."""
+    """Create tables if they don't exist, and load the memory engine's state."""
     db = get_db()
     db.executescript("""
         CREATE TABLE IF NOT EXISTS games (
@@ -40,6 +249,7 @@ def init_db():
             timer_end TEXT,
             brief_id TEXT,
             mode TEXT NOT NULL DEFAULT 'multiplayer',
+            version INTEGER NOT NULL DEFAULT 0,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
 
@@ -80,13 +290,405 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             PRIMARY KEY (game_id, team_id, citation_id)
         );
+
+        CREATE TABLE IF NOT EXISTS reveal_snapshots (
+            game_id TEXT NOT NULL REFERENCES games(game_id),
+            snapshot_key TEXT NOT NULL,
+            body TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (game_id, snapshot_key)
+        );
     """)
-    # Migration: add mode column if missing (existing DBs)
+    migrate(db)
+    if ENGINE == 'memory':
+        _load_store(db)
+
+
+def _add_missing_columns(db):
+    """Columns added to games after the first release."""
     cursor = db.execute("PRAGMA table_info(games)")
     columns = [row[1] for row in cursor.fetchall()]
     if 'mode' not in columns:
         db.execute("ALTER TABLE games ADD COLUMN mode TEXT NOT NULL DEFAULT 'multiplayer'")
-    db.commit()
+    if 'version' not in columns:
+        db.execute("ALTER TABLE games ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+
+def _add_lookup_indexes(db):
+    """Indexes for the per-game lookups; games, swaps and flags by primary key need none."""
+    db.executescript("""
+        -- get_teams, get_status_summary, reset_game
+        CREATE INDEX IF NOT EXISTS idx_teams_game ON teams (game_id);
+        -- get_players with and without team_id, get_status_summary
+        CREATE INDEX IF NOT EXISTS idx_players_game_team ON players (game_id, team_id);
+        -- get_status_summary's fake-flag count, answered from the index alone
+        CREATE INDEX IF NOT EXISTS idx_flags_game_verdict ON flags (game_id, verdict, team_id);
+    """)
+
+
+def _add_game_events(db):
+    """Append-only per-game event log, written by every mutation."""
+    db.executescript("""
+        CREATE TABLE IF NOT EXISTS game_events (
+            game_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            data TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (game_id, seq)
+        );
+    """)
+
+
+def _backfill_game_logs(db):
+    """Give every game without a game_created event a complete log.
+
+    Games created before game_events existed only have events for what
+    changed since, which neither GameStore.replay nor the professor dashboard
+    can apply. Their partial log is replaced by a synthetic one: game_created
+    followed by events recreating the game's current rows.
+    """
+    games = db.execute("""
+        SELECT * FROM games g
+        WHERE NOT EXISTS (SELECT 1 FROM game_events e WHERE e.game_id = g.game_id AND e.kind = 'game_created')
+        ORDER BY rowid
+    """).fetchall()
+    for game in games:
+        game_id = game['game_id']
+        db.execute("DELETE FROM game_events WHERE game_id = ?", (game_id,))
+        _log_event(db, game_id, 'game_created',
+                   {'game_code': game['game_code'], 'mode': game['mode'], 'created_at': game['created_at']})
+        if game['brief_id']:
+            _log_event(db, game_id, 'brief_set', {'brief_id': game['brief_id']})
+        teams = db.execute("SELECT * FROM teams WHERE game_id = ? ORDER BY rowid", (game_id,)).fetchall()
+        for team in teams:
+            _log_event(db, game_id, 'team_created', {'team_id': team['team_id'], 'team_name': team['team_name']})
+        players = db.execute("SELECT * FROM players WHERE game_id = ? ORDER BY rowid", (game_id,)).fetchall()
+        for player in players:
+            _log_event(db, game_id, 'player_created', {
+                'player_id': player['player_id'], 'player_name': player['player_name'],
+                'session_token': player['session_token'], 'is_professor': player['is_professor'],
+                'created_at': player['created_at'],
+            })
+            if player['team_id']:
+                _log_event(db, game_id, 'player_assigned',
+                           {'player_id': player['player_id'], 'team_id': player['team_id']})
+        for team in teams:
+            if team['fabrication_brief'] or team['verification_brief'] or team['fabrication_team']:
+                _log_event(db, game_id, 'team_briefs_set', {
+                    'team_id': team['team_id'], 'fabrication_brief': team['fabrication_brief'],
+                    'verification_brief': team['verification_brief'], 'fabrication_team': team['fabrication_team'],
+                })
+        for swap in db.execute("SELECT * FROM swaps WHERE game_id = ? ORDER BY rowid", (game_id,)).fetchall():
+            _log_event(db, game_id, 'swaps_changed', {
+                'team_id': swap['team_id'], 'created_at': swap['created_at'],
+                'changes': [{'citation_id': swap['citation_id'], 'hallucination_type': swap['hallucination_type'],
+                             'option_id': swap['option_id']}],
+            })
+        for flag in db.execute("SELECT * FROM flags WHERE game_id = ? ORDER BY rowid", (game_id,)).fetchall():
+            _log_event(db, game_id, 'flags_set', {
+                'team_id': flag['team_id'], 'flags': [[flag['citation_id'], flag['verdict']]],
+                'created_at': flag['created_at'],
+            })
+        if game['phase'] != 'lobby' or game['timer_end']:
+            _log_event(db, game_id, 'phase_set', {'phase': game['phase'], 'timer_end': game['timer_end']})
+
+
+# Schema migrations, applied in order. PRAGMA user_version records how many
+# have run; append new steps here and never reorder existing ones.
+MIGRATIONS = [
+    _add_missing_columns,
+    _add_lookup_indexes,
+    _add_game_events,
+    _backfill_game_logs,
+]
+
+
+def migrate(db):
+    """Run any migrations newer than the database's user_version."""
+    current = db.execute("PRAGMA user_version").fetchone()[0]
+    for number, step in enumerate(MIGRATIONS[current:], start=current + 1):
+        step(db)
+        db.execute(f"PRAGMA user_version = {number}")
+        db.commit()
+    if current < len(MIGRATIONS):
+        db.execute("PRAGMA optimize")
+
+
+def _log_event(db, game_id, kind, data):
+    """Append an event to the game's log inside the caller's transaction.
+
+    Takes the next per-game seq. Does nothing if the game doesn't exist, so
+    writes that match no rows leave no event. The kinds and data are the ones
+    GameStore records, so either engine's log replays into a GameStore.
+    """
+    db.execute(
+        """INSERT INTO game_events (game_id, seq, kind, data)
+           SELECT ?, COALESCE((SELECT MAX(seq) FROM game_events WHERE game_id = ?), 0) + 1, ?, ?
+           WHERE EXISTS (SELECT 1 FROM games WHERE game_id = ?)""",
+        (game_id, game_id, kind, json.dumps(data), game_id)
+    )
+
+
+def get_game_events(game_id, since=0, limit=None):
+    """Logged events for a game with seq > since, oldest first.
+
+    Returns dicts with seq, kind, data (decoded) and created_at. Both engines
+    read the log from SQLite.
+    """
+    db = get_db()
+    rows = db.execute(
+        "SELECT seq, kind, data, created_at FROM game_events WHERE game_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+        (game_id, since, -1 if limit is None else limit)
+    ).fetchall()
+    return [{'seq': r['seq'], 'kind': r['kind'], 'data': json.loads(r['data']), 'created_at': r['created_at']}
+            for r in rows]
+
+
+def get_game_event_seq(game_id):
+    """Seq of a game's latest logged event, or 0 if none.
+
+    The memory engine answers from the store, whose state already includes
+    every event up to that seq (its log may still be catching up).
+    """
+    if _store is not None:
+        return _store.get_event_seq(game_id)
+    db = get_db()
+    return db.execute("SELECT COALESCE(MAX(seq), 0) FROM game_events WHERE game_id = ?", (game_id,)).fetchone()[0]
+
+
+def _bump_version(db, game_id):
+    """Bump a game's version inside the caller's transaction.
+
+    Every function that changes what a game's polled endpoints return calls
+    this before committing, so the version can serve as an ETag.
+    """
+    db.execute("UPDATE games SET version = version + 1 WHERE game_id = ?", (game_id,))
+
+
+def _bump_play_version(db, game_id):
+    """Bump a game's version as the first statement of a swap or flag write.
+
+    Being the transaction's first write, the UPDATE takes SQLite's write lock
+    and so sees the game's latest phase, which can't change before commit.
+    Raises GameRevealed if the game is in reveal: once the phase change has
+    committed, no swap or flag write can land behind the frozen results.
+    """
+    if db.execute("UPDATE games SET version = version + 1 WHERE game_id = ? AND phase != 'reveal'",
+                  (game_id,)).rowcount == 0:
+        if db.execute("SELECT 1 FROM games WHERE game_id = ? AND phase = 'reveal'", (game_id,)).fetchone():
+            raise GameRevealed(game_id)
+
+
+# ── Write-behind ─────────────────────────────────────────────────────────────
+# Each queued job is a function that runs its statements on the writer's
+# connection. The writer runs every job in a batch under its own savepoint (a
+# failing job is rolled back alone), commits once, and only then wakes the
+# submitting threads. The writer's connection uses synchronous=FULL whatever
+# CONNECTION_PRAGMAS say, so that commit is one fsync per batch and a write
+# is acknowledged once it is durable.
+
+class _WriteJob:
+    __slots__ = ('fn', 'done', 'error')
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.done = threading.Event()
+        self.error = None
+
+
+_write_queue = queue.Queue()
+_writer_lock = threading.Lock()
+_writer_thread = None
+_write_stats_lock = threading.Lock()
+_write_stats = {'jobs': 0, 'batches': 0, 'failed': 0, 'timeouts': 0, 'max_batch': 0,
+                'commit_ms_total': 0.0, 'commit_ms_max': 0.0, 'commit_ms_last': 0.0}
+
+
+def _run_write_batch(conn, jobs):
+    """Run a batch of jobs in one transaction; the caller acknowledges them."""
+    for job in jobs:
+        conn.execute("SAVEPOINT job")
+        try:
+            job.fn(conn)
+        except Exception as e:
+            conn.execute("ROLLBACK TO job")
+            job.error = e
+        conn.execute("RELEASE job")
+
+    start = time.perf_counter()
+    try:
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        for job in jobs:
+            job.error = job.error or e
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    with _write_stats_lock:
+        _write_stats['jobs'] += len(jobs)
+        _write_stats['batches'] += 1
+        _write_stats['failed'] += sum(1 for job in jobs if job.error)
+        _write_stats['max_batch'] = max(_write_stats['max_batch'], len(jobs))
+        _write_stats['commit_ms_total'] += elapsed_ms
+        _write_stats['commit_ms_max'] = max(_write_stats['commit_ms_max'], elapsed_ms)
+        _write_stats['commit_ms_last'] = elapsed_ms
+
+
+def _writer_loop():
+    """Drain the write queue in group commits until a None sentinel arrives."""
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    _configure(conn)
+    conn.execute("PRAGMA synchronous=FULL")
+    running = True
+    while running:
+        job = _write_queue.get()
+        if job is None:
+            break
+        jobs = [job]
+        deadline = time.monotonic() + GROUP_COMMIT_MS / 1000
+        while len(jobs) < GROUP_COMMIT_MAX:
+            remaining = deadline - time.monotonic()
+            try:
+                job = _write_queue.get(timeout=remaining) if remaining > 0 else _write_queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                running = False
+                break
+            jobs.append(job)
+        try:
+            conn.execute("BEGIN")
+            _run_write_batch(conn, jobs)
+        except Exception as e:
+            # BEGIN, SAVEPOINT or RELEASE failed: nothing in the batch is committed
+            if conn.in_transaction:
+                conn.rollback()
+            for job in jobs:
+                job.error = job.error or e
+        finally:
+            # Never leave a submitter waiting on a job this thread has taken
+            for job in jobs:
+                job.done.set()
+    conn.close()
+
+
+def _ensure_writer():
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_writer_loop, name='db-writer', daemon=True)
+            _writer_thread.start()
+
+
+def stop_writer():
+    """Flush the write queue and stop the writer thread (it restarts on the next write)."""
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is not None:
+            _write_queue.put(None)
+            _writer_thread.join()
+            _writer_thread = None
+
+
+def _write(fn):
+    """Run fn(conn) and commit, via the writer thread in write-behind mode.
+
+    Blocks until the write is committed and re-raises anything fn raised.
+    In write-behind mode, raises sqlite3.OperationalError if the writer has
+    not committed it within WRITE_TIMEOUT seconds; the write may still be
+    committed later.
+    """
+    _submit_write(fn)()
+
+
+def _submit_write(fn):
+    """Start a write like _write and return a function that finishes it.
+
+    Writes are committed in the order they are submitted. Without
+    write-behind the write is committed (or raises) right here and the
+    returned function does nothing; with it, the write is queued and the
+    returned function does _write's waiting.
+    """
+    if not WRITE_BEHIND:
+        db = get_db()
+        try:
+            fn(db)
+        except Exception:
+            db.rollback()
+            raise
+        db.commit()
+        return lambda: None
+    _ensure_writer()
+    job = _WriteJob(fn)
+    _write_queue.put(job)
+    return lambda: _wait_for_write(job)
+
+
+def _wait_for_write(job):
+    deadline = time.monotonic() + WRITE_TIMEOUT
+    while not job.done.wait(min(1.0, max(0.0, deadline - time.monotonic()))):
+        if time.monotonic() >= deadline:
+            with _write_stats_lock:
+                _write_stats['timeouts'] += 1
+            raise sqlite3.OperationalError(f'write not committed after {WRITE_TIMEOUT} s')
+        # A writer that died (or was stopped) leaves the queue to a new one
+        _ensure_writer()
+    if job.error is not None:
+        raise job.error
+
+
+def flush_writes():
+    """Wait until every write queued so far has been committed (write-behind mode only)."""
+    if WRITE_BEHIND and _writer_thread is not None:
+        _write(lambda db: None)
+
+
+def write_stats():
+    """Write-behind queue depth, batch sizes and commit latency in milliseconds."""
+    with _write_stats_lock:
+        stats = dict(_write_stats)
+    total_ms = stats.pop('commit_ms_total')
+    batches = stats['batches']
+    stats['commit_ms_avg'] = total_ms / batches if batches else 0.0
+    stats['avg_batch'] = stats['jobs'] / batches if batches else 0.0
+    stats['enabled'] = WRITE_BEHIND
+    stats['queue_depth'] = _write_queue.qsize()
+    return stats
+
+
+# ── Memory engine ────────────────────────────────────────────────────────────
+# With GAME_DB_ENGINE=memory every game function below delegates to _store.
+# Reveal snapshots are not logged: they are derived from the game's final
+# state, so after a restart the routes rebuild them on first request.
+
+_store = None
+
+
+def _append_event(game_id, seq, kind, data):
+    """Start appending one event to the game_events log; returns _submit_write's finisher."""
+    def write(db):
+        db.execute(
+            "INSERT INTO game_events (game_id, seq, kind, data) VALUES (?, ?, ?, ?)",
+            (game_id, seq, kind, json.dumps(data))
+        )
+    return _submit_write(write)
+
+
+def _read_game_log(game_id):
+    """A game's committed (kind, data) events in seq order, once queued writes are in."""
+    flush_writes()
+    rows = get_db().execute("SELECT kind, data FROM game_events WHERE game_id = ? ORDER BY seq", (game_id,))
+    return [(row[0], json.loads(row[1])) for row in rows]
+
+
+def _load_store(db):
+    """Rebuild the GameStore by replaying the whole event log."""
+    global _store
+    store = GameStore(_append_event, _read_game_log)
+    rows = db.execute("SELECT game_id, seq, kind, data FROM game_events ORDER BY game_id, seq")
+    store.replay((row[0], row[1], row[2], json.loads(row[3])) for row in rows)
+    _store = store
 
 
 def generate_game_code():
@@ -102,139 +704,397 @@ def generate_id():
 
 def create_game(mode='multiplayer'):
     """Create a new game session."""
-    db = get_db()
     game_id = generate_id()
     game_code = generate_game_code()
+    if _store is not None:
+        _store.create_game(game_id, game_code, mode)
+        return game_id, game_code
+    db = get_db()
     db.execute(
         "INSERT INTO games (game_id, game_code, phase, mode) VALUES (?, ?, 'lobby', ?)",
         (game_id, game_code, mode)
     )
+    _log_event(db, game_id, 'game_created',
+               {'game_code': game_code, 'mode': mode, 'created_at': sqlite_timestamp()})
     db.commit()
     return game_id, game_code
 
 
 def get_game_by_code(code):
     """Look up a game by its code."""
+    if _store is not None:
+        return _store.get_game_by_code(code)
     db = get_db()
     return db.execute("SELECT * FROM games WHERE game_code = ?", (code.upper(),)).fetchone()
 
 
 def get_game(game_id):
     """Get game by ID."""
+    if _store is not None:
+        return _store.get_game(game_id)
     db = get_db()
     return db.execute("SELECT * FROM games WHERE game_id = ?", (game_id,)).fetchone()
 
 
+def get_game_version(game_id):
+    """Get a game's version counter, or None if the game doesn't exist."""
+    if _store is not None:
+        game = _store.get_game(game_id)
+        return game['version'] if game else None
+    db = get_db()
+    row = db.execute("SELECT version FROM games WHERE game_id = ?", (game_id,)).fetchone()
+    return row[0] if row else None
+
+
 def set_game_phase(game_id, phase, timer_end=None):
     """Update the game phase."""
-    db = get_db()
-    db.execute(
-        "UPDATE games SET phase = ?, timer_end = ? WHERE game_id = ?",
-        (phase, timer_end, game_id)
-    )
-    db.commit()
+    if _store is not None:
+        _store.set_game_phase(game_id, phase, timer_end)
+    else:
+        db = get_db()
+        db.execute(
+            "UPDATE games SET phase = ?, timer_end = ?, version = version + 1 WHERE game_id = ?",
+            (phase, timer_end, game_id)
+        )
+        _log_event(db, game_id, 'phase_set', {'phase': phase, 'timer_end': timer_end})
+        db.commit()
+    notify_game_change(game_id)
 
 
 def set_game_brief(game_id, brief_id):
     """Set the brief for a game."""
+    if _store is not None:
+        _store.set_game_brief(game_id, brief_id)
+        return
     db = get_db()
-    db.execute("UPDATE games SET brief_id = ? WHERE game_id = ?", (brief_id, game_id))
+    db.execute("UPDATE games SET brief_id = ?, version = version + 1 WHERE game_id = ?", (brief_id, game_id))
+    _log_event(db, game_id, 'brief_set', {'brief_id': brief_id})
     db.commit()
 
 
 def create_team(game_id, team_name):
     """Create a team in a game."""
-    db = get_db()
     team_id = generate_id()
+    if _store is not None:
+        _store.create_team(game_id, team_id, team_name)
+        return team_id
+    db = get_db()
     db.execute(
         "INSERT INTO teams (team_id, game_id, team_name) VALUES (?, ?, ?)",
         (team_id, game_id, team_name)
     )
+    _bump_version(db, game_id)
+    _log_event(db, game_id, 'team_created', {'team_id': team_id, 'team_name': team_name})
     db.commit()
     return team_id
 
 
 def get_teams(game_id):
     """Get all teams for a game."""
+    if _store is not None:
+        return _store.get_teams(game_id)
     db = get_db()
-    return db.execute("SELECT * FROM teams WHERE game_id = ?", (game_id,)).fetchall()
+    return db.execute("SELECT * FROM teams WHERE game_id = ? ORDER BY rowid", (game_id,)).fetchall()
 
 
 def get_team(team_id):
     """Get a team by ID."""
+    if _store is not None:
+        return _store.get_team(team_id)
     db = get_db()
     return db.execute("SELECT * FROM teams WHERE team_id = ?", (team_id,)).fetchone()
 
 
 def assign_player_team(player_id, team_id):
     """Assign a player to a team."""
+    if _store is not None:
+        game_id = _store.assign_player_team(player_id, team_id)
+        if game_id:
+            notify_game_change(game_id)
+        return
     db = get_db()
+    player = db.execute("SELECT game_id, session_token FROM players WHERE player_id = ?", (player_id,)).fetchone()
     db.execute("UPDATE players SET team_id = ? WHERE player_id = ?", (team_id, player_id))
+    if player:
+        _bump_version(db, player['game_id'])
+        _log_event(db, player['game_id'], 'player_assigned', {'player_id': player_id, 'team_id': team_id})
     db.commit()
+    if player:
+        _invalidate_tokens([player['session_token']])
+        notify_game_change(player['game_id'])
 
 
 def set_team_briefs(team_id, fabrication_brief, verification_brief, fabrication_team):
     """Set which brief a team fabricates on and verifies."""
+    if _store is not None:
+        _store.set_team_briefs(team_id, fabrication_brief, verification_brief, fabrication_team)
+        return
     db = get_db()
+    team = db.execute("SELECT game_id FROM teams WHERE team_id = ?", (team_id,)).fetchone()
     db.execute(
         "UPDATE teams SET fabrication_brief = ?, verification_brief = ?, fabrication_team = ? WHERE team_id = ?",
         (fabrication_brief, verification_brief, fabrication_team, team_id)
     )
+    if team:
+        _bump_version(db, team['game_id'])
+        _log_event(db, team['game_id'], 'team_briefs_set', {
+            'team_id': team_id, 'fabrication_brief': fabrication_brief,
+            'verification_brief': verification_brief, 'fabrication_team': fabrication_team,
+        })
     db.commit()
 
 
+# ── Session-token cache ──────────────────────────────────────────────────────
+# Player rows keyed by session token, so the lookup that starts every
+# authenticated request rarely reaches SQLite. Writes that change a player row
+# invalidate it here; the TTL bounds how stale a row can get when the write
+# happened in another worker process.
+
+TOKEN_CACHE_SIZE = 4096
+TOKEN_CACHE_TTL = 30.0
+
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+_token_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+_token_cache_generation = 0
+
+
 def create_player(game_id, player_name, is_professor=False):
     """Create a player and return (player_id, session_token)."""
-    db = get_db()
     player_id = generate_id()
     session_token = generate_id()
+    if _store is not None:
+        _store.create_player(game_id, player_id, player_name, session_token, is_professor)
+        return player_id, session_token
+    db = get_db()
     db.execute(
         "INSERT INTO players (player_id, game_id, player_name, session_token, is_professor) VALUES (?, ?, ?, ?, ?)",
         (player_id, game_id, player_name, session_token, 1 if is_professor else 0)
     )
+    _bump_version(db, game_id)
+    _log_event(db, game_id, 'player_created', {
+        'player_id': player_id, 'player_name': player_name, 'session_token': session_token,
+        'is_professor': 1 if is_professor else 0, 'created_at': sqlite_timestamp(),
+    })
     db.commit()
     return player_id, session_token
 
 
 def get_player_by_token(token):
-    """Look up a player by session token."""
+    """Look up a player by session token, through the token cache."""
+    if _store is not None:
+        return _store.get_player_by_token(token)
+    now = time.monotonic()
+    with _token_cache_lock:
+        entry = _token_cache.get(token)
+        if entry is not None and entry[0] > now:
+            _token_cache.move_to_end(token)
+            _token_cache_stats['hits'] += 1
+            return entry[1]
+        _token_cache_stats['misses'] += 1
+        generation = _token_cache_generation
+
     db = get_db()
-    return db.execute("SELECT * FROM players WHERE session_token = ?", (token,)).fetchone()
+    player = db.execute("SELECT * FROM players WHERE session_token = ?", (token,)).fetchone()
+    if player is not None:
+        with _token_cache_lock:
+            # An invalidation since the SELECT means the row may already be stale
+            if generation != _token_cache_generation:
+                return player
+            _token_cache[token] = (now + TOKEN_CACHE_TTL, player)
+            _token_cache.move_to_end(token)
+            while len(_token_cache) > TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+                _token_cache_stats['evictions'] += 1
+    return player
+
+
+def _invalidate_tokens(tokens):
+    """Drop these session tokens from the token cache."""
+    global _token_cache_generation
+    with _token_cache_lock:
+        _token_cache_generation += 1
+        for token in tokens:
+            _token_cache.pop(token, None)
+
+
+def _invalidate_game_tokens(game_id):
+    """Drop every cached player of a game."""
+    global _token_cache_generation
+    with _token_cache_lock:
+        _token_cache_generation += 1
+        for token in [t for t, (_, p) in _token_cache.items() if p['game_id'] == game_id]:
+            del _token_cache[token]
+
+
+def token_cache_stats():
+    """Hit/miss/eviction counters and current size of the session-token cache."""
+    with _token_cache_lock:
+        return {**_token_cache_stats, 'size': len(_token_cache), 'max_size': TOKEN_CACHE_SIZE}
 
 
 def get_players(game_id, team_id=None):
     """Get players in a game, optionally filtered by team."""
+    if _store is not None:
+        return _store.get_players(game_id, team_id)
     db = get_db()
     if team_id:
         return db.execute(
-            "SELECT * FROM players WHERE game_id = ? AND team_id = ?",
+            "SELECT * FROM players WHERE game_id = ? AND team_id = ? ORDER BY rowid",
             (game_id, team_id)
         ).fetchall()
-    return db.execute("SELECT * FROM players WHERE game_id = ?", (game_id,)).fetchall()
+    return db.execute("SELECT * FROM players WHERE game_id = ? ORDER BY rowid", (game_id,)).fetchall()
+
+
+def get_status_summary(game_id):
+    """Get every team's players, swap count and fake-flag count in two queries.
+
+    Returns (teams, unassigned): teams is a list of dicts with team_id,
+    team_name, fabrication_team, players, swap_count and flag_count, in
+    creation order; unassigned lists non-professor players without a team.
+    Players are dicts with player_id and player_name.
+    """
+    if _store is not None:
+        return _store.get_status_summary(game_id)
+    db = get_db()
+    team_rows = db.execute("""
+        SELECT t.team_id, t.team_name, t.fabrication_team,
+               COALESCE(s.swap_count, 0) AS swap_count,
+               COALESCE(f.flag_count, 0) AS flag_count
+        FROM teams t
+        LEFT JOIN (
+            SELECT team_id, COUNT(*) AS swap_count FROM swaps
+            WHERE game_id = ? GROUP BY team_id
+        ) s ON s.team_id = t.team_id
+        LEFT JOIN (
+            SELECT team_id, COUNT(*) AS flag_count FROM flags
+            WHERE game_id = ? AND verdict = 'fake' GROUP BY team_id
+        ) f ON f.team_id = t.team_id
+        WHERE t.game_id = ?
+        ORDER BY t.rowid
+    """, (game_id, game_id, game_id)).fetchall()
+    player_rows = db.execute(
+        "SELECT player_id, player_name, team_id, is_professor FROM players WHERE game_id = ? ORDER BY rowid",
+        (game_id,)
+    ).fetchall()
+
+    teams = []
+    by_team = {}
+    for row in team_rows:
+        team = dict(row)
+        team['players'] = []
+        by_team[team['team_id']] = team
+        teams.append(team)
+
+    unassigned = []
+    for p in player_rows:
+        entry = {'player_id': p['player_id'], 'player_name': p['player_name']}
+        if p['team_id'] in by_team:
+            by_team[p['team_id']]['players'].append(entry)
+        elif not p['team_id'] and not p['is_professor']:
+            unassigned.append(entry)
+
+    return teams, unassigned
+
+
+def _check_text(*values):
+    """Raise TypeError unless every swap/flag field is a string.
+
+    SQLite would store 5 as '5' while the memory engine would keep the int
+    (and then fail to sort it among string keys), so both engines refuse it.
+    """
+    for value in values:
+        if not isinstance(value, str):
+            raise TypeError(f'swap and flag fields must be str, not {type(value).__name__}')
 
 
 def upsert_swap(game_id, team_id, citation_id, hallucination_type, option_id):
     """Insert or replace a swap."""
-    db = get_db()
-    db.execute(
-        "INSERT OR REPLACE INTO swaps (game_id, team_id, citation_id, hallucination_type, option_id) VALUES (?, ?, ?, ?, ?)",
-        (game_id, team_id, citation_id, hallucination_type, option_id)
-    )
-    db.commit()
+    _check_text(citation_id, hallucination_type, option_id)
+    if _store is not None:
+        _store.apply_swap_changes(game_id, team_id, [{
+            'citation_id': citation_id, 'hallucination_type': hallucination_type, 'option_id': option_id
+        }])
+        return
+
+    def write(db):
+        _bump_play_version(db, game_id)
+        db.execute(
+            "INSERT OR REPLACE INTO swaps (game_id, team_id, citation_id, hallucination_type, option_id) VALUES (?, ?, ?, ?, ?)",
+            (game_id, team_id, citation_id, hallucination_type, option_id)
+        )
+        _log_event(db, game_id, 'swaps_changed', {
+            'team_id': team_id, 'created_at': sqlite_timestamp(),
+            'changes': [{'citation_id': citation_id, 'hallucination_type': hallucination_type,
+                         'option_id': option_id}],
+        })
+    _write(write)
 
 
 def delete_swap(game_id, team_id, citation_id):
     """Remove a swap."""
-    db = get_db()
-    db.execute(
-        "DELETE FROM swaps WHERE game_id = ? AND team_id = ? AND citation_id = ?",
-        (game_id, team_id, citation_id)
-    )
-    db.commit()
+    _check_text(citation_id)
+    if _store is not None:
+        _store.apply_swap_changes(game_id, team_id, [{'citation_id': citation_id, 'unswap': True}])
+        return
+
+    def write(db):
+        _bump_play_version(db, game_id)
+        db.execute(
+            "DELETE FROM swaps WHERE game_id = ? AND team_id = ? AND citation_id = ?",
+            (game_id, team_id, citation_id)
+        )
+        _log_event(db, game_id, 'swaps_changed', {
+            'team_id': team_id, 'created_at': sqlite_timestamp(),
+            'changes': [{'citation_id': citation_id, 'unswap': True}],
+        })
+    _write(write)
+
+
+def apply_swap_changes(game_id, team_id, changes):
+    """Apply several swaps and unswaps for a team in one transaction.
+
+    Each change is a dict with citation_id and either hallucination_type and
+    option_id (swap) or a truthy 'unswap' (remove the citation's swap).
+    """
+    for change in changes:
+        if change.get('unswap'):
+            _check_text(change['citation_id'])
+        else:
+            _check_text(change['citation_id'], change['hallucination_type'], change['option_id'])
+    if _store is not None:
+        _store.apply_swap_changes(game_id, team_id, changes)
+        return
+
+    def write(db):
+        _bump_play_version(db, game_id)
+        for change in changes:
+            if change.get('unswap'):
+                db.execute(
+                    "DELETE FROM swaps WHERE game_id = ? AND team_id = ? AND citation_id = ?",
+                    (game_id, team_id, change['citation_id'])
+                )
+            else:
+                db.execute(
+                    "INSERT OR REPLACE INTO swaps (game_id, team_id, citation_id, hallucination_type, option_id) VALUES (?, ?, ?, ?, ?)",
+                    (game_id, team_id, change['citation_id'], change['hallucination_type'], change['option_id'])
+                )
+        _log_event(db, game_id, 'swaps_changed', {
+            'team_id': team_id, 'created_at': sqlite_timestamp(),
+            'changes': [
+                {'citation_id': c['citation_id'], 'unswap': True} if c.get('unswap') else
+                {'citation_id': c['citation_id'], 'hallucination_type': c['hallucination_type'],
+                 'option_id': c['option_id']}
+                for c in changes
+            ],
+        })
+    _write(write)
 
 
 def get_swaps(game_id, team_id):
     """Get all swaps for a team in a game."""
+    if _store is not None:
+        return _store.get_swaps(game_id, team_id)
     db = get_db()
     return db.execute(
         "SELECT * FROM swaps WHERE game_id = ? AND team_id = ?",
@@ -244,16 +1104,51 @@ def get_swaps(game_id, team_id):
 
 def upsert_flag(game_id, team_id, citation_id, verdict):
     """Insert or replace a flag."""
-    db = get_db()
-    db.execute(
-        "INSERT OR REPLACE INTO flags (game_id, team_id, citation_id, verdict) VALUES (?, ?, ?, ?)",
-        (game_id, team_id, citation_id, verdict)
-    )
-    db.commit()
+    _check_text(citation_id, verdict)
+    if _store is not None:
+        _store.upsert_flags(game_id, team_id, [(citation_id, verdict)])
+        return
+
+    def write(db):
+        _bump_play_version(db, game_id)
+        db.execute(
+            "INSERT OR REPLACE INTO flags (game_id, team_id, citation_id, verdict) VALUES (?, ?, ?, ?)",
+            (game_id, team_id, citation_id, verdict)
+        )
+        _log_event(db, game_id, 'flags_set', {
+            'team_id': team_id, 'flags': [[citation_id, verdict]], 'created_at': sqlite_timestamp(),
+        })
+    _write(write)
+
+
+def upsert_flags(game_id, team_id, flags):
+    """Insert or replace several flags for a team in one transaction.
+
+    flags is a list of (citation_id, verdict) pairs.
+    """
+    for citation_id, verdict in flags:
+        _check_text(citation_id, verdict)
+    if _store is not None:
+        _store.upsert_flags(game_id, team_id, flags)
+        return
+
+    def write(db):
+        _bump_play_version(db, game_id)
+        db.executemany(
+            "INSERT OR REPLACE INTO flags (game_id, team_id, citation_id, verdict) VALUES (?, ?, ?, ?)",
+            [(game_id, team_id, citation_id, verdict) for citation_id, verdict in flags]
+        )
+        _log_event(db, game_id, 'flags_set', {
+            'team_id': team_id, 'flags': [[citation_id, verdict] for citation_id, verdict in flags],
+            'created_at': sqlite_timestamp(),
+        })
+    _write(write)
 
 
 def get_flags(game_id, team_id):
     """Get all flags for a team in a game."""
+    if _store is not None:
+        return _store.get_flags(game_id, team_id)
     db = get_db()
     return db.execute(
         "SELECT * FROM flags WHERE game_id = ? AND team_id = ?",
@@ -261,17 +1156,49 @@ def get_flags(game_id, team_id):
     ).fetchall()
 
 
-def reset_game(game_id):
-    """Reset a game back to lobby: clear swaps, flags, team assignments, and phase."""
+def save_reveal_snapshot(game_id, entries):
+    """Store a revealed game's serialized responses, given as {snapshot_key: JSON body}."""
+    if _store is not None:
+        _store.save_reveal_snapshot(game_id, entries)
+        return
     db = get_db()
-    db.execute("DELETE FROM swaps WHERE game_id = ?", (game_id,))
-    db.execute("DELETE FROM flags WHERE game_id = ?", (game_id,))
-    db.execute(
-        "UPDATE teams SET fabrication_brief = NULL, verification_brief = NULL, fabrication_team = NULL WHERE game_id = ?",
-        (game_id,)
-    )
-    db.execute(
-        "UPDATE games SET phase = 'lobby', timer_end = NULL WHERE game_id = ?",
-        (game_id,)
+    db.executemany(
+        "INSERT OR REPLACE INTO reveal_snapshots (game_id, snapshot_key, body) VALUES (?, ?, ?)",
+        [(game_id, key, body) for key, body in entries.items()]
     )
     db.commit()
+
+
+def get_reveal_snapshot(game_id, snapshot_key):
+    """Get one stored reveal response body (JSON text), or None."""
+    if _store is not None:
+        return _store.get_reveal_snapshot(game_id, snapshot_key)
+    db = get_db()
+    row = db.execute(
+        "SELECT body FROM reveal_snapshots WHERE game_id = ? AND snapshot_key = ?",
+        (game_id, snapshot_key)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def reset_game(game_id):
+    """Reset a game back to lobby: clear swaps, flags, team assignments, reveal snapshot, and phase."""
+    if _store is not None:
+        _store.reset_game(game_id)
+    else:
+        db = get_db()
+        db.execute("DELETE FROM swaps WHERE game_id = ?", (game_id,))
+        db.execute("DELETE FROM flags WHERE game_id = ?", (game_id,))
+        db.execute("DELETE FROM reveal_snapshots WHERE game_id = ?", (game_id,))
+        db.execute(
+            "UPDATE teams SET fabrication_brief = NULL, verification_brief = NULL, fabrication_team = NULL WHERE game_id = ?",
+            (game_id,)
+        )
+        db.execute(
+            "UPDATE games SET phase = 'lobby', timer_end = NULL, version = version + 1 WHERE game_id = ?",
+            (game_id,)
+        )
+        _log_event(db, game_id, 'game_reset', {})
+        db.commit()
+    _invalidate_game_tokens(game_id)
+    notify_game_change(game_id)
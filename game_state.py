@@ -2,53 +2,475 @@
 
 import json
 import os
-import copy
 import random
 import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, namedtuple
+from itertools import count
+from dataclasses import dataclass, fields, replace
+from types import MappingProxyType
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
 
-# In-memory caches
-_briefs_cache = {}
-_hallucinations_cache = {}
+# Maximum number of rendered (swapped) briefs kept in memory
+RENDER_CACHE_SIZE = 256
+
+# Approximate memory the loaded-brief cache may hold (briefs, hallucinations
+# and option indexes); least recently used briefs are evicted past this
+BRIEF_CACHE_BYTES = int(float(os.environ.get('GAME_BRIEF_CACHE_MB', '64')) * 1024 * 1024)
+
+# How often a cached brief's files are re-stat'ed for changes on disk
+BRIEF_RECHECK_SECONDS = 5.0
+
+# One hallucination option with the citation and type it belongs to
+OptionRecord = namedtuple('OptionRecord', ['citation_id', 'citation', 'hallucination_type', 'option'])
+
+
+# ── Brief model ──────────────────────────────────────────────────────────────
+# Loaded briefs and hallucinations are immutable slotted records instead of the
+# JSON dicts they come from, so rendered briefs and other threads share them
+# without copying, and each takes a fraction of a dict's memory. A key absent
+# from the JSON is None on the record; keys a record doesn't define (and
+# explicit nulls) are kept in extra, so to_json() gives back exactly the object
+# it was built from. Dict-valued fields (extra, HallucinatedCitation.options)
+# are read-only MappingProxyType views. app.py's JSON provider serializes
+# records via to_json(), which builds the whole plain-dict tree in one pass on
+# each call; nothing is cached, so records stay smaller than the dicts.
+
+class Record(ABC):
+    """Base of the brief model's records."""
+
+    __slots__ = ()
+    _CHILDREN = {}  # field -> function converting that field's JSON value
+
+    @classmethod
+    def from_json(cls, data):
+        """Build a record from a JSON object."""
+        if data.keys() <= cls._FIELD_SET and None not in data.values():
+            values = dict(data)  # the usual case: nothing for extra
+            extra = None
+        else:
+            values = {k: v for k, v in data.items() if k in cls._FIELD_SET and v is not None}
+            extra = MappingProxyType({k: v for k, v in data.items() if k not in values})
+        for key, convert in cls._CHILDREN.items():
+            if key in values:
+                values[key] = convert(values[key])
+        return cls(**values, extra=extra)
+
+    @abstractmethod
+    def to_json(self):
+        """The record as a plain JSON object, child records included.
+
+        Written out per class, as it runs for every record in every brief
+        response. Fields that are None (absent from the source JSON) are left out.
+        """
+
+
+def _record(cls):
+    """Make cls a frozen, slotted dataclass and note its JSON fields."""
+    cls = dataclass(frozen=True, slots=True)(cls)
+    cls._FIELD_SET = frozenset(f.name for f in fields(cls) if f.name != 'extra')
+    return cls
+
+
+def _with_extra(data, extra):
+    if extra:
+        data.update(extra)
+    return data
+
+
+@_record
+class Citation(Record):
+    """A citation's span within its paragraph's text."""
+    citation_id: str
+    start: int
+    end: int
+    display_text: str
+    supra: bool | None = None
+    extra: MappingProxyType | None = None
+
+    def to_json(self):
+        data = {'citation_id': self.citation_id, 'start': self.start, 'end': self.end,
+                'display_text': self.display_text}
+        if self.supra is not None:
+            data['supra'] = self.supra
+        return _with_extra(data, self.extra)
+
+
+@_record
+class Paragraph(Record):
+    """A paragraph of brief text and the citations within it."""
+    text: str
+    id: str | None = None
+    section: str | None = None
+    type: str | None = None
+    citations: tuple | None = None  # of Citation
+    extra: MappingProxyType | None = None
+
+    _CHILDREN = {'citations': lambda citations: tuple(map(Citation.from_json, citations))}
+
+    def to_json(self):
+        data = {'text': self.text}
+        if self.id is not None:
+            data['id'] = self.id
+        if self.section is not None:
+            data['section'] = self.section
+        if self.type is not None:
+            data['type'] = self.type
+        if self.citations is not None:
+            data['citations'] = [c.to_json() for c in self.citations]
+        return _with_extra(data, self.extra)
+
+
+@_record
+class Brief(Record):
+    """A brief: its caption fields and paragraphs."""
+    paragraphs: tuple  # of Paragraph
+    brief_id: str | None = None
+    title: str | None = None
+    case_name: str | None = None
+    court: str | None = None
+    docket: str | None = None
+    extra: MappingProxyType | None = None
+
+    _CHILDREN = {'paragraphs': lambda paragraphs: tuple(map(Paragraph.from_json, paragraphs))}
+
+    def to_json(self):
+        data = {'paragraphs': [p.to_json() for p in self.paragraphs]}
+        if self.brief_id is not None:
+            data['brief_id'] = self.brief_id
+        if self.title is not None:
+            data['title'] = self.title
+        if self.case_name is not None:
+            data['case_name'] = self.case_name
+        if self.court is not None:
+            data['court'] = self.court
+        if self.docket is not None:
+            data['docket'] = self.docket
+        return _with_extra(data, self.extra)
+
+
+@_record
+class Option(Record):
+    """One hallucination option: a replacement citation or a replaced text region."""
+    id: str
+    label: str | None = None
+    replacement_citation: str | None = None
+    original_text: str | None = None
+    replacement_text: str | None = None
+    difficulty: str | None = None
+    extra: MappingProxyType | None = None
+
+    def to_json(self):
+        data = {'id': self.id}
+        if self.label is not None:
+            data['label'] = self.label
+        if self.replacement_citation is not None:
+            data['replacement_citation'] = self.replacement_citation
+        if self.original_text is not None:
+            data['original_text'] = self.original_text
+        if self.replacement_text is not None:
+            data['replacement_text'] = self.replacement_text
+        if self.difficulty is not None:
+            data['difficulty'] = self.difficulty
+        return _with_extra(data, self.extra)
+
+
+@_record
+class HallucinatedCitation(Record):
+    """A citation's hallucination options by type."""
+    case_name: str | None = None
+    original_display: str | None = None
+    options: MappingProxyType | None = None  # hallucination type -> tuple of Option
+    extra: MappingProxyType | None = None
+
+    _CHILDREN = {'options': lambda options: MappingProxyType({
+        htype: tuple(map(Option.from_json, type_options)) for htype, type_options in options.items()})}
+
+    def to_json(self):
+        data = {}
+        if self.case_name is not None:
+            data['case_name'] = self.case_name
+        if self.original_display is not None:
+            data['original_display'] = self.original_display
+        if self.options is not None:
+            data['options'] = {htype: [o.to_json() for o in type_options]
+                               for htype, type_options in self.options.items()}
+        return _with_extra(data, self.extra)
+
+
+def _hallucinations_from_json(data):
+    """citation_id -> HallucinatedCitation from a hallucinations JSON file's object."""
+    return {cid: HallucinatedCitation.from_json(cite_data) for cid, cite_data in data.items()}
+
+
+# ── Loaded briefs ────────────────────────────────────────────────────────────
+# A brief and its hallucinations are loaded together into one entry of an LRU
+# cache bounded by BRIEF_CACHE_BYTES. Each entry records its approximate size,
+# estimated from the size of its JSON files, and the stamps of the files it
+# came from; an entry not checked for BRIEF_RECHECK_SECONDS is re-stat'ed on
+# its next use and reloaded (through invalidate_brief) if either file changed.
+# What is derived from a brief (render plan, citation ids) is kept on its entry,
+# so one lookup always yields a matching set, and rendered swap sets are keyed
+# by the entry's generation. Evicting a brief also drops its rendered swap
+# sets, which would otherwise keep it alive.
+
+# Memory held by a loaded brief (records, strings and option index) per byte
+# of its JSON files; measured at ~1.9 on brief_rosario
+MEMORY_PER_SOURCE_BYTE = 2
+
+
+class _LoadedBrief:
+    __slots__ = ('brief', 'hallucinations', 'option_index', 'stamp', 'size', 'checked_at',
+                 'generation', 'render_plan', 'citation_ids')
+
+    def __init__(self, brief, hallucinations, stamp):
+        self.brief = brief
+        self.hallucinations = hallucinations  # None if the brief has no hallucinations file
+        self.option_index = _build_option_index(hallucinations) if hallucinations is not None else {}
+        self.stamp = stamp
+        self.generation = next(_brief_generations)  # unique per load
+        self.render_plan = None  # compiled on first use by _render_plan()
+        self.citation_ids = None  # computed on first use by _get_citation_ids()
+        self.size = MEMORY_PER_SOURCE_BYTE * sum(s[1] for s in stamp if s is not None)
+        self.checked_at = time.monotonic()
+
+
+_brief_cache = OrderedDict()  # brief_id -> _LoadedBrief, least recently used first
+_brief_cache_lock = threading.Lock()
+_brief_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'reloads': 0}
+_brief_cache_bytes = 0
+_brief_generations = count()
+
+
+def _brief_paths(brief_id):
+    return (os.path.join(DATA_DIR, 'briefs', f'{brief_id}.json'),
+            os.path.join(DATA_DIR, 'hallucinations', f'{brief_id}.json'))
+
+
+def _brief_stamp(brief_id):
+    return tuple(_file_stamp(path) for path in _brief_paths(brief_id))
+
+
+def _read_brief(brief_id):
+    """Load a brief and its hallucinations from their JSON files."""
+    stamp = _brief_stamp(brief_id)  # before reading, so a change mid-read is seen next check
+    brief_path, hallucinations_path = _brief_paths(brief_id)
+    with open(brief_path, 'r', encoding='utf-8') as f:
+        brief = json.load(f)
+    hallucinations = None
+    if stamp[1] is not None:
+        with open(hallucinations_path, 'r', encoding='utf-8') as f:
+            hallucinations = json.load(f)
+    if hallucinations is not None:
+        hallucinations = _hallucinations_from_json(hallucinations)
+    return _LoadedBrief(Brief.from_json(brief), hallucinations, stamp)
+
+
+def _loaded_brief(brief_id):
+    """The cached _LoadedBrief for brief_id, loading it (and evicting others) on a miss."""
+    global _brief_cache_bytes
+    with _brief_cache_lock:
+        entry = _brief_cache.get(brief_id)
+        if entry is not None:
+            _brief_cache.move_to_end(brief_id)
+            if time.monotonic() - entry.checked_at < BRIEF_RECHECK_SECONDS:
+                _brief_cache_stats['hits'] += 1
+                return entry
+
+    if entry is not None:
+        if _brief_stamp(brief_id) == entry.stamp:
+            entry.checked_at = time.monotonic()
+            with _brief_cache_lock:
+                _brief_cache_stats['hits'] += 1
+            return entry
+        invalidate_brief(brief_id)
+        with _brief_cache_lock:
+            _brief_cache_stats['reloads'] += 1
+
+    entry = _read_brief(brief_id)
+    evicted = []
+    with _brief_cache_lock:
+        _brief_cache_stats['misses'] += 1
+        current = _brief_cache.get(brief_id)
+        if current is not None:
+            return current  # another thread loaded it meanwhile
+        _brief_cache[brief_id] = entry
+        _brief_cache_bytes += entry.size
+        while _brief_cache_bytes > BRIEF_CACHE_BYTES and len(_brief_cache) > 1:
+            old_id, old = _brief_cache.popitem(last=False)
+            _brief_cache_bytes -= old.size
+            _brief_cache_stats['evictions'] += 1
+            evicted.append(old_id)
+    for old_id in evicted:
+        _drop_derived(old_id)
+    return entry
 
 
 def load_brief(brief_id):
     """Load and cache a brief JSON file."""
-    if brief_id in _briefs_cache:
-        return _briefs_cache[brief_id]
-    path = os.path.join(DATA_DIR, 'briefs', f'{brief_id}.json')
-    with open(path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    _briefs_cache[brief_id] = data
-    return data
+    return _loaded_brief(brief_id).brief
 
 
 def load_hallucinations(brief_id):
     """Load and cache hallucination options for a brief."""
-    if brief_id in _hallucinations_cache:
-        return _hallucinations_cache[brief_id]
-    path = os.path.join(DATA_DIR, 'hallucinations', f'{brief_id}.json')
-    with open(path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    _hallucinations_cache[brief_id] = data
-    return data
+    hallucinations = _loaded_brief(brief_id).hallucinations
+    if hallucinations is None:
+        raise FileNotFoundError(f'No hallucinations file for {brief_id}')
+    return hallucinations
 
 
-def list_briefs():
-    """Discover available briefs from the data/briefs/ directory."""
-    briefs_dir = os.path.join(DATA_DIR, 'briefs')
-    briefs = []
-    for filename in os.listdir(briefs_dir):
-        if filename.endswith('.json') and filename.startswith('brief_'):
-            brief_id = filename[:-5]  # strip .json
-            brief = load_brief(brief_id)
-            briefs.append({
+def _build_option_index(hallucinations):
+    """Map every option_id to its OptionRecord, rejecting duplicate ids."""
+    index = {}
+    for cid, cite_data in hallucinations.items():
+        for htype, options in (cite_data.options or {}).items():
+            for option in options:
+                oid = option.id
+                if oid in index:
+                    raise ValueError(f"Duplicate hallucination option id {oid!r} "
+                                     f"(under {index[oid].citation_id} and {cid})")
+                index[oid] = OptionRecord(cid, cite_data, htype, option)
+    return index
+
+
+def find_option(brief_id, citation_id, hallucination_type, option_id):
+    """Look up a swap's hallucination option.
+
+    Returns its OptionRecord, or None unless the option exists under exactly
+    this citation and hallucination type.
+    """
+    return _find_option(_loaded_brief(brief_id), citation_id, hallucination_type, option_id)
+
+
+def _find_option(entry, citation_id, hallucination_type, option_id):
+    record = entry.option_index.get(option_id)
+    if record is None or record.citation_id != citation_id or record.hallucination_type != hallucination_type:
+        return None
+    return record
+
+
+def invalidate_brief(brief_id):
+    """Drop a brief's cached data and everything derived from it, so the next use reloads it."""
+    global _brief_cache_bytes
+    with _brief_cache_lock:
+        entry = _brief_cache.pop(brief_id, None)
+        if entry is not None:
+            _brief_cache_bytes -= entry.size
+    _drop_derived(brief_id)
+
+
+def _drop_derived(brief_id):
+    """Forget a brief's rendered swap sets."""
+    with _render_cache_lock:
+        for key in [k for k in _render_cache if k[0] == brief_id]:
+            del _render_cache[key]
+
+
+def preload_briefs():
+    """Load every cataloged brief with its option index, render plan and citation ids.
+
+    Meant for a server's parent process before it forks workers (see
+    gunicorn.conf.py), so they inherit the loaded briefs instead of each
+    loading them on first request. Stops early once BRIEF_CACHE_BYTES is
+    reached; the rest load lazily. Returns the number of briefs loaded.
+    """
+    refresh_catalog(force=True)
+    with _catalog_lock:
+        brief_ids = sorted(_catalog)
+    evictions = _brief_cache_stats['evictions']
+    loaded = 0
+    for brief_id in brief_ids:
+        entry = _loaded_brief(brief_id)
+        _render_plan(entry)
+        _citation_ids(entry)
+        if _brief_cache_stats['evictions'] != evictions:
+            break
+        loaded += 1
+    return loaded
+
+
+def brief_cache_stats():
+    """Hit/miss/eviction/reload counters and current size of the loaded-brief cache."""
+    with _brief_cache_lock:
+        return {**_brief_cache_stats, 'size': len(_brief_cache), 'bytes': _brief_cache_bytes,
+                'max_bytes': BRIEF_CACHE_BYTES}
+
+
+# ── Brief catalog ────────────────────────────────────────────────────────────
+# Titles and case names of every brief in data/briefs, so list_briefs() needn't
+# parse brief bodies. Each file is read once per version (mtime and size, plus
+# its hallucinations file's): a rescan, at most every CATALOG_RESCAN_SECONDS,
+# re-reads only new or changed files and drops a changed brief's cached body
+# and render data through invalidate_brief(). Bodies still load lazily.
+
+CATALOG_RESCAN_SECONDS = 5.0
+
+_catalog = {}  # brief_id -> {'brief_id', 'title', 'case_name', 'stamp'}
+_catalog_lock = threading.Lock()
+_catalog_scanned_at = None
+
+
+def _file_stamp(path):
+    """(mtime_ns, size) of a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def refresh_catalog(force=False):
+    """Rescan data/briefs if the last scan is older than CATALOG_RESCAN_SECONDS (or force)."""
+    global _catalog_scanned_at
+
+    def fresh():
+        return (not force and _catalog_scanned_at is not None
+                and time.monotonic() - _catalog_scanned_at < CATALOG_RESCAN_SECONDS)
+
+    if fresh():
+        return
+    with _catalog_lock:
+        if fresh():
+            return  # another thread rescanned while we waited
+        briefs_dir = os.path.join(DATA_DIR, 'briefs')
+        stamps = {}
+        with os.scandir(briefs_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.name.startswith('brief_'):
+                    brief_id = entry.name[:-5]  # strip .json
+                    st = entry.stat()
+                    hallucinations_path = os.path.join(DATA_DIR, 'hallucinations', entry.name)
+                    stamps[brief_id] = (st.st_mtime_ns, st.st_size, _file_stamp(hallucinations_path))
+
+        for brief_id in [b for b in _catalog if b not in stamps]:
+            del _catalog[brief_id]
+            invalidate_brief(brief_id)
+        for brief_id in sorted(stamps):
+            entry = _catalog.get(brief_id)
+            if entry is not None and entry['stamp'] == stamps[brief_id]:
+                continue
+            if entry is not None:
+                invalidate_brief(brief_id)
+            with open(os.path.join(briefs_dir, f'{brief_id}.json'), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            _catalog[brief_id] = {
                 'brief_id': brief_id,
-                'title': brief.get('title', brief_id),
-                'case_name': brief.get('case_name', ''),
-            })
-    return briefs
+                'title': data.get('title', brief_id),
+                'case_name': data.get('case_name', ''),
+                'stamp': stamps[brief_id],
+            }
+        _catalog_scanned_at = time.monotonic()
+
+
+def list_briefs():
+    """Available briefs from the catalog, by brief_id."""
+    refresh_catalog()
+    with _catalog_lock:
+        entries = sorted(_catalog.values(), key=lambda e: e['brief_id'])
+    return [{'brief_id': e['brief_id'], 'title': e['title'], 'case_name': e['case_name']} for e in entries]
 
 
 def generate_random_swaps(brief_id, num_swaps):
@@ -68,11 +490,11 @@ def generate_random_swaps(brief_id, num_swaps):
     pools = {t: [] for t in TYPES}
 
     for cid, cite_data in hallucinations.items():
-        options = cite_data.get('options', {})
+        options = cite_data.options or {}
         for htype in TYPES:
-            type_options = options.get(htype, [])
+            type_options = options.get(htype, ())
             for opt in type_options:
-                pools[htype].append((cid, htype, opt['id']))
+                pools[htype].append((cid, htype, opt.id))
 
     # Shuffle each pool
     for t in TYPES:
@@ -159,141 +581,241 @@ def _replace_supra_case(supra_display, old_case_name, new_case_name):
     return supra_display
 
 
+# ── Render plans ─────────────────────────────────────────────────────────────
+# Each brief is compiled once into per-paragraph segments, split at every
+# citation span and every text region targeted by mischaracterization /
+# misquotation options. Every option is reduced to the segment texts it
+# replaces, so rendering a swap set only substitutes segments and re-joins the
+# paragraphs it touches; untouched paragraphs are shared with the cached brief.
+# A brief's plan is kept on its _LoadedBrief entry.
+
+# Rendered briefs, keyed by (brief_id, generation of the loaded brief, option
+# ids in citation order). Every load gets a new generation, so a render of a
+# brief since reloaded can never be served afterwards. Cached briefs are
+# immutable Brief records, shared as is.
+_render_cache = OrderedDict()
+_render_cache_lock = threading.Lock()
+_render_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+class _RenderPlan:
+    """A brief compiled for rendering swap sets.
+
+    segments[i] is paragraph i as a list of (text, cite_index) pairs, where
+    cite_index is the position in the paragraph's citations list for citation
+    segments and None otherwise. overrides maps each option_id to the
+    (para_index, segment_index, text) replacements that option makes.
+    """
+
+    __slots__ = ('segments', 'overrides')
+
+    def __init__(self, segments, overrides):
+        self.segments = segments
+        self.overrides = overrides
+
+
+def _spans_overlap(a, b):
+    return a[0] < b[1] and b[0] < a[1]
+
+
+def _compile_render_plan(brief, hallucinations):
+    """Compile a brief and its hallucination options into a _RenderPlan.
+
+    Raises ValueError for an option whose text region overlaps a citation:
+    replacing it would break the citation's span, and leaving it out would
+    score a swap verifiers can't see. scripts/validate_brief.py reports these.
+    """
+    paragraphs = brief.paragraphs
+    cite_spans = [[(c.start, c.end) for c in para.citations or ()] for para in paragraphs]
+
+    # Locate each text-region option once, in the first paragraph containing it
+    option_regions = {}
+    region_bounds = [set() for _ in paragraphs]
+    for cid, cite_data in hallucinations.items():
+        for htype, options in (cite_data.options or {}).items():
+            for option in options:
+                if option.replacement_text is None or option.original_text is None:
+                    continue
+                old_text = option.original_text
+                for pi, para in enumerate(paragraphs):
+                    idx = para.text.find(old_text)
+                    if idx < 0:
+                        continue
+                    span = (idx, idx + len(old_text))
+                    if any(_spans_overlap(span, s) for s in cite_spans[pi]):
+                        raise ValueError(f"Option {option.id!r} replaces text overlapping a citation "
+                                         f"in paragraph {pi if para.id is None else para.id}")
+                    option_regions[option.id] = (pi, span)
+                    region_bounds[pi].update(span)
+                    break
+
+    # Split each paragraph at every citation and region boundary. Citations
+    # become single segments; a region may cover several consecutive segments,
+    # since different citations' regions can overlap.
+    segments = []
+    segment_starts = []  # per paragraph: text offset -> segment index
+    primary_slots = {}  # citation_id -> [(para_index, segment_index)]
+    supra_slots = {}  # citation_id -> [(para_index, segment_index, display_text)]
+    for pi, para in enumerate(paragraphs):
+        text = para.text
+        citations = para.citations or ()
+        cite_at = {c.start: i for i, c in enumerate(citations)}
+        bounds = {0, len(text)} | region_bounds[pi]
+        for start, end in cite_spans[pi]:
+            bounds.update((start, end))
+        points = sorted(bounds)
+
+        segs = []
+        starts = {}
+        for start, end in zip(points, points[1:]):
+            cite_index = cite_at.get(start)
+            if cite_index is not None:
+                cite = citations[cite_index]
+                if cite.end != end:
+                    raise ValueError(f"Overlapping citation spans in paragraph {pi if para.id is None else para.id}")
+                if cite.supra:
+                    supra_slots.setdefault(cite.citation_id, []).append((pi, len(segs), cite.display_text))
+                else:
+                    primary_slots.setdefault(cite.citation_id, []).append((pi, len(segs)))
+            starts[start] = len(segs)
+            segs.append((text[start:end], cite_index))
+        starts[len(text)] = len(segs)
+        segments.append(segs)
+        segment_starts.append(starts)
+
+    # Reduce every option to the segment texts it replaces
+    overrides = {}
+    for cid, cite_data in hallucinations.items():
+        old_case = cite_data.case_name or ''
+        for htype, options in (cite_data.options or {}).items():
+            for option in options:
+                oid = option.id
+                changes = []
+                if option.replacement_citation is not None:
+                    # Only the primary (non-supra) citation takes the new text...
+                    new_text = option.replacement_citation
+                    changes.extend((pi, si, new_text) for pi, si in primary_slots.get(cid, []))
+                    # ...and supra references follow the new case name
+                    new_case = _extract_case_name(new_text)
+                    if changes and old_case and new_case and old_case != new_case:
+                        for pi, si, old_display in supra_slots.get(cid, []):
+                            new_display = _replace_supra_case(old_display, old_case, new_case)
+                            if new_display != old_display:
+                                changes.append((pi, si, new_display))
+                if oid in option_regions:
+                    pi, (start, end) = option_regions[oid]
+                    first, last = segment_starts[pi][start], segment_starts[pi][end]
+                    changes.append((pi, first, option.replacement_text))
+                    changes.extend((pi, si, '') for si in range(first + 1, last))
+                overrides[oid] = changes
+
+    return _RenderPlan(segments, overrides)
+
+
+def _render_plan(entry):
+    """A loaded brief's render plan, compiling it on first use."""
+    plan = entry.render_plan
+    if plan is None:
+        plan = entry.render_plan = _compile_render_plan(entry.brief, entry.hallucinations or {})
+    return plan
+
+
+def _render_paragraph(para, segments, slot_texts):
+    """Assemble a paragraph from its segments, substituting slot_texts by segment index."""
+    citations = para.citations or ()
+    new_citations = list(citations)
+    parts = []
+    pos = 0
+    for si, (text, cite_index) in enumerate(segments):
+        text = slot_texts.get(si, text)
+        if cite_index is not None:
+            cite = citations[cite_index]
+            new_citations[cite_index] = Citation(cite.citation_id, pos, pos + len(text),
+                                                 slot_texts.get(si, cite.display_text), cite.supra, cite.extra)
+        parts.append(text)
+        pos += len(text)
+    return Paragraph(''.join(parts), para.id, para.section, para.type, tuple(new_citations), para.extra)
+
+
 def get_brief_for_display(brief_id, swaps=None):
     """Get brief data suitable for display, optionally with swaps applied.
 
+    Rendered briefs are cached per swap set and share unmodified Paragraph
+    records with the cached brief; records are immutable, so this is safe.
+
     Args:
         brief_id: The brief to load
         swaps: List of swap dicts with citation_id, hallucination_type, option_id
 
     Returns:
-        Brief data with swaps applied if provided
+        The Brief with swaps applied if provided
     """
-    brief = load_brief(brief_id)
+    entry = _loaded_brief(brief_id)  # the brief, its options and its plan, from one load
+    brief = entry.brief
     if not swaps:
         return brief
 
-    hallucinations = load_hallucinations(brief_id)
-    modified = copy.deepcopy(brief)
-
-    # Build swap lookup: citation_id -> option details
-    swap_lookup = {}
+    # One option per citation (a later swap for the same citation wins),
+    # applied in citation order so equal swap sets render identically
+    chosen = {}
     for swap in swaps:
-        cid = swap['citation_id']
-        htype = swap['hallucination_type']
-        oid = swap['option_id']
-
-        cite_data = hallucinations.get(cid)
-        if not cite_data:
-            continue
-        type_options = cite_data.get('options', {}).get(htype, [])
-        option = next((o for o in type_options if o['id'] == oid), None)
-        if option:
-            swap_lookup[cid] = {
-                'option': option,
-                'type': htype,
-                'original_display': cite_data.get('original_display', '')
-            }
-
-    # Apply swaps to paragraphs
-    # First pass: citation text replacements (within the citation's own paragraph)
-    supra_case_updates = {}  # cid -> new_case_name (for supra pass)
-
-    for para in modified['paragraphs']:
-        if not para.get('citations'):
-            continue
-
-        # Sort citations right-to-left by start offset to preserve positions
-        sorted_cites = sorted(para['citations'], key=lambda c: c['start'], reverse=True)
-
-        any_replaced = False
-        for cite in sorted_cites:
-            cid = cite['citation_id']
-            if cid not in swap_lookup:
-                continue
-
-            swap_info = swap_lookup[cid]
-            option = swap_info['option']
+        if _find_option(entry, swap['citation_id'], swap['hallucination_type'], swap['option_id']):
+            chosen[swap['citation_id']] = swap['option_id']
+    options = tuple(oid for _, oid in sorted(chosen.items()))
+    if not options:
+        return brief
 
-            if 'replacement_citation' in option:
-                # Simple citation text replacement — only on the primary (non-supra) citation
-                if cite.get('supra'):
-                    continue
-                old_text = cite['display_text']
-                new_text = option['replacement_citation']
-                text = para['text']
-                start = cite['start']
-                end = cite['end']
-                para['text'] = text[:start] + new_text + text[end:]
-                # Update citation span
-                cite['display_text'] = new_text
-                cite['end'] = start + len(new_text)
-                any_replaced = True
-
-                # Track for supra updates
-                if cid not in supra_case_updates:
-                    old_case = hallucinations.get(cid, {}).get('case_name', '')
-                    new_case = _extract_case_name(new_text)
-                    if old_case and new_case and old_case != new_case:
-                        supra_case_updates[cid] = new_case
-
-        # Recalculate offsets for all citations after text length changes
-        if any_replaced:
-            _recalculate_offsets(para)
-
-    # Supra pass: update supra references when their primary was swapped
-    for para in modified['paragraphs']:
-        any_changed = False
-        for cite in para.get('citations', []):
-            if not cite.get('supra') or cite['citation_id'] not in supra_case_updates:
-                continue
-            cid = cite['citation_id']
-            old_case = hallucinations.get(cid, {}).get('case_name', '')
-            new_case = supra_case_updates[cid]
-            old_display = cite['display_text']
-            new_display = _replace_supra_case(old_display, old_case, new_case)
-            if new_display != old_display:
-                para['text'] = para['text'].replace(old_display, new_display, 1)
-                cite['display_text'] = new_display
-                any_changed = True
-        if any_changed:
-            _recalculate_offsets(para)
-
-    # Second pass: text region replacements (search all paragraphs)
-    applied_swaps = set()
-    for cid, swap_info in swap_lookup.items():
-        option = swap_info['option']
-        if 'replacement_text' not in option or 'original_text' not in option:
+    cache_key = (brief_id, entry.generation, options)
+    with _render_cache_lock:
+        rendered = _render_cache.get(cache_key)
+        if rendered is not None:
+            _render_cache.move_to_end(cache_key)
+            _render_cache_stats['hits'] += 1
+            return rendered
+        _render_cache_stats['misses'] += 1
+
+    rendered = _render_swaps(brief, _render_plan(entry), options)
+
+    with _render_cache_lock:
+        _render_cache[cache_key] = rendered
+        _render_cache.move_to_end(cache_key)
+        while len(_render_cache) > RENDER_CACHE_SIZE:
+            _render_cache.popitem(last=False)
+            _render_cache_stats['evictions'] += 1
+    return rendered
+
+
+def _render_swaps(brief, plan, options):
+    """Apply the given option ids to a brief."""
+    # Collect segment replacements per paragraph. If two options' regions
+    # overlap, the first one applied wins and the other is skipped whole.
+    slot_texts = {}
+    for oid in options:
+        changes = plan.overrides[oid]
+        if any(si in slot_texts.get(pi, ()) for pi, si, _ in changes):
             continue
+        for pi, si, text in changes:
+            slot_texts.setdefault(pi, {})[si] = text
 
-        old_text = option['original_text']
-        new_text = option['replacement_text']
-
-        for para in modified['paragraphs']:
-            idx = para['text'].find(old_text)
-            if idx >= 0:
-                para['text'] = para['text'][:idx] + new_text + para['text'][idx + len(old_text):]
-                _recalculate_offsets(para)
-                applied_swaps.add(cid)
-                break
+    paragraphs = list(brief.paragraphs)
+    for pi, texts in slot_texts.items():
+        paragraphs[pi] = _render_paragraph(paragraphs[pi], plan.segments[pi], texts)
 
-    return modified
+    return replace(brief, paragraphs=tuple(paragraphs))
 
 
-def _recalculate_offsets(para):
-    """Recalculate citation offsets after text replacement."""
-    for cite in para.get('citations', []):
-        text = para['text']
-        display = cite['display_text']
-        idx = text.find(display)
-        if idx >= 0:
-            cite['start'] = idx
-            cite['end'] = idx + len(display)
+def render_cache_stats():
+    """Hit/miss/eviction counters and current size of the rendered-brief cache."""
+    with _render_cache_lock:
+        return {**_render_cache_stats, 'size': len(_render_cache), 'max_size': RENDER_CACHE_SIZE}
 
 
 def compute_scores(game_id, teams, swaps_by_team, flags_by_team, brief_id):
     """Compute scores for all teams.
 
+    Runs in time linear in teams x citations: verifiers are found through a
+    fabrication_team -> verifier map rather than by scanning every team pair.
+
     Args:
         game_id: The game ID
         teams: List of team dicts
@@ -304,14 +826,30 @@ def compute_scores(game_id, teams, swaps_by_team, flags_by_team, brief_id):
     Returns:
         Dict with per-team scores and citation-level details
     """
-    brief = load_brief(brief_id)
-    hallucinations = load_hallucinations(brief_id)
-
-    # Get all citation IDs from the brief
-    all_citation_ids = set()
-    for para in brief['paragraphs']:
-        for cite in para.get('citations', []):
-            all_citation_ids.add(cite['citation_id'])
+    citation_ids = _get_citation_ids(brief_id)
+
+    # Each team's final verdict per citation, and swapped citation set
+    verdicts_by_team = {
+        tid: {f['citation_id']: f['verdict'] for f in flags}
+        for tid, flags in flags_by_team.items()
+    }
+    swapped_by_team = {
+        tid: {s['citation_id'] for s in swaps}
+        for tid, swaps in swaps_by_team.items()
+    }
+
+    # fabrication_team -> verdicts of the team(s) that verified it
+    # (with several verifiers, later teams' verdicts win per citation)
+    verifier_verdicts = {}
+    for team in teams:
+        fab_team = team.get('fabrication_team')
+        if not fab_team:
+            continue
+        verdicts = verdicts_by_team.get(team['team_id'], {})
+        if fab_team in verifier_verdicts:
+            verifier_verdicts[fab_team] = {**verifier_verdicts[fab_team], **verdicts}
+        else:
+            verifier_verdicts[fab_team] = verdicts
 
     results = {}
 
@@ -320,24 +858,10 @@ def compute_scores(game_id, teams, swaps_by_team, flags_by_team, brief_id):
         tname = team['team_name']
         fab_team = team.get('fabrication_team')
 
-        # Get this team's swaps (what they fabricated)
         team_swaps = swaps_by_team.get(tid, [])
-        swapped_cids = {s['citation_id'] for s in team_swaps}
-
-        # Get this team's flags (what they flagged during verification)
         team_flags = flags_by_team.get(tid, [])
-        flag_lookup = {}
-        for f in team_flags:
-            flag_lookup[f['citation_id']] = f['verdict']
-
-        # Find the team that verified this team's fabrications
-        verifying_flags = {}
-        for other_team in teams:
-            if other_team.get('fabrication_team') == tid:
-                # This other team verified our fabrications
-                other_flags = flags_by_team.get(other_team['team_id'], [])
-                for f in other_flags:
-                    verifying_flags[f['citation_id']] = f['verdict']
+        flag_lookup = verdicts_by_team.get(tid, {})
+        verifying_flags = verifier_verdicts.get(tid, {})
 
         # Fabrication scoring: +2 undetected, +0 caught
         fab_score = 0
@@ -345,49 +869,31 @@ def compute_scores(game_id, teams, swaps_by_team, flags_by_team, brief_id):
         for s in team_swaps:
             cid = s['citation_id']
             htype = s['hallucination_type']
-            oid = s['option_id']
-            verifier_verdict = verifying_flags.get(cid, 'skip')
-            caught = verifier_verdict == 'fake'
+            caught = verifying_flags.get(cid, 'skip') == 'fake'
             points = 0 if caught else 2
             fab_score += points
 
-            # Get option label
-            label = ''
-            cite_data = hallucinations.get(cid, {})
-            for opt in cite_data.get('options', {}).get(htype, []):
-                if opt['id'] == oid:
-                    label = opt.get('label', '')
-                    break
-
+            record = find_option(brief_id, cid, htype, s['option_id'])
             fab_details.append({
                 'citation_id': cid,
                 'hallucination_type': htype,
-                'option_label': label,
+                'option_label': (record.option.label or '') if record else '',
                 'caught': caught,
                 'points': points
             })
 
-        # Verification scoring: +2 correct flag, -1 wrong flag, 0 skip
+        # Verification scoring: +2 correct flag, -1 wrong flag, 0 legit or skip,
+        # against the citations swapped by the team we're verifying
+        fab_team_swapped_cids = swapped_by_team.get(fab_team, set()) if fab_team else set()
         ver_score = 0
         ver_details = []
-
-        # We need to know which citations were swapped by the team we're verifying
-        fab_team_swaps = swaps_by_team.get(fab_team, []) if fab_team else []
-        fab_team_swapped_cids = {s['citation_id'] for s in fab_team_swaps}
-
-        for cid in sorted(all_citation_ids):
+        for cid in citation_ids:
             verdict = flag_lookup.get(cid, 'skip')
             is_fake = cid in fab_team_swapped_cids
-
             if verdict == 'fake':
-                if is_fake:
-                    points = 2  # Correctly caught
-                else:
-                    points = -1  # Wrong flag
-            elif verdict == 'legit':
-                points = 0  # No points for legit
+                points = 2 if is_fake else -1
             else:
-                points = 0  # Skip
+                points = 0
 
             ver_score += points
             ver_details.append({
@@ -405,7 +911,21 @@ def compute_scores(game_id, teams, swaps_by_team, flags_by_team, brief_id):
             'fabrication_details': fab_details,
             'verification_details': ver_details,
             'swaps_made': len(team_swaps),
-            'flags_made': len([f for f in team_flags if flag_lookup.get(f['citation_id']) == 'fake'])
+            'flags_made': sum(1 for f in team_flags if flag_lookup.get(f['citation_id']) == 'fake')
         }
 
     return results
+
+
+def _get_citation_ids(brief_id):
+    """Sorted unique citation ids in a brief (supra references share their primary's id)."""
+    return _citation_ids(_loaded_brief(brief_id))
+
+
+def _citation_ids(entry):
+    citation_ids = entry.citation_ids
+    if citation_ids is None:
+        citation_ids = entry.citation_ids = sorted({cite.citation_id
+                                                    for para in entry.brief.paragraphs
+                                                    for cite in para.citations or ()})
+    return citation_ids
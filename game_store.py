@@ -0,0 +1,408 @@
+"""In-memory game state for the memory engine (GAME_DB_ENGINE=memory).
+
+GameStore holds every game's rows in dicts and answers database.py's reads
+without touching SQLite. Each mutation is queued for the game_events log
+through the ``append`` callable and applied under the game's lock, then
+waited on outside it, so concurrent writes to one game share a write-behind
+group commit; replaying the log at startup rebuilds the same state. If an
+append fails, the game is rebuilt from what the log did commit.
+
+Rows are plain dicts with the same keys as the SQLite tables. They are shared
+between callers and never modified in place: a write replaces the row (and
+any dict that holds rows) with a new one, so readers need no lock and a row
+they already hold never changes under them, just like a sqlite3.Row.
+"""
+
+import sqlite3
+import threading
+import time
+
+
+def sqlite_timestamp():
+    """Current UTC time in SQLite's CURRENT_TIMESTAMP format."""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+
+
+def _foreign_key_failed():
+    return sqlite3.IntegrityError('FOREIGN KEY constraint failed')
+
+
+class GameRevealed(Exception):
+    """A swap or flag write to a game already in reveal, whose results are frozen."""
+
+
+class _Game:
+    """One game's rows; swaps and flags are {team_id: {citation_id: row}}."""
+
+    __slots__ = ('game_id', 'row', 'teams', 'players', 'swaps', 'flags', 'snapshots', 'seq', 'lock')
+
+    def __init__(self, row):
+        self.game_id = row['game_id']
+        self.row = row
+        self.teams = {}
+        self.players = {}
+        self.swaps = {}
+        self.flags = {}
+        self.snapshots = {}
+        self.seq = 0
+        self.lock = threading.Lock()
+
+
+class GameStore:
+    """All games' live state, logged through append(game_id, seq, kind, data).
+
+    append starts the write and returns a function that waits for it to be
+    committed (raising if it failed). read_log(game_id) returns the game's
+    committed (kind, data) events, oldest first.
+    """
+
+    def __init__(self, append, read_log):
+        self._append = append
+        self._read_log = read_log
+        self._games = {}
+        self._codes = {}
+        self._team_games = {}
+        self._player_games = {}
+        self._tokens = {}
+        self._create_lock = threading.Lock()
+
+    # ── Log ──────────────────────────────────────────────────────────────────
+
+    def replay(self, events):
+        """Rebuild state from (game_id, seq, kind, data) events in per-game seq order.
+
+        Events of a game whose log doesn't start with game_created are
+        skipped, and so are changes to teams or players the log never created.
+        """
+        for game_id, seq, kind, data in events:
+            if kind == 'game_created':
+                game = self._add_game(game_id, data)
+            else:
+                game = self._games.get(game_id)
+                if game is None:
+                    continue
+                self._apply(game, kind, data)
+            game.seq = seq
+
+    def _record(self, game, kind, data, play=False):
+        """Log an event for an existing game and apply it.
+
+        The append is queued and the event applied under the game's lock, so
+        events reach the log in seq order; the wait for the commit happens
+        outside it. play marks swap and flag writes, which raise GameRevealed
+        once the game is in reveal.
+        """
+        with game.lock:
+            if play and game.row['phase'] == 'reveal':
+                raise GameRevealed(game.game_id)
+            seq = game.seq + 1
+            committed = self._append(game.game_id, seq, kind, data)
+            self._apply(game, kind, data)
+            game.seq = seq  # after applying: readers take cursors from it without the lock
+        try:
+            committed()
+        except Exception:
+            try:
+                self._reload(game)
+            except Exception:
+                pass  # log unreadable for now (e.g. the writer timed out): the write may yet commit
+            raise
+
+    def _reload(self, game):
+        """Rebuild a game from its committed log after an append failed.
+
+        seq and version never go back, so neither a cursor nor an ETag handed
+        out for the lost state can match a later one.
+        """
+        with game.lock:
+            events = self._read_log(game.game_id)
+            for team_id in game.teams:
+                self._team_games.pop(team_id, None)
+            for player in game.players.values():
+                self._player_games.pop(player['player_id'], None)
+                self._tokens.pop(player['session_token'], None)
+            version = game.row['version']
+            game.teams, game.players, game.swaps, game.flags = {}, {}, {}, {}
+            for kind, data in events:
+                if kind == 'game_created':
+                    game.row = self._new_row(game.game_id, data)
+                else:
+                    self._apply(game, kind, data)
+            game.row = {**game.row, 'version': version + 1}
+
+    def _apply(self, game, kind, data):
+        getattr(self, '_apply_' + kind)(game, data)
+        game.row = {**game.row, 'version': game.row['version'] + 1}
+
+    @staticmethod
+    def _new_row(game_id, data):
+        return {
+            'game_id': game_id, 'game_code': data['game_code'], 'phase': 'lobby',
+            'timer_end': None, 'brief_id': None, 'mode': data['mode'], 'version': 0,
+            'created_at': data['created_at'],
+        }
+
+    def _add_game(self, game_id, data):
+        game = _Game(self._new_row(game_id, data))
+        self._games[game_id] = game
+        self._codes[data['game_code']] = game_id
+        return game
+
+    def _apply_phase_set(self, game, data):
+        game.row = {**game.row, 'phase': data['phase'], 'timer_end': data['timer_end']}
+
+    def _apply_brief_set(self, game, data):
+        game.row = {**game.row, 'brief_id': data['brief_id']}
+
+    def _apply_team_created(self, game, data):
+        team = {
+            'team_id': data['team_id'], 'game_id': game.game_id, 'team_name': data['team_name'],
+            'fabrication_brief': None, 'verification_brief': None, 'fabrication_team': None,
+        }
+        game.teams = {**game.teams, team['team_id']: team}
+        self._team_games[team['team_id']] = game.game_id
+
+    def _apply_team_briefs_set(self, game, data):
+        if data['team_id'] not in game.teams:
+            return
+        team = {**game.teams[data['team_id']], 'fabrication_brief': data['fabrication_brief'],
+                'verification_brief': data['verification_brief'],
+                'fabrication_team': data['fabrication_team']}
+        game.teams = {**game.teams, team['team_id']: team}
+
+    def _apply_player_created(self, game, data):
+        player = {
+            'player_id': data['player_id'], 'game_id': game.game_id, 'team_id': None,
+            'player_name': data['player_name'], 'session_token': data['session_token'],
+            'is_professor': data['is_professor'], 'created_at': data['created_at'],
+        }
+        game.players = {**game.players, player['player_id']: player}
+        self._player_games[player['player_id']] = game.game_id
+        self._tokens[player['session_token']] = player['player_id']
+
+    def _apply_player_assigned(self, game, data):
+        if data['player_id'] not in game.players:
+            return
+        player = {**game.players[data['player_id']], 'team_id': data['team_id']}
+        game.players = {**game.players, player['player_id']: player}
+
+    def _apply_swaps_changed(self, game, data):
+        team_id = data['team_id']
+        swaps = dict(game.swaps.get(team_id, {}))
+        for change in data['changes']:
+            if change.get('unswap'):
+                swaps.pop(change['citation_id'], None)
+            else:
+                swaps[change['citation_id']] = {
+                    'game_id': game.game_id, 'team_id': team_id,
+                    'citation_id': change['citation_id'],
+                    'hallucination_type': change['hallucination_type'],
+                    'option_id': change['option_id'], 'created_at': data['created_at'],
+                }
+        game.swaps = {**game.swaps, team_id: swaps}
+
+    def _apply_flags_set(self, game, data):
+        team_id = data['team_id']
+        flags = dict(game.flags.get(team_id, {}))
+        for citation_id, verdict in data['flags']:
+            flags[citation_id] = {
+                'game_id': game.game_id, 'team_id': team_id, 'citation_id': citation_id,
+                'verdict': verdict, 'created_at': data['created_at'],
+            }
+        game.flags = {**game.flags, team_id: flags}
+
+    def _apply_game_reset(self, game, data):
+        game.swaps = {}
+        game.flags = {}
+        game.snapshots = {}
+        game.teams = {
+            team_id: {**team, 'fabrication_brief': None, 'verification_brief': None,
+                      'fabrication_team': None}
+            for team_id, team in game.teams.items()
+        }
+        game.row = {**game.row, 'phase': 'lobby', 'timer_end': None}
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+    # Same checks and no-op cases as the SQL in database.py: writes against an
+    # unknown team raise IntegrityError like the foreign keys do, and updates
+    # that would match no row change nothing.
+
+    def create_game(self, game_id, game_code, mode):
+        data = {'game_code': game_code, 'mode': mode, 'created_at': sqlite_timestamp()}
+        with self._create_lock:
+            if game_code in self._codes:
+                raise sqlite3.IntegrityError('UNIQUE constraint failed: games.game_code')
+            self._append(game_id, 1, 'game_created', data)()  # games are rare: wait here
+            self._add_game(game_id, data).seq = 1
+
+    def set_game_phase(self, game_id, phase, timer_end):
+        game = self._games.get(game_id)
+        if game:
+            self._record(game, 'phase_set', {'phase': phase, 'timer_end': timer_end})
+
+    def set_game_brief(self, game_id, brief_id):
+        game = self._games.get(game_id)
+        if game:
+            self._record(game, 'brief_set', {'brief_id': brief_id})
+
+    def create_team(self, game_id, team_id, team_name):
+        game = self._games.get(game_id)
+        if not game:
+            raise _foreign_key_failed()
+        self._record(game, 'team_created', {'team_id': team_id, 'team_name': team_name})
+
+    def assign_player_team(self, player_id, team_id):
+        """Returns the player's game_id, or None if the player doesn't exist."""
+        game = self._games.get(self._player_games.get(player_id))
+        if not game:
+            return None
+        if team_id is not None and team_id not in self._team_games:
+            raise _foreign_key_failed()
+        self._record(game, 'player_assigned', {'player_id': player_id, 'team_id': team_id})
+        return game.game_id
+
+    def set_team_briefs(self, team_id, fabrication_brief, verification_brief, fabrication_team):
+        game = self._games.get(self._team_games.get(team_id))
+        if game:
+            self._record(game, 'team_briefs_set', {
+                'team_id': team_id, 'fabrication_brief': fabrication_brief,
+                'verification_brief': verification_brief, 'fabrication_team': fabrication_team,
+            })
+
+    def create_player(self, game_id, player_id, player_name, session_token, is_professor):
+        game = self._games.get(game_id)
+        if not game:
+            raise _foreign_key_failed()
+        self._record(game, 'player_created', {
+            'player_id': player_id, 'player_name': player_name, 'session_token': session_token,
+            'is_professor': 1 if is_professor else 0, 'created_at': sqlite_timestamp(),
+        })
+
+    def apply_swap_changes(self, game_id, team_id, changes):
+        game = self._games.get(game_id)
+        if not game:
+            if any(not c.get('unswap') for c in changes):
+                raise _foreign_key_failed()
+            return
+        if team_id not in self._team_games and any(not c.get('unswap') for c in changes):
+            raise _foreign_key_failed()
+        changes = [
+            {'citation_id': c['citation_id'], 'unswap': True} if c.get('unswap') else
+            {'citation_id': c['citation_id'], 'hallucination_type': c['hallucination_type'],
+             'option_id': c['option_id']}
+            for c in changes
+        ]
+        self._record(game, 'swaps_changed',
+                     {'team_id': team_id, 'changes': changes, 'created_at': sqlite_timestamp()}, play=True)
+
+    def upsert_flags(self, game_id, team_id, flags):
+        game = self._games.get(game_id)
+        if flags and (not game or team_id not in self._team_games):
+            raise _foreign_key_failed()
+        if not game:
+            return
+        self._record(game, 'flags_set', {
+            'team_id': team_id, 'flags': [[cid, verdict] for cid, verdict in flags],
+            'created_at': sqlite_timestamp(),
+        }, play=True)
+
+    def reset_game(self, game_id):
+        game = self._games.get(game_id)
+        if game:
+            self._record(game, 'game_reset', {})
+
+    def save_reveal_snapshot(self, game_id, entries):
+        """Keep reveal snapshots in memory only; they are rebuilt on demand after a restart."""
+        game = self._games.get(game_id)
+        if entries and not game:
+            raise _foreign_key_failed()
+        if game:
+            with game.lock:
+                game.snapshots = {**game.snapshots, **entries}
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def game_ids(self):
+        """Ids of every game in the store, oldest log first."""
+        return list(self._games)
+
+    def get_event_seq(self, game_id):
+        """Seq of the game's latest applied event, or 0 if there is no such game."""
+        game = self._games.get(game_id)
+        return game.seq if game else 0
+
+    def get_game_by_code(self, code):
+        game = self._games.get(self._codes.get(code.upper()))
+        return game.row if game else None
+
+    def get_game(self, game_id):
+        game = self._games.get(game_id)
+        return game.row if game else None
+
+    def get_teams(self, game_id):
+        game = self._games.get(game_id)
+        return list(game.teams.values()) if game else []
+
+    def get_team(self, team_id):
+        game = self._games.get(self._team_games.get(team_id))
+        return game.teams.get(team_id) if game else None
+
+    def get_player_by_token(self, token):
+        player_id = self._tokens.get(token)
+        game = self._games.get(self._player_games.get(player_id))
+        return game.players.get(player_id) if game else None
+
+    def get_players(self, game_id, team_id=None):
+        game = self._games.get(game_id)
+        if not game:
+            return []
+        if team_id:
+            return [p for p in game.players.values() if p['team_id'] == team_id]
+        return list(game.players.values())
+
+    def get_status_summary(self, game_id):
+        game = self._games.get(game_id)
+        if not game:
+            return [], []
+        swaps, flags = game.swaps, game.flags
+        teams = []
+        by_team = {}
+        for team in game.teams.values():
+            entry = {
+                'team_id': team['team_id'], 'team_name': team['team_name'],
+                'fabrication_team': team['fabrication_team'],
+                'swap_count': len(swaps.get(team['team_id'], ())),
+                'flag_count': sum(1 for f in flags.get(team['team_id'], {}).values()
+                                  if f['verdict'] == 'fake'),
+                'players': [],
+            }
+            by_team[team['team_id']] = entry
+            teams.append(entry)
+
+        unassigned = []
+        for p in game.players.values():
+            entry = {'player_id': p['player_id'], 'player_name': p['player_name']}
+            if p['team_id'] in by_team:
+                by_team[p['team_id']]['players'].append(entry)
+            elif not p['team_id'] and not p['is_professor']:
+                unassigned.append(entry)
+
+        return teams, unassigned
+
+    def get_swaps(self, game_id, team_id):
+        game = self._games.get(game_id)
+        if not game:
+            return []
+        swaps = game.swaps.get(team_id, {})
+        return [swaps[cid] for cid in sorted(swaps)]
+
+    def get_reveal_snapshot(self, game_id, snapshot_key):
+        game = self._games.get(game_id)
+        return game.snapshots.get(snapshot_key) if game else None
+
+    def get_flags(self, game_id, team_id):
+        game = self._games.get(game_id)
+        if not game:
+            return []
+        flags = game.flags.get(team_id, {})
+        return [flags[cid] for cid in sorted(flags)]
@@ -0,0 +1,16 @@
+"""Gunicorn settings, read automatically when gunicorn starts in this directory.
+
+The app is imported once in the master (preload_app), which then sets up the
+database and loads every brief before forking, so workers start warm and share
+the loaded briefs' pages copy-on-write instead of each holding its own copy.
+Bind address, workers and threads stay on the command line (see .replit).
+"""
+
+preload_app = True
+
+
+def on_starting(server):
+    import app
+
+    loaded = app.prefork_warm_up()
+    server.log.info('Preloaded %d brief(s) before forking workers', loaded)
@@ -0,0 +1,120 @@
+"""Per-route request metrics in Prometheus text format.
+
+app.py records every request's latency, response size and SQL statement
+count here under its route rule (e.g. ``/api/citation/swap``), so label
+cardinality stays fixed however many games exist. Observing a request is a
+few bisects under one lock, cheap enough for the polling routes. Streamed
+responses (the phase stream) are timed up to the start of the stream and have
+no size.
+"""
+
+import bisect
+import threading
+
+# Bucket upper bounds; each histogram also has a +Inf bucket
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000)
+STATEMENT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+
+
+class _Histogram:
+    """Per-bucket (non-cumulative) counts plus sum and count."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Route:
+    __slots__ = ('requests', 'latency', 'size', 'statements')
+
+    def __init__(self):
+        self.requests = {}  # (method, status) -> count
+        self.latency = _Histogram(LATENCY_BUCKETS)
+        self.size = _Histogram(SIZE_BUCKETS)
+        self.statements = _Histogram(STATEMENT_BUCKETS)
+
+
+class RequestMetrics:
+    """Request counters and histograms for every route seen so far."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route, method, status, seconds, size, statements):
+        """Record one request; size is None for streamed responses."""
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = _Route()
+            key = (method, status)
+            entry.requests[key] = entry.requests.get(key, 0) + 1
+            entry.latency.observe(seconds)
+            entry.statements.observe(statements)
+            if size is not None:
+                entry.size.observe(size)
+
+    def render(self):
+        """All routes' metrics as Prometheus exposition text."""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            snapshot = [(route, dict(e.requests),
+                         [(h.buckets, list(h.counts), h.sum, h.count) for h in (e.latency, e.size, e.statements)])
+                        for route, e in routes]
+
+        lines = [
+            '# HELP http_requests_total Requests handled, by route rule, method and status.',
+            '# TYPE http_requests_total counter',
+        ]
+        for route, requests, _ in snapshot:
+            for (method, status), count in sorted(requests.items()):
+                lines.append(f'http_requests_total{{route="{_escape(route)}",method="{method}",'
+                             f'status="{status}"}} {count}')
+
+        histograms = [
+            ('http_request_duration_seconds', 'Time to produce the response, by route rule.'),
+            ('http_response_size_bytes', 'Response body size, by route rule (streamed responses excluded).'),
+            ('db_statements_per_request', 'SQL statements issued while handling a request, by route rule.'),
+        ]
+        for i, (name, help_text) in enumerate(histograms):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+            for route, _, hists in snapshot:
+                buckets, counts, total, count = hists[i]
+                if not count:
+                    continue
+                label = f'route="{_escape(route)}"'
+                cumulative = 0
+                for bound, n in zip(buckets, counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{label},le="+Inf"}} {count}')
+                lines.append(f'{name}_sum{{{label}}} {total}')
+                lines.append(f'{name}_count{{{label}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def render_stats(prefix, stats, help_text):
+    """Prometheus lines for a flat dict of numeric stats, one untyped metric per key."""
+    lines = []
+    for key, value in sorted(stats.items()):
+        if isinstance(value, bool):
+            value = int(value)
+        if not isinstance(value, (int, float)):
+            continue
+        name = f'{prefix}_{key}'
+        lines += [f'# HELP {name} {help_text} ({key}).', f'# TYPE {name} untyped', f'{name} {value}']
+    return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,175 @@
+"""Opt-in sampling profiler for slow requests.
+
+Enabled by setting GAME_PROFILE_DIR. While any request is in flight, a
+background thread samples the stacks of request threads every
+GAME_PROFILE_INTERVAL_MS (default 2) milliseconds. When a request finishes,
+its capture is kept if it took at least GAME_PROFILE_SLOW_MS (default 200)
+or was picked by GAME_PROFILE_SAMPLE (fraction of requests, default 0), and
+written to ``<GAME_PROFILE_DIR>/<route>/<time>-<n>-<ms>ms.folded`` as collapsed
+stacks (``frame;frame;frame count``, ready for flamegraph.pl or speedscope).
+A ``.json`` file beside it has the request, the SQL it issued and the time
+spent in TRACKED_FUNCTIONS.
+
+Disabled, install() does nothing and nothing is wrapped.
+"""
+
+import collections
+import functools
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from flask import request
+
+import database as db
+import game_state as gs
+
+PROFILE_DIR = os.environ.get('GAME_PROFILE_DIR')
+SLOW_MS = float(os.environ.get('GAME_PROFILE_SLOW_MS', '200'))
+SAMPLE_FRACTION = float(os.environ.get('GAME_PROFILE_SAMPLE', '0'))
+INTERVAL_MS = float(os.environ.get('GAME_PROFILE_INTERVAL_MS', '2'))
+
+# game_state functions whose calls and total time each capture reports
+TRACKED_FUNCTIONS = ('get_brief_for_display', 'compute_scores')
+
+
+class _Capture:
+    """One request's stack samples, SQL and tracked-function timings."""
+
+    __slots__ = ('stacks', 'sql', 'spans', 'sampled')
+
+    def __init__(self, sampled):
+        self.stacks = collections.Counter()
+        self.sql = []
+        self.spans = {}  # function name -> [calls, seconds]
+        self.sampled = sampled
+
+
+_sample_rng = random.Random()  # not the global one, which game_state's swap generation uses
+_captures = {}  # thread ident -> _Capture for requests in flight
+_captures_lock = threading.Lock()
+_captures_cond = threading.Condition(_captures_lock)
+_sampler = None
+_capture_numbers = itertools.count(1)  # keeps file names unique within a second
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f'{os.path.basename(code.co_filename)}:{code.co_name}'
+
+
+def _sample_loop():
+    """Add one collapsed stack per in-flight request every INTERVAL_MS."""
+    interval = INTERVAL_MS / 1000
+    while True:
+        with _captures_cond:
+            _captures_cond.wait_for(lambda: _captures)
+            threads = dict(_captures)
+        frames = sys._current_frames()
+        for ident, capture in threads.items():
+            frame = frames.get(ident)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                capture.stacks[';'.join(reversed(names))] += 1
+        del frames
+        time.sleep(interval)
+
+
+def _tracked(name, fn):
+    """Wrap a game_state function to add its time to the calling request's capture."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        capture = _captures.get(threading.get_ident())
+        if capture is None:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            span = capture.spans.setdefault(name, [0, 0.0])
+            span[0] += 1
+            span[1] += time.perf_counter() - start
+    return wrapper
+
+
+def start_capture():
+    """Begin capturing the current thread's request."""
+    global _sampler
+    capture = _Capture(_sample_rng.random() < SAMPLE_FRACTION)
+    db.log_statements(capture.sql)
+    with _captures_cond:
+        if _sampler is None or not _sampler.is_alive():
+            # Started here rather than in install() so each forked worker gets its own
+            _sampler = threading.Thread(target=_sample_loop, name='request-profiler', daemon=True)
+            _sampler.start()
+        _captures[threading.get_ident()] = capture
+        _captures_cond.notify()
+
+
+def _stop_capture():
+    db.log_statements(None)
+    with _captures_lock:
+        return _captures.pop(threading.get_ident(), None)
+
+
+def finish_capture(route, method, path, status, seconds):
+    """Stop capturing the current thread's request and write it out if it qualifies."""
+    capture = _stop_capture()
+    if capture is None or not (capture.sampled or seconds * 1000 >= SLOW_MS):
+        return
+
+    route_dir = os.path.join(PROFILE_DIR, route.strip('/').replace('/', '_').replace('<', '').replace('>', '')
+                             or 'index')
+    os.makedirs(route_dir, exist_ok=True)
+    base = os.path.join(route_dir, f'{time.strftime("%Y%m%d-%H%M%S")}-{next(_capture_numbers)}-'
+                                   f'{seconds * 1000:.0f}ms')
+    with open(base + '.folded', 'w', encoding='utf-8') as f:
+        for stack, count in capture.stacks.most_common():
+            f.write(f'{stack} {count}\n')
+
+    statements = collections.Counter(' '.join(sql.split()) for sql in capture.sql)
+    with open(base + '.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            'route': route, 'method': method, 'path': path, 'status': status,
+            'duration_ms': seconds * 1000, 'reason': 'sampled' if capture.sampled else 'slow',
+            'interval_ms': INTERVAL_MS, 'samples': sum(capture.stacks.values()),
+            'sql_statements': len(capture.sql),
+            'sql': [{'sql': sql, 'count': count} for sql, count in statements.items()],
+            'functions': {name: {'calls': calls, 'ms': total * 1000}
+                          for name, (calls, total) in capture.spans.items()},
+        }, f, indent=2)
+
+
+def install(app):
+    """Hook the profiler into a Flask app if GAME_PROFILE_DIR is set."""
+    if not PROFILE_DIR:
+        return
+
+    for name in TRACKED_FUNCTIONS:
+        setattr(gs, name, _tracked(name, getattr(gs, name)))
+
+    @app.before_request
+    def start_profile():
+        start_capture()
+        request.environ['profiler.start'] = time.perf_counter()
+
+    @app.after_request
+    def finish_profile(response):
+        start = request.environ.get('profiler.start')
+        if start is not None:
+            rule = request.url_rule
+            finish_capture(rule.rule if rule else '<unmatched>', request.method, request.path,
+                           response.status_code, time.perf_counter() - start)
+        return response
+
+    @app.teardown_request
+    def abandon_profile(exception=None):
+        # Requests that never reached after_request stop being sampled here
+        _stop_capture()
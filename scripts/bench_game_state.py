@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for game_state's hot functions, on real and synthetic briefs.
+
+Usage:
+    python3 scripts/bench_game_state.py [--sizes N ...] [--quick]
+                                        [--output FILE] [--compare FILE]
+
+Times, per call:
+  - get_brief_for_display with 0, 8 and 23 swaps, rendered from scratch
+    (render cache cleared) and served from the render cache
+  - _compile_render_plan, the one-off work that turns a brief into the plan
+    every render uses
+  - _replace_supra_case on full-name, first-party and direct-replacement supras
+  - generate_random_swaps for 8 and 23 swaps
+  - compute_scores for 3, 30 and 300 teams
+  - load_brief cold (file read and parse) and warm (cache hit)
+
+on brief_rosario and on synthetic briefs with --sizes paragraphs each
+(default 100 300 1000; one citation per paragraph, a supra reference every
+fourth paragraph, and all four hallucination types for every citation).
+Synthetic briefs are written to a temporary data directory.
+
+Prints a table and, with --output, writes the results as JSON together with
+the git commit, Python version and platform. --compare reads such a file
+from an earlier run and adds each benchmark's ratio to it (above 1 means
+slower now).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import game_state as gs  # noqa: E402
+
+REAL_BRIEF = 'brief_rosario'
+SWAP_COUNTS = (0, 8, 23)
+TEAM_COUNTS = (3, 30, 300)
+ROUNDS = 7
+
+
+# ── Timing ───────────────────────────────────────────────────────────────────
+
+def measure(fn, setup=None, min_time=0.2):
+    """Per-call timings of fn in seconds.
+
+    Without setup, each of ROUNDS samples times a loop of enough calls to
+    take min_time / ROUNDS. With setup, it runs before every call, untimed,
+    and each call is a sample. Either way fn has run at least once before
+    the first sample.
+    """
+    timer = time.perf_counter
+    if setup is None:
+        number = 1
+        while True:
+            start = timer()
+            for _ in range(number):
+                fn()
+            elapsed = timer() - start
+            if elapsed >= min_time / ROUNDS:
+                break
+            number = max(number * 2, int(number * min_time / ROUNDS / max(elapsed, 1e-9)))
+        samples = []
+        for _ in range(ROUNDS):
+            start = timer()
+            for _ in range(number):
+                fn()
+            samples.append((timer() - start) / number)
+        return samples, number * ROUNDS
+
+    # One untimed call first, so one-off work (plan compilation) isn't a sample
+    setup()
+    fn()
+    samples = []
+    total = 0
+    while len(samples) < ROUNDS or (total < min_time and len(samples) < 10000):
+        setup()
+        start = timer()
+        fn()
+        elapsed = timer() - start
+        samples.append(elapsed)
+        total += elapsed
+    return samples, len(samples)
+
+
+# ── Synthetic briefs ─────────────────────────────────────────────────────────
+
+def synthetic_brief(num_paragraphs, seed=0):
+    """A brief and its hallucinations with one citation per paragraph.
+
+    Every fourth paragraph also ends with a supra reference to the previous
+    paragraph's case. Every citation gets a fabricated_case, wrong_citation,
+    mischaracterization and misquotation option, the last two targeting text
+    in its own paragraph.
+    """
+    rng = random.Random(seed)
+    brief_id = f'brief_synthetic_{num_paragraphs}'
+    paragraphs, hallucinations = [], {}
+    for n in range(num_paragraphs):
+        cid = f'cite_{n:04d}'
+        case = f'Party{n} v. Defendant{n} Insurance Co.'
+        display = f'{case}, {100 + n} F.3d {rng.randint(1, 900)}, {rng.randint(1, 900)} (3d Cir. 20{n % 20:02d})'
+        holding = f'the court in matter {n} held that claim {n} must be pleaded with particularity'
+        quote = f'a plaintiff must show more than labels in case {n}'
+        text = f'As explained in this brief, {holding}. The standard requires that “{quote}.” '
+        citations = [{'citation_id': cid, 'start': len(text), 'end': len(text) + len(display),
+                      'display_text': display}]
+        text += display + '.'
+        if n % 4 == 3:
+            prev = f'Party{n - 1} v. Defendant{n - 1}, supra'
+            text += ' See also '
+            citations.append({'citation_id': f'cite_{n - 1:04d}', 'start': len(text),
+                              'end': len(text) + len(prev), 'display_text': prev, 'supra': True})
+            text += prev + '.'
+        paragraphs.append({'id': f'para_{n:04d}', 'section': 'I', 'type': 'body',
+                           'text': text, 'citations': citations})
+        hallucinations[cid] = {
+            'case_name': case,
+            'original_display': display,
+            'options': {
+                'fabricated_case': [{'id': f'{cid}_fab_1', 'label': 'Fabricated case',
+                                     'replacement_citation': f'Invented{n} v. Nobody{n} Corp., 9{n} F.3d 1 (2011)',
+                                     'difficulty': 'medium'}],
+                'wrong_citation': [{'id': f'{cid}_wc_1', 'label': 'Wrong page',
+                                    'replacement_citation': display.replace('F.3d', 'F.2d', 1),
+                                    'difficulty': 'medium'}],
+                'mischaracterization': [{'id': f'{cid}_mc_1', 'label': 'Overstated holding',
+                                         'original_text': holding,
+                                         'replacement_text': f'the court in matter {n} held that any claim fails',
+                                         'difficulty': 'hard'}],
+                'misquotation': [{'id': f'{cid}_mq_1', 'label': 'Altered quote',
+                                  'original_text': quote,
+                                  'replacement_text': f'a plaintiff must prove everything in case {n}',
+                                  'difficulty': 'hard'}],
+            },
+        }
+    brief = {'brief_id': brief_id, 'title': f'Synthetic brief ({num_paragraphs} paragraphs)',
+             'case_name': 'Synthetic v. Benchmark', 'court': 'N/A', 'docket': 'N/A',
+             'paragraphs': paragraphs}
+    return brief_id, brief, hallucinations
+
+
+def make_data_dir(sizes):
+    """Temporary data directory with the real brief plus one synthetic brief per size."""
+    data_dir = tempfile.mkdtemp(prefix='bench_game_state_')
+    for kind in ('briefs', 'hallucinations'):
+        os.makedirs(os.path.join(data_dir, kind))
+        shutil.copy(os.path.join(gs.DATA_DIR, kind, f'{REAL_BRIEF}.json'), os.path.join(data_dir, kind))
+    brief_ids = [REAL_BRIEF]
+    for size in sizes:
+        brief_id, brief, hallucinations = synthetic_brief(size)
+        for kind, data in (('briefs', brief), ('hallucinations', hallucinations)):
+            with open(os.path.join(data_dir, kind, f'{brief_id}.json'), 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        brief_ids.append(brief_id)
+    return data_dir, brief_ids
+
+
+# ── Benchmarks ───────────────────────────────────────────────────────────────
+
+def clear_render_cache():
+    with gs._render_cache_lock:
+        gs._render_cache.clear()
+
+
+def fixed_swaps(brief_id, count):
+    """count swaps on distinct citations, the same set on every run."""
+    random.seed(count)
+    return gs.generate_random_swaps(brief_id, count)
+
+
+def scoring_game(brief_id, num_teams):
+    """Teams in the usual rotation, 8 swaps each and a verdict on every citation."""
+    rng = random.Random(num_teams)
+    teams = [{'team_id': f't{i}', 'team_name': f'Team {i}', 'fabrication_team': f't{(i - 1) % num_teams}'}
+             for i in range(num_teams)]
+    citation_ids = gs._get_citation_ids(brief_id)
+    swaps, flags = {}, {}
+    for team in teams:
+        random.seed(rng.random())
+        swaps[team['team_id']] = gs.generate_random_swaps(brief_id, 8)
+        flags[team['team_id']] = [{'citation_id': cid, 'verdict': rng.choice(('fake', 'legit'))}
+                                  for cid in citation_ids]
+    return teams, swaps, flags
+
+
+def benchmarks(brief_id):
+    """Yield (name, params, fn, setup) for one brief."""
+    gs.load_hallucinations(brief_id)
+    num_citations = len(gs._get_citation_ids(brief_id))
+
+    for count in SWAP_COUNTS:
+        count = min(count, num_citations)
+        swaps = fixed_swaps(brief_id, count)
+
+        def render(swaps=swaps):
+            return gs.get_brief_for_display(brief_id, swaps=swaps)
+
+        if count:
+            yield 'get_brief_for_display', {'swaps': count, 'cache': 'cold'}, render, clear_render_cache
+        render()
+        yield 'get_brief_for_display', {'swaps': count, 'cache': 'warm'}, render, None
+
+    brief, hallucinations = gs.load_brief(brief_id), gs.load_hallucinations(brief_id)
+    yield '_compile_render_plan', {}, lambda: gs._compile_render_plan(brief, hallucinations), None
+
+    for count in (8, 23):
+        count = min(count, num_citations)
+        yield 'generate_random_swaps', {'swaps': count}, lambda count=count: gs.generate_random_swaps(
+            brief_id, count), None
+
+    for num_teams in TEAM_COUNTS:
+        teams, swaps, flags = scoring_game(brief_id, num_teams)
+        yield 'compute_scores', {'teams': num_teams}, lambda teams=teams, swaps=swaps, flags=flags: (
+            gs.compute_scores('bench', teams, swaps, flags, brief_id)), None
+
+    def load():
+        return gs.load_brief(brief_id)
+
+    yield 'load_brief', {'cache': 'cold'}, load, lambda: gs.invalidate_brief(brief_id)
+    load()
+    yield 'load_brief', {'cache': 'warm'}, load, None
+
+
+SUPRA_CASES = [
+    ('full_name', 'McDonough v. State Farm Fire & Cas. Co., supra, at 12',
+     'McDonough v. State Farm Fire & Cas. Co.', 'Harrington v. City of Lancaster'),
+    ('first_party', 'Ashcroft, supra', 'Ashcroft v. Iqbal', 'Crawford v. Metropolitan Life Ins. Co.'),
+    ('direct', 'Jones v. Allstate Ins. Co.', 'Jones v. Allstate Ins. Co.', 'Smith v. Nationwide Mut. Ins. Co.'),
+]
+
+
+def supra_benchmarks():
+    for kind, display, old, new in SUPRA_CASES:
+        yield '_replace_supra_case', {'supra': kind}, lambda d=display, o=old, n=new: (
+            gs._replace_supra_case(d, o, n)), None
+
+
+# ── Reporting ────────────────────────────────────────────────────────────────
+
+def result_key(result):
+    return (result['name'], result['brief'], json.dumps(result['params'], sort_keys=True))
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark game_state's hot functions.")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[100, 300, 1000],
+                        help='synthetic brief sizes in paragraphs (default: 100 300 1000)')
+    parser.add_argument('--quick', action='store_true', help='shorter runs, less stable numbers')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='JSON results from an earlier run to compare against')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = {result_key(r): r for r in json.load(f)['results']}
+
+    min_time = 0.05 if args.quick else 0.2
+    original_data_dir = gs.DATA_DIR
+    data_dir, brief_ids = make_data_dir(args.sizes)
+    gs.DATA_DIR = data_dir
+    results = []
+    try:
+        runs = [(None, supra_benchmarks())] + [(b, benchmarks(b)) for b in brief_ids]
+        print(f'{"benchmark":<58} {"calls":>7} {"median us":>11} {"min us":>11}'
+              + (f' {"vs base":>8}' if baseline else ''))
+        for brief_id, suite in runs:
+            for name, params, fn, setup in suite:
+                samples, calls = measure(fn, setup, min_time)
+                result = {
+                    'name': name, 'brief': brief_id, 'params': params, 'calls': calls,
+                    'median_us': statistics.median(samples) * 1e6,
+                    'mean_us': statistics.fmean(samples) * 1e6,
+                    'min_us': min(samples) * 1e6,
+                    'stdev_us': statistics.stdev(samples) * 1e6 if len(samples) > 1 else 0.0,
+                }
+                results.append(result)
+
+                label = name + ''.join(f' {k}={v}' for k, v in params.items())
+                if brief_id:
+                    label += f' [{brief_id.removeprefix("brief_")}]'
+                line = f'{label:<58} {calls:>7} {result["median_us"]:>11.1f} {result["min_us"]:>11.1f}'
+                base = baseline.get(result_key(result))
+                if base:
+                    line += f' {result["median_us"] / base["median_us"]:>7.2f}x'
+                print(line)
+    finally:
+        gs.DATA_DIR = original_data_dir
+        shutil.rmtree(data_dir)
+
+    if args.output:
+        report = {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'synthetic_sizes': args.sizes,
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nwrote {len(results)} results to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Benchmark database.py's read queries on a database full of old games.
+
+Usage:
+    python3 scripts/bench_queries.py [num_games]
+
+Builds a throwaway database at the schema version before the lookup
+indexes, seeds num_games finished games (4 teams of 5 players, 8 swaps and
+23 flags per team), plus one live game to query. It times each read query
+against the live game, runs init_db() to apply the pending migrations, and
+times them again. Prints mean milliseconds per call before and after, and
+the query plan after. Defaults to 10000 games.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database as db  # noqa: E402
+
+TEAMS_PER_GAME = 4
+PLAYERS_PER_TEAM = 5
+SWAPS_PER_TEAM = 8
+FLAGS_PER_TEAM = 23
+ROUNDS = 200
+
+# Schema version just before the lookup indexes were added
+PRE_INDEX_VERSION = 1
+
+
+def seed(num_games):
+    """Insert num_games games in bulk and return the last one's ids."""
+    conn = db.get_db()
+    games, teams, players, swaps, flags = [], [], [], [], []
+    for g in range(num_games):
+        game_id = db.generate_id()
+        games.append((game_id, f'G{g:05d}', 'reveal'))
+        for t in range(TEAMS_PER_GAME):
+            team_id = db.generate_id()
+            teams.append((team_id, game_id, f'Team {t}'))
+            for p in range(PLAYERS_PER_TEAM):
+                players.append((db.generate_id(), game_id, team_id, f'p{t}-{p}', db.generate_id()))
+            swaps.extend((game_id, team_id, f'cite_{c:02d}', 'wrong_citation', f'cite_{c:02d}_wc_1')
+                         for c in range(SWAPS_PER_TEAM))
+            flags.extend((game_id, team_id, f'cite_{c:02d}', 'fake' if c % 3 == 0 else 'legit')
+                         for c in range(FLAGS_PER_TEAM))
+    conn.executemany("INSERT INTO games (game_id, game_code, phase) VALUES (?, ?, ?)", games)
+    conn.executemany("INSERT INTO teams (team_id, game_id, team_name) VALUES (?, ?, ?)", teams)
+    conn.executemany(
+        "INSERT INTO players (player_id, game_id, team_id, player_name, session_token) VALUES (?, ?, ?, ?, ?)",
+        players
+    )
+    conn.executemany(
+        "INSERT INTO swaps (game_id, team_id, citation_id, hallucination_type, option_id) VALUES (?, ?, ?, ?, ?)",
+        swaps
+    )
+    conn.executemany("INSERT INTO flags (game_id, team_id, citation_id, verdict) VALUES (?, ?, ?, ?)", flags)
+    conn.commit()
+    return {
+        'game_id': games[-1][0],
+        'game_code': games[-1][1],
+        'team_id': teams[-1][0],
+        'token': players[-1][4],
+    }
+
+
+def queries(live):
+    """(label, callable) for every read query the routes use."""
+    game_id, team_id = live['game_id'], live['team_id']
+    return [
+        ('get_game_by_code', lambda: db.get_game_by_code(live['game_code'])),
+        ('get_game', lambda: db.get_game(game_id)),
+        ('get_player_by_token', lambda: db.get_player_by_token(live['token'])),
+        ('get_teams', lambda: db.get_teams(game_id)),
+        ('get_players', lambda: db.get_players(game_id)),
+        ('get_players(team)', lambda: db.get_players(game_id, team_id)),
+        ('get_swaps', lambda: db.get_swaps(game_id, team_id)),
+        ('get_flags', lambda: db.get_flags(game_id, team_id)),
+        ('get_status_summary', lambda: db.get_status_summary(game_id)),
+    ]
+
+
+def time_queries(live):
+    """Mean milliseconds per call for each query."""
+    results = {}
+    for label, fn in queries(live):
+        fn()
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            fn()
+        results[label] = (time.perf_counter() - start) / ROUNDS * 1000
+    return results
+
+
+def query_plans(live):
+    """The distinct EXPLAIN QUERY PLAN lines each query produces."""
+    conn = db.get_db()
+    plans = {}
+    for label, fn in queries(live):
+        statements = []
+        conn.set_trace_callback(statements.append)
+        fn()
+        conn.set_trace_callback(None)
+        lines = []
+        for sql in statements:
+            for row in conn.execute('EXPLAIN QUERY PLAN ' + sql):
+                if row[3] not in lines:
+                    lines.append(row[3])
+        plans[label] = lines
+    return plans
+
+
+def main():
+    num_games = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, 'bench.db')
+        migrations = db.MIGRATIONS
+        db.MIGRATIONS = migrations[:PRE_INDEX_VERSION]
+        db.init_db()
+        db.MIGRATIONS = migrations
+
+        start = time.perf_counter()
+        live = seed(num_games)
+        print(f'seeded {num_games} games in {time.perf_counter() - start:.1f} s')
+        before = time_queries(live)
+
+        start = time.perf_counter()
+        db.init_db()
+        print(f'migrated to user_version {len(db.MIGRATIONS)} in {time.perf_counter() - start:.1f} s\n')
+        after = time_queries(live)
+
+        print(f"{'query':<20}  {'before ms':>9}  {'after ms':>8}  {'speedup':>7}")
+        for label in before:
+            print(f'{label:<20}  {before[label]:>9.3f}  {after[label]:>8.3f}  '
+                  f'{before[label] / after[label]:>6.1f}x')
+
+        print('\nquery plans after migration:')
+        for label, lines in query_plans(live).items():
+            print(f'  {label}: ' + '; '.join(lines))
+
+        db.close_db()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Benchmark compute_scores: quadratic team-pair search vs. verifier map.
+
+Usage:
+    python3 scripts/bench_scoring.py [team_counts...]
+
+Builds a synthetic game on brief_rosario with the usual rotation (each team
+verifies the previous one), 8 random swaps and a verdict on every citation
+per team, checks both implementations agree, and prints mean time per call.
+Defaults to team counts 3 30 300.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_state as gs  # noqa: E402
+
+BRIEF_ID = 'brief_rosario'
+SWAPS_PER_TEAM = 8
+
+
+def compute_scores_quadratic(game_id, teams, swaps_by_team, flags_by_team, brief_id):
+    """game_state.compute_scores before the verifier map: scans every team pair.
+
+    Args:
+        game_id: The game ID
+        teams: List of team dicts
+        swaps_by_team: Dict mapping team_id -> list of swap records
+        flags_by_team: Dict mapping team_id -> list of flag records
+        brief_id: The brief being used
+
+    Returns:
+        Dict with per-team scores and citation-level details
+    """
+    brief = gs.load_brief(brief_id)
+
+    # Get all citation IDs from the brief
+    all_citation_ids = set()
+    for para in brief.paragraphs:
+        for cite in para.citations or ():
+            all_citation_ids.add(cite.citation_id)
+
+    results = {}
+
+    for team in teams:
+        tid = team['team_id']
+        tname = team['team_name']
+        fab_team = team.get('fabrication_team')
+
+        # Get this team's swaps (what they fabricated)
+        team_swaps = swaps_by_team.get(tid, [])
+        swapped_cids = {s['citation_id'] for s in team_swaps}
+
+        # Get this team's flags (what they flagged during verification)
+        team_flags = flags_by_team.get(tid, [])
+        flag_lookup = {}
+        for f in team_flags:
+            flag_lookup[f['citation_id']] = f['verdict']
+
+        # Find the team that verified this team's fabrications
+        verifying_flags = {}
+        for other_team in teams:
+            if other_team.get('fabrication_team') == tid:
+                # This other team verified our fabrications
+                other_flags = flags_by_team.get(other_team['team_id'], [])
+                for f in other_flags:
+                    verifying_flags[f['citation_id']] = f['verdict']
+
+        # Fabrication scoring: +2 undetected, +0 caught
+        fab_score = 0
+        fab_details = []
+        for s in team_swaps:
+            cid = s['citation_id']
+            htype = s['hallucination_type']
+            oid = s['option_id']
+            verifier_verdict = verifying_flags.get(cid, 'skip')
+            caught = verifier_verdict == 'fake'
+            points = 0 if caught else 2
+            fab_score += points
+
+            # Get option label
+            record = gs.find_option(brief_id, cid, htype, oid)
+            label = (record.option.label or '') if record else ''
+
+            fab_details.append({
+                'citation_id': cid,
+                'hallucination_type': htype,
+                'option_label': label,
+                'caught': caught,
+                'points': points
+            })
+
+        # Verification scoring: +2 correct flag, -1 wrong flag, 0 skip
+        ver_score = 0
+        ver_details = []
+
+        # We need to know which citations were swapped by the team we're verifying
+        fab_team_swaps = swaps_by_team.get(fab_team, []) if fab_team else []
+        fab_team_swapped_cids = {s['citation_id'] for s in fab_team_swaps}
+
+        for cid in sorted(all_citation_ids):
+            verdict = flag_lookup.get(cid, 'skip')
+            is_fake = cid in fab_team_swapped_cids
+
+            if verdict == 'fake':
+                if is_fake:
+                    points = 2  # Correctly caught
+                else:
+                    points = -1  # Wrong flag
+            elif verdict == 'legit':
+                points = 0  # No points for legit
+            else:
+                points = 0  # Skip
+
+            ver_score += points
+            ver_details.append({
+                'citation_id': cid,
+                'verdict': verdict,
+                'is_fake': is_fake,
+                'points': points
+            })
+
+        results[tid] = {
+            'team_name': tname,
+            'fabrication_score': fab_score,
+            'verification_score': ver_score,
+            'total_score': fab_score + ver_score,
+            'fabrication_details': fab_details,
+            'verification_details': ver_details,
+            'swaps_made': len(team_swaps),
+            'flags_made': len([f for f in team_flags if flag_lookup.get(f['citation_id']) == 'fake'])
+        }
+
+    return results
+
+
+def build_game(num_teams, rng):
+    """Return (teams, swaps_by_team, flags_by_team) for a synthetic game."""
+    team_ids = [f'team-{i}' for i in range(num_teams)]
+    teams = [{'team_id': tid, 'team_name': f'Team {i}', 'fabrication_team': team_ids[(i - 1) % num_teams]}
+             for i, tid in enumerate(team_ids)]
+    citation_ids = gs._get_citation_ids(BRIEF_ID)
+
+    swaps_by_team = {}
+    flags_by_team = {}
+    for tid in team_ids:
+        swaps_by_team[tid] = gs.generate_random_swaps(BRIEF_ID, SWAPS_PER_TEAM)
+        flags_by_team[tid] = [{'citation_id': cid, 'verdict': rng.choice(['fake', 'legit'])}
+                              for cid in citation_ids]
+    return teams, swaps_by_team, flags_by_team
+
+
+def time_call(fn, args, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(*args)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    team_counts = [int(a) for a in sys.argv[1:]] or [3, 30, 300]
+    rng = random.Random(42)
+    random.seed(42)
+
+    print(f"{'teams':>6}  {'quadratic ms':>12}  {'verifier map ms':>15}  {'speedup':>7}")
+    for num_teams in team_counts:
+        teams, swaps_by_team, flags_by_team = build_game(num_teams, rng)
+        args = ('bench', teams, swaps_by_team, flags_by_team, BRIEF_ID)
+        assert compute_scores_quadratic(*args) == gs.compute_scores(*args)
+
+        rounds = max(3, 3000 // num_teams)
+        old_ms = time_call(compute_scores_quadratic, args, rounds)
+        new_ms = time_call(gs.compute_scores, args, rounds)
+        print(f"{num_teams:>6}  {old_ms:>12.3f}  {new_ms:>15.3f}  {old_ms / new_ms:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
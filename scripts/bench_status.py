@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Benchmark the professor status query: per-team N+1 queries vs. grouped summary.
+
+Usage:
+    python3 scripts/bench_status.py [team_counts...]
+
+Seeds a throwaway SQLite database with one game per team count (5 players,
+8 swaps and 23 flags per team), then reports statements executed and mean
+latency for the old per-team approach and db.get_status_summary().
+Defaults to team counts 3 10 30 100.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database as db  # noqa: E402
+
+PLAYERS_PER_TEAM = 5
+SWAPS_PER_TEAM = 8
+FLAGS_PER_TEAM = 23
+ROUNDS = 200
+
+
+def seed_game(num_teams):
+    """Create a game with fully populated teams and return its game_id."""
+    game_id, _ = db.create_game()
+    conn = db.get_db()
+    for t in range(num_teams):
+        team_id = db.create_team(game_id, f'Team {t}')
+        for p in range(PLAYERS_PER_TEAM):
+            conn.execute(
+                "INSERT INTO players (player_id, game_id, team_id, player_name, session_token) VALUES (?, ?, ?, ?, ?)",
+                (db.generate_id(), game_id, team_id, f'p{t}-{p}', db.generate_id())
+            )
+        conn.executemany(
+            "INSERT INTO swaps (game_id, team_id, citation_id, hallucination_type, option_id) VALUES (?, ?, ?, ?, ?)",
+            [(game_id, team_id, f'cite_{c:02d}', 'wrong_citation', f'cite_{c:02d}_wc_1')
+             for c in range(SWAPS_PER_TEAM)]
+        )
+        conn.executemany(
+            "INSERT INTO flags (game_id, team_id, citation_id, verdict) VALUES (?, ?, ?, ?)",
+            [(game_id, team_id, f'cite_{c:02d}', 'fake' if c % 3 == 0 else 'legit')
+             for c in range(FLAGS_PER_TEAM)]
+        )
+    conn.commit()
+    return game_id
+
+
+def status_per_team(game_id):
+    """The status route's original shape: one swaps and one flags query per team."""
+    teams = db.get_teams(game_id)
+    players = db.get_players(game_id)
+    teams_data = []
+    for team in teams:
+        team_players = [p for p in players if p['team_id'] == team['team_id']]
+        swaps = db.get_swaps(game_id, team['team_id'])
+        flags = db.get_flags(game_id, team['team_id'])
+        teams_data.append({
+            'team_id': team['team_id'],
+            'team_name': team['team_name'],
+            'fabrication_team': team['fabrication_team'],
+            'players': [{'player_id': p['player_id'], 'player_name': p['player_name']} for p in team_players],
+            'swap_count': len(swaps),
+            'flag_count': len([f for f in flags if f['verdict'] == 'fake'])
+        })
+    unassigned = [{'player_id': p['player_id'], 'player_name': p['player_name']}
+                  for p in players if not p['team_id'] and not p['is_professor']]
+    return teams_data, unassigned
+
+
+def measure(fn, game_id):
+    """Return (statements per call, mean milliseconds per call)."""
+    conn = db.get_db()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    fn(game_id)
+    conn.set_trace_callback(None)
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(game_id)
+    elapsed = time.perf_counter() - start
+    return len(statements), elapsed / ROUNDS * 1000
+
+
+def main():
+    team_counts = [int(a) for a in sys.argv[1:]] or [3, 10, 30, 100]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, 'bench.db')
+        db.init_db()
+
+        print(f"{'teams':>6}  {'per-team queries':>16}  {'per-team ms':>11}  "
+              f"{'summary queries':>15}  {'summary ms':>10}  {'speedup':>7}")
+        for num_teams in team_counts:
+            game_id = seed_game(num_teams)
+            assert status_per_team(game_id) == db.get_status_summary(game_id)
+            old_q, old_ms = measure(status_per_team, game_id)
+            new_q, new_ms = measure(db.get_status_summary, game_id)
+            print(f"{num_teams:>6}  {old_q:>16}  {old_ms:>11.3f}  {new_q:>15}  {new_ms:>10.3f}  "
+                  f"{old_ms / new_ms:>6.1f}x")
+
+        db.close_db()
+
+
+if __name__ == '__main__':
+    main()
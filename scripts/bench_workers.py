@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Compare gunicorn workers started lazily and from a warmed-up master.
+
+Usage:
+    python3 scripts/bench_workers.py [--workers N] [--sessions N] [--repeat N] [--json]
+
+Starts gunicorn twice on a throwaway database: once without gunicorn.conf.py
+(each worker imports the app and loads briefs on its first requests) and
+once with it (the master preloads the app and every brief, then forks). Each
+time it reports:
+
+  - first-request latency with a single worker: the first solitaire start
+    (catalog, brief and hallucination loading, swap generation) and the first
+    /api/brief (render plan and rendering), next to the same requests warm.
+    A /api/game/phase probe goes first, so both modes pay Flask's own
+    first-request cost outside the timed requests. Medians of --repeat
+    fresh starts.
+  - per-worker memory with --workers workers after --sessions solitaire
+    games: RSS, PSS (shared pages split between the processes sharing them)
+    and private bytes, averaged over workers, from /proc/<pid>/smaps_rollup.
+
+Linux only. Needs gunicorn (requirements.txt).
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG = os.path.join(ROOT, 'gunicorn.conf.py')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(db_path, config, workers):
+    """Run gunicorn on a free port with the given config file; returns (process, port)."""
+    port = free_port()
+    bootstrap = ('import sys, database; database.DB_PATH = sys.argv[1]; '
+                 'from gunicorn.app.wsgiapp import run; sys.argv = ["gunicorn"] + sys.argv[2:]; run()')
+    proc = subprocess.Popen([sys.executable, '-c', bootstrap, db_path, '-c', config,
+                             f'--bind=127.0.0.1:{port}', f'--workers={workers}', '--threads=8', 'app:app'],
+                            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(200):
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.1):
+                return proc, port
+        except OSError:
+            if proc.poll() is not None:
+                sys.exit('gunicorn failed to start')
+            time.sleep(0.05)
+    stop(proc)
+    sys.exit('gunicorn did not start listening')
+
+
+def stop(proc):
+    proc.terminate()
+    try:
+        proc.wait(10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def request(port, method, path, body=None, token=None):
+    """One request on a fresh connection; returns (seconds, status, parsed JSON or None)."""
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['X-Session-Token'] = token
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        start = time.perf_counter()
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        elapsed = time.perf_counter() - start
+    finally:
+        conn.close()
+    try:
+        parsed = json.loads(data)
+    except ValueError:
+        parsed = None
+    return elapsed, response.status, parsed
+
+
+def solitaire(port):
+    """Start a solitaire game and fetch its brief; returns (start seconds, brief seconds)."""
+    start_s, status, body = request(port, 'POST', '/api/solitaire/start', {'player_name': 'Bench'})
+    if status != 200:
+        sys.exit(f'/api/solitaire/start returned {status}')
+    brief_s, status, _ = request(port, 'GET', '/api/brief', token=body['session_token'])
+    if status != 200:
+        sys.exit(f'/api/brief returned {status}')
+    return start_s, brief_s
+
+
+def wait_ready(port):
+    """Wait until a worker answers (a lazy worker imports the app first)."""
+    for _ in range(200):
+        try:
+            request(port, 'GET', '/api/game/phase')
+            return
+        except OSError:
+            time.sleep(0.05)
+    sys.exit('no worker answered')
+
+
+def worker_pids(master):
+    with open(f'/proc/{master}/task/{master}/children') as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def memory_kb(pid):
+    """RSS, PSS and private kB of a process from smaps_rollup."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {'rss_kb': fields['Rss'], 'pss_kb': fields['Pss'],
+            'private_kb': fields['Private_Clean'] + fields['Private_Dirty']}
+
+
+def measure(mode, config, args, tmp):
+    """First-request latency with one worker, then memory with args.workers workers."""
+    timings = []
+    for i in range(args.repeat):
+        proc, port = start_gunicorn(os.path.join(tmp, f'{mode}-latency-{i}.db'), config, 1)
+        try:
+            wait_ready(port)
+            timings.append(solitaire(port) + solitaire(port))
+        finally:
+            stop(proc)
+    first_start, first_brief, warm_start, warm_brief = (statistics.median(t) for t in zip(*timings))
+
+    proc, port = start_gunicorn(os.path.join(tmp, f'{mode}-memory.db'), config, args.workers)
+    try:
+        wait_ready(port)
+        for _ in range(args.sessions):
+            solitaire(port)
+        workers = [memory_kb(pid) for pid in worker_pids(proc.pid)]
+    finally:
+        stop(proc)
+
+    return {
+        'first_start_ms': first_start * 1000, 'first_brief_ms': first_brief * 1000,
+        'warm_start_ms': warm_start * 1000, 'warm_brief_ms': warm_brief * 1000,
+        'workers': len(workers),
+        **{key: sum(w[key] for w in workers) / len(workers) for key in ('rss_kb', 'pss_kb', 'private_kb')},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare lazily started and preloaded gunicorn workers.')
+    parser.add_argument('--workers', type=int, default=4, help='workers for the memory measurement (default: 4)')
+    parser.add_argument('--sessions', type=int, default=20,
+                        help='solitaire games played before measuring memory (default: 20)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='fresh single-worker starts per mode for the latencies (default: 5)')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lazy_config = os.path.join(tmp, 'lazy.conf.py')
+        open(lazy_config, 'w').close()
+        results = {'lazy': measure('lazy', lazy_config, args, tmp),
+                   'preload': measure('preload', CONFIG, args, tmp)}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{"":<28} {"lazy":>10} {"preload":>10}')
+    rows = [
+        ('first solitaire start ms', 'first_start_ms'), ('first /api/brief ms', 'first_brief_ms'),
+        ('warm solitaire start ms', 'warm_start_ms'), ('warm /api/brief ms', 'warm_brief_ms'),
+        ('worker RSS kB', 'rss_kb'), ('worker PSS kB', 'pss_kb'), ('worker private kB', 'private_kb'),
+    ]
+    for label, key in rows:
+        print(f'{label:<28} {results["lazy"][key]:>10.1f} {results["preload"][key]:>10.1f}')
+    print(f'(memory averaged over {results["preload"]["workers"]} workers after {args.sessions} games)')
+
+
+if __name__ == '__main__':
+    main()
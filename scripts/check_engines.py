@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""Check that the memory engine behaves exactly like the SQLite engine.
+
+Usage:
+    python3 scripts/check_engines.py
+    GAME_DB_WRITE_BEHIND=1 python3 scripts/check_engines.py
+
+Runs the same scripted sequence of database.py calls (joining, team changes,
+swaps, unswaps, flags, batch writes, foreign-key failures, non-string ids,
+no-op updates, reveal snapshots, writes after reveal and a reset) once per
+engine on a throwaway database, recording every read function's result and
+the game_events log after each step. The two transcripts must match. It then
+replays each engine's event log into a fresh GameStore and checks the
+rebuilt state matches the final one. Exits non-zero on the first difference.
+With GAME_DB_WRITE_BEHIND=1, both engines write through the writer thread.
+"""
+
+import itertools
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database as db  # noqa: E402
+
+
+def row(r):
+    """A row as a dict, without created_at (wall-clock dependent)."""
+    if r is None:
+        return None
+    d = dict(r)
+    d.pop('created_at', None)
+    return d
+
+
+def event(e):
+    """A logged event without its timestamps."""
+    data = dict(e['data'])
+    data.pop('created_at', None)
+    return e['seq'], e['kind'], data
+
+
+def dump_state(ids):
+    """Everything the read functions return for the scenario's games, teams and players."""
+    state = {}
+    for g in ids['games']:
+        game = db.get_game(g)
+        state[g] = {
+            'game': row(game),
+            'version': db.get_game_version(g),
+            'by_code': row(db.get_game_by_code(game['game_code'].lower())),
+            'teams': [row(t) for t in db.get_teams(g)],
+            'players': [row(p) for p in db.get_players(g)],
+            'status': db.get_status_summary(g),
+            'events': [event(e) for e in db.get_game_events(g)],
+        }
+        for t in ids['teams']:
+            state[g][t] = {
+                'team': row(db.get_team(t)),
+                'players': [row(p) for p in db.get_players(g, t)],
+                'swaps': [row(s) for s in db.get_swaps(g, t)],
+                'flags': [row(f) for f in db.get_flags(g, t)],
+            }
+    state['tokens'] = {tok: row(db.get_player_by_token(tok)) for tok in ids['tokens'] + ['missing']}
+    state['missing'] = (row(db.get_game('missing')), db.get_game_version('missing'),
+                        row(db.get_team('missing')), db.get_teams('missing'))
+    return state
+
+
+def scenario():
+    """Yield (label, callable) steps; callables return ids they create."""
+    ids = {'games': [], 'teams': [], 'tokens': []}
+
+    def create_game(mode):
+        game_id, _ = db.create_game(mode)
+        ids['games'].append(game_id)
+
+    def create_team(g, name):
+        ids['teams'].append(db.create_team(ids['games'][g], name))
+
+    def create_player(g, name, prof=False):
+        player_id, token = db.create_player(ids['games'][g], name, is_professor=prof)
+        ids.setdefault('players', []).append(player_id)
+        ids['tokens'].append(token)
+
+    def g(i):
+        return ids['games'][i]
+
+    def t(i):
+        return ids['teams'][i]
+
+    def p(i):
+        return ids['players'][i]
+
+    steps = [
+        ('create games', lambda: (create_game('multiplayer'), create_game('solitaire'))),
+        ('create teams', lambda: [create_team(0, n) for n in ('Team A', 'Team B', 'Team C')]
+         + [create_team(1, 'Solo')]),
+        ('create players', lambda: [create_player(0, 'Professor', True)]
+         + [create_player(0, f'p{i}') for i in range(4)] + [create_player(1, 'solo')]),
+        ('assign', lambda: [db.assign_player_team(p(i), t(i - 1)) for i in (1, 2, 3)]),
+        ('reassign', lambda: db.assign_player_team(p(1), t(1))),
+        ('assign solo', lambda: db.assign_player_team(p(5), t(3))),
+        ('assign unknown player', lambda: db.assign_player_team('missing', t(0))),
+        ('assign unknown team', lambda: db.assign_player_team(p(4), 'missing')),
+        ('set brief', lambda: db.set_game_brief(g(0), 'brief_rosario')),
+        ('team briefs', lambda: [db.set_team_briefs(t(i), 'brief_rosario', 'brief_rosario', t((i - 1) % 3))
+                                 for i in range(3)]),
+        ('team briefs unknown', lambda: db.set_team_briefs('missing', 'x', 'x', None)),
+        ('phase fabrication', lambda: db.set_game_phase(g(0), 'fabrication', '2030-01-01T00:00:00+00:00')),
+        ('swaps', lambda: [db.upsert_swap(g(0), t(0), f'cite_{c:02d}', 'wrong_citation', f'cite_{c:02d}_wc_1')
+                           for c in (3, 1, 2)]),
+        ('replace swap', lambda: db.upsert_swap(g(0), t(0), 'cite_01', 'misquote', 'cite_01_mq_2')),
+        ('unswap', lambda: db.delete_swap(g(0), t(0), 'cite_02')),
+        ('unswap missing', lambda: db.delete_swap(g(0), t(0), 'cite_09')),
+        ('unswap unknown game', lambda: db.delete_swap('missing', t(0), 'cite_01')),
+        ('batch swaps', lambda: db.apply_swap_changes(g(0), t(1), [
+            {'citation_id': 'cite_05', 'hallucination_type': 'wrong_citation', 'option_id': 'cite_05_wc_1'},
+            {'citation_id': 'cite_04', 'hallucination_type': 'misquote', 'option_id': 'cite_04_mq_1'},
+            {'citation_id': 'cite_05', 'unswap': True},
+        ])),
+        ('swap unknown team', lambda: db.upsert_swap(g(0), 'missing', 'cite_01', 'misquote', 'x')),
+        ('swap unknown game', lambda: db.upsert_swap('missing', t(0), 'cite_01', 'misquote', 'x')),
+        ('swap int citation', lambda: db.upsert_swap(g(0), t(0), 5, 'misquote', 'cite_05_mq_1')),
+        ('batch swap int option', lambda: db.apply_swap_changes(g(0), t(0), [
+            {'citation_id': 'cite_06', 'hallucination_type': 'misquote', 'option_id': 6},
+        ])),
+        ('phase verification', lambda: db.set_game_phase(g(0), 'verification', '2030-01-01T00:10:00+00:00')),
+        ('flags', lambda: [db.upsert_flag(g(0), t(1), f'cite_{c:02d}', 'fake' if c % 2 else 'legit')
+                           for c in (4, 1, 3)]),
+        ('re-flag', lambda: db.upsert_flag(g(0), t(1), 'cite_04', 'fake')),
+        ('batch flags', lambda: db.upsert_flags(g(0), t(2), [('cite_03', 'fake'), ('cite_00', 'legit'),
+                                                             ('cite_03', 'legit')])),
+        ('empty batch flags', lambda: db.upsert_flags(g(0), t(2), [])),
+        ('flag unknown team', lambda: db.upsert_flag(g(0), 'missing', 'cite_01', 'fake')),
+        ('flag int citation', lambda: db.upsert_flags(g(0), t(1), [(7, 'fake')])),
+        ('solitaire', lambda: (db.upsert_swap(g(1), t(3), 'cite_07', 'misquote', 'cite_07_mq_1'),
+                               db.set_game_phase(g(1), 'verification', None),
+                               db.upsert_flag(g(1), t(3), 'cite_07', 'fake'))),
+        ('reveal', lambda: (db.set_game_phase(g(0), 'reveal'),
+                            db.save_reveal_snapshot(g(0), {'scoreboard': '{"x": 1}'}))),
+        ('flag after reveal', lambda: db.upsert_flag(g(0), t(1), 'cite_02', 'fake')),
+        ('unswap after reveal', lambda: db.delete_swap(g(0), t(0), 'cite_01')),
+        ('reset', lambda: db.reset_game(g(0))),
+        ('reset unknown', lambda: db.reset_game('missing')),
+    ]
+    return ids, steps
+
+
+def use_database(path):
+    """Point database.py at path, first stopping the writer and closing the old file's connections."""
+    db.stop_writer()
+    db.close_pool()
+    db.DB_PATH = path
+
+
+def run(engine, path):
+    """Play the scenario on one engine and return (ids, transcript)."""
+    db.ENGINE = engine
+    db._store = None
+    db._token_cache.clear()
+    use_database(path)
+    db.init_db()
+
+    # Same ids and game codes on both runs
+    counter = itertools.count()
+    db.generate_id = lambda: f'id-{next(counter):04d}'
+    random.seed(0)
+
+    ids, steps = scenario()
+    transcript = []
+    for label, step in steps:
+        try:
+            step()
+            outcome = 'ok'
+        except Exception as e:
+            outcome = type(e).__name__
+        snapshot = (db.get_reveal_snapshot(ids['games'][0], 'scoreboard') if ids['games'] else None)
+        transcript.append((label, outcome, snapshot, dump_state(ids)))
+        db.close_db()
+    return ids, transcript
+
+
+def main():
+    generate_id = db.generate_id
+    with tempfile.TemporaryDirectory() as tmp:
+        _, expected = run('sqlite', os.path.join(tmp, 'sqlite.db'))
+        db.generate_id = generate_id
+        ids, actual = run('memory', os.path.join(tmp, 'memory.db'))
+        db.generate_id = generate_id
+
+        for want, got in zip(expected, actual):
+            if want != got:
+                print(f'MISMATCH after step {want[0]!r}')
+                for key in ('outcome', 'snapshot'):
+                    i = 1 if key == 'outcome' else 2
+                    if want[i] != got[i]:
+                        print(f'  {key}: sqlite={want[i]!r} memory={got[i]!r}')
+                for key in want[3]:
+                    if want[3][key] != got[3].get(key):
+                        print(f'  {key}:\n    sqlite={want[3][key]!r}\n    memory={got[3].get(key)!r}')
+                sys.exit(1)
+        print(f'{len(expected)} steps: memory engine matches sqlite')
+
+        # Both logs must rebuild the final state: the memory engine's own, and
+        # the SQLite engine's, read back through a GameStore
+        final = expected[-1][3]
+        for engine in ('memory', 'sqlite'):
+            use_database(os.path.join(tmp, f'{engine}.db'))
+            db._load_store(db.get_db())
+            if dump_state(ids) != final:
+                print(f'MISMATCH: state replayed from the {engine} engine\'s game_events differs')
+                sys.exit(1)
+            db.close_db()
+        print('replaying either event log rebuilds the final state')
+        db.stop_writer()
+        db.close_pool()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""Load-test the app by playing whole classroom games against it over HTTP.
+
+Usage:
+    python3 scripts/load_game.py [--games N] [--students N] [--teams N]
+                                 [--swaps N] [--flags N] [--think SECONDS]
+                                 [--url URL] [--json]
+
+Each game gets a professor and --students students, all driven through the
+same routes the pages use: the professor creates the game, students join,
+read the lobby status and pick a team (spread over the first --teams of the
+game's three teams), the professor starts fabrication, students fetch the
+brief and make --swaps swaps each, the professor moves to verification,
+students flag --flags citations each, the professor reveals and everyone
+fetches the scoreboard. Throughout, students poll /api/game/phase every
+2.5 s and /api/team/progress?since= every 3 s, with ETags, like the pages'
+polling fallback; the professor polls /api/game/events. Students wait
+--think seconds on average between actions. All games run at once.
+
+Without --url, starts the app on a free local port with a throwaway
+database (GAME_DB_* environment variables are passed through). Prints
+p50/p95/p99/max latency and error counts per route, or the same as JSON
+with --json.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PHASE_POLL_SECONDS = 2.5
+SYNC_POLL_SECONDS = 3.0
+EVENTS_POLL_SECONDS = 2.5
+
+
+# ── Measurements ─────────────────────────────────────────────────────────────
+
+class Recorder:
+    """Latencies and errors per route, shared by every simulated client."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.failures = []
+
+    def add(self, route, seconds, error=None):
+        with self._lock:
+            self.latencies.setdefault(route, []).append(seconds)
+            if error:
+                errors = self.errors.setdefault(route, {})
+                errors[error] = errors.get(error, 0) + 1
+
+    def fail(self, message):
+        """A simulated client that gave up before finishing its game."""
+        with self._lock:
+            self.failures.append(message)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(recorder):
+    """Per-route counts and latency percentiles in milliseconds."""
+    routes = {}
+    for route, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        errors = recorder.errors.get(route, {})
+        routes[route] = {
+            'requests': len(values),
+            'errors': sum(errors.values()),
+            'error_kinds': errors,
+            'p50_ms': percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+            'max_ms': values[-1] * 1000,
+        }
+    return routes
+
+
+# ── HTTP client ──────────────────────────────────────────────────────────────
+
+class Client:
+    """One browser tab: a keep-alive connection, a session token and ETags."""
+
+    def __init__(self, url, recorder):
+        parts = urllib.parse.urlsplit(url)
+        self._host, self._port = parts.hostname, parts.port or 80
+        self._conn = None
+        self._etags = {}
+        self._bodies = {}
+        self.recorder = recorder
+        self.token = None
+
+    def request(self, method, path, body=None):
+        """Send a request and return (status, parsed JSON body or None)."""
+        headers = {}
+        if self.token:
+            headers['X-Session-Token'] = self.token
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+            body = json.dumps(body)
+        if method == 'GET' and path in self._etags:
+            headers['If-None-Match'] = self._etags[path]
+
+        route = path.split('?')[0]
+        start = time.perf_counter()
+        try:
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self._host, self._port, timeout=60)
+            self._conn.request(method, path, body=body, headers=headers)
+            response = self._conn.getresponse()
+            raw = response.read()
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+        except (OSError, http.client.HTTPException) as e:
+            self.recorder.add(route, time.perf_counter() - start, type(e).__name__)
+            self.close()
+            return None, None
+        elapsed = time.perf_counter() - start
+
+        status = response.status
+        if status == 304:
+            self.recorder.add(route, elapsed)
+            return 200, self._bodies[path]
+        self.recorder.add(route, elapsed, str(status) if status >= 400 else None)
+        try:
+            data = json.loads(raw) if raw else None
+        except ValueError:
+            data = None
+        etag = response.getheader('ETag')
+        if method == 'GET' and etag and status == 200:
+            self._etags[path] = etag
+            self._bodies[path] = data
+        return status, data
+
+    def get(self, path):
+        return self.request('GET', path)
+
+    def post(self, path, body=None):
+        return self.request('POST', path, body if body is not None else {})
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# ── Simulated game ───────────────────────────────────────────────────────────
+
+class Game:
+    """Shared state for one game: the professor waits on students' progress."""
+
+    def __init__(self, index, num_students):
+        self.index = index
+        self.num_students = num_students
+        self.cond = threading.Condition()
+        self.game_code = None
+        self.done = {'joined': 0, 'fabrication': 0, 'verification': 0, 'scoreboard': 0}
+        self.failed = False
+
+    def mark(self, step):
+        with self.cond:
+            self.done[step] += 1
+            self.cond.notify_all()
+
+    def wait_for(self, step, timeout):
+        """Wait until every student has finished step; False on timeout."""
+        with self.cond:
+            return self.cond.wait_for(lambda: self.done[step] >= self.num_students, timeout)
+
+    def wait_code(self, timeout):
+        with self.cond:
+            return self.cond.wait_for(lambda: self.game_code or self.failed, timeout) and not self.failed
+
+
+class Student:
+    """A student's page: does one action at a time, polling in between."""
+
+    def __init__(self, client, args, rng):
+        self.client = client
+        self.args = args
+        self.rng = rng
+        self.phase = 'lobby'
+        self.seq = None
+        self._next_phase_poll = 0
+        self._next_sync = 0
+
+    def poll(self):
+        """Run whichever polls are due, like the page's timers would."""
+        now = time.monotonic()
+        if now >= self._next_phase_poll:
+            self._next_phase_poll = now + PHASE_POLL_SECONDS
+            status, data = self.client.get('/api/game/phase')
+            if status == 200 and data:
+                self.phase = data['phase']
+        if self.phase in ('fabrication', 'verification') and now >= self._next_sync:
+            self._next_sync = now + SYNC_POLL_SECONDS
+            path = '/api/team/progress' if self.seq is None else f'/api/team/progress?since={self.seq}'
+            status, data = self.client.get(path)
+            if status == 200 and data:
+                self.seq = data['seq']
+
+    def think(self):
+        """Wait about --think seconds, keeping the polls going."""
+        end = time.monotonic() + self.rng.uniform(0, 2 * self.args.think)
+        while True:
+            self.poll()
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, max(0.01, min(self._next_phase_poll, self._next_sync) - time.monotonic())))
+
+    def wait_phase(self, phase, deadline):
+        while self.phase != phase:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'still in {self.phase}, waiting for {phase}')
+            self.think()
+
+
+def run_student(url, args, game, index, recorder, deadline):
+    client = Client(url, recorder)
+    rng = random.Random(f'{args.seed}-{game.index}-{index}')
+    student = Student(client, args, rng)
+    steps = ['joined', 'fabrication', 'verification', 'scoreboard']
+    try:
+        if not game.wait_code(deadline - time.monotonic()):
+            return
+        status, data = client.post('/api/join', {'game_code': game.game_code, 'player_name': f'Student {index}'})
+        if status != 200:
+            return
+        client.token = data['session_token']
+        status, lobby = client.get('/api/game/status')
+        if status != 200:
+            return
+        team = lobby['teams'][index % min(args.teams, len(lobby['teams']))]
+        client.post('/api/choose-team', {'team_id': team['team_id']})
+        game.mark(steps.pop(0))
+
+        student.wait_phase('fabrication', deadline)
+        status, data = client.get('/api/brief')
+        if status == 200:
+            options = [(cid, kind, opts[0]['id'])
+                       for cid, h in data['hallucinations'].items()
+                       for kind, opts in h['options'].items() if opts]
+            for cid, kind, option_id in rng.sample(options, min(args.swaps, len(options))):
+                student.think()
+                client.post('/api/citation/swap',
+                            {'citation_id': cid, 'hallucination_type': kind, 'option_id': option_id})
+        game.mark(steps.pop(0))
+
+        student.wait_phase('verification', deadline)
+        student.seq = None
+        status, data = client.get('/api/brief')
+        if status == 200:
+            cited = sorted({c['citation_id'] for p in data['brief']['paragraphs'] for c in p.get('citations', [])})
+            for cid in rng.sample(cited, min(args.flags, len(cited))):
+                student.think()
+                client.post('/api/citation/flag', {'citation_id': cid, 'verdict': rng.choice(('fake', 'legit'))})
+        game.mark(steps.pop(0))
+
+        student.wait_phase('reveal', deadline)
+        client.get('/api/scoreboard')
+    except TimeoutError as e:
+        recorder.fail(f'student: {e}')
+    finally:
+        # Let the professor move on even if this student gave up
+        for step in steps:
+            game.mark(step)
+        client.close()
+
+
+def run_professor(url, args, game, recorder, deadline):
+    client = Client(url, recorder)
+    seq = 0
+    next_poll = 0
+
+    def wait_for(step):
+        # Keep the dashboard's event polling going while students play
+        nonlocal seq, next_poll
+        while not game.wait_for(step, max(0, min(next_poll, deadline) - time.monotonic())):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'students did not finish {step}')
+            status, data = client.get(f'/api/game/events?since={seq}')
+            if status == 200 and data:
+                seq = data['seq']
+            next_poll = time.monotonic() + EVENTS_POLL_SECONDS
+
+    try:
+        status, data = client.post('/api/game/create')
+        if status != 200:
+            return
+        client.token = data['session_token']
+        with game.cond:
+            game.game_code = data['game_code']
+            game.cond.notify_all()
+
+        wait_for('joined')
+        client.post('/api/game/start', {'minutes': 20})
+        wait_for('fabrication')
+        client.post('/api/game/swap', {'minutes': 15})
+        wait_for('verification')
+        client.post('/api/game/reveal')
+        client.get('/api/scoreboard')
+        wait_for('scoreboard')
+    except TimeoutError as e:
+        recorder.fail(f'professor: {e}')
+    finally:
+        with game.cond:
+            game.failed = not game.game_code
+            game.cond.notify_all()
+        client.close()
+
+
+# ── Server ───────────────────────────────────────────────────────────────────
+
+def start_server(db_path):
+    """Run the app in a child process on a free port; returns (process, url)."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    bootstrap = ('import sys, database; database.DB_PATH = sys.argv[1]; database.init_db(); '
+                 'import app; app.app.run(host="127.0.0.1", port=int(sys.argv[2]), threaded=True)')
+    proc = subprocess.Popen([sys.executable, '-c', bootstrap, db_path, str(port)], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.1):
+                return proc, url
+        except OSError:
+            if proc.poll() is not None:
+                sys.exit('app failed to start')
+            time.sleep(0.1)
+    proc.kill()
+    sys.exit('app did not start listening')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play whole classroom games against the app.')
+    parser.add_argument('--games', type=int, default=4, help='concurrent games (default: 4)')
+    parser.add_argument('--students', type=int, default=30, help='students per game (default: 30)')
+    parser.add_argument('--teams', type=int, default=3, help='teams students spread over, 1-3 (default: 3)')
+    parser.add_argument('--swaps', type=int, default=3, help='swaps per student (default: 3)')
+    parser.add_argument('--flags', type=int, default=8, help='flags per student (default: 8)')
+    parser.add_argument('--think', type=float, default=0.5, help='mean seconds between actions (default: 0.5)')
+    parser.add_argument('--timeout', type=float, default=300, help='give up after this many seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--url', help='target an already running app instead of starting one')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    tmp = server = None
+    url = args.url
+    if not url:
+        tmp = tempfile.TemporaryDirectory()
+        server, url = start_server(os.path.join(tmp.name, 'load.db'))
+
+    recorder = Recorder()
+    deadline = time.monotonic() + args.timeout
+    threads = []
+    games = [Game(g, args.students) for g in range(args.games)]
+    for game in games:
+        threads.append(threading.Thread(target=run_professor, args=(url, args, game, recorder, deadline)))
+        threads += [threading.Thread(target=run_student, args=(url, args, game, i, recorder, deadline))
+                    for i in range(args.students)]
+
+    start = time.perf_counter()
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        elapsed = time.perf_counter() - start
+        if server:
+            server.terminate()
+            server.wait()
+            tmp.cleanup()
+
+    routes = summarize(recorder)
+    total = sum(r['requests'] for r in routes.values())
+    errors = sum(r['errors'] for r in routes.values())
+    report = {
+        'games': args.games, 'students_per_game': args.students, 'teams': args.teams,
+        'elapsed_s': elapsed, 'requests': total, 'errors': errors,
+        'requests_per_s': total / elapsed if elapsed else 0, 'routes': routes,
+        'failures': recorder.failures,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f'{args.games} games x {args.students} students: {total} requests in {elapsed:.1f} s '
+              f'({report["requests_per_s"]:.0f}/s), {errors} errors')
+        print(f'\n{"route":<28} {"requests":>8} {"errors":>6} {"p50 ms":>8} {"p95 ms":>8} '
+              f'{"p99 ms":>8} {"max ms":>8}')
+        for route, r in routes.items():
+            print(f'{route:<28} {r["requests"]:>8} {r["errors"]:>6} {r["p50_ms"]:>8.1f} {r["p95_ms"]:>8.1f} '
+                  f'{r["p99_ms"]:>8.1f} {r["max_ms"]:>8.1f}')
+            for kind, count in r['error_kinds'].items():
+                print(f'    {count} x {kind}')
+        for failure in recorder.failures:
+            print(f'gave up: {failure}')
+    sys.exit(1 if errors or recorder.failures else 0)
+
+
+if __name__ == '__main__':
+    main()
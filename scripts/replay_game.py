@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Rebuild games from the game_events log and summarize their final state.
+
+Usage:
+    python3 scripts/replay_game.py [--db PATH] [--json] [game_code_or_id ...]
+
+Replays every logged event in the database (game.db by default) into a
+GameStore, prints how long that took, then a summary of each named game (or
+every game): phase, teams with their players, swap count and fake-flag
+count. With --json, prints the named games' full state as JSON instead.
+Works on logs written by either engine. Load tests can import replay() to
+get a populated GameStore.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database as db  # noqa: E402
+from game_store import GameStore  # noqa: E402
+
+
+def replay(path):
+    """Return (GameStore rebuilt from the log at path, number of events replayed)."""
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    rows = conn.execute("SELECT game_id, seq, kind, data FROM game_events ORDER BY game_id, seq").fetchall()
+    conn.close()
+
+    def read_only(*args):
+        raise RuntimeError('replayed store is read-only')
+
+    store = GameStore(read_only, read_only)
+    store.replay((game_id, seq, kind, json.loads(data)) for game_id, seq, kind, data in rows)
+    return store, len(rows)
+
+
+def game_state(store, game_id):
+    """A game's full state as plain data."""
+    teams = store.get_teams(game_id)
+    return {
+        'game': store.get_game(game_id),
+        'teams': teams,
+        'players': store.get_players(game_id),
+        'swaps': {t['team_id']: store.get_swaps(game_id, t['team_id']) for t in teams},
+        'flags': {t['team_id']: store.get_flags(game_id, t['team_id']) for t in teams},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild games from the game_events log.')
+    parser.add_argument('--db', default=db.DB_PATH, help='database file (default: game.db)')
+    parser.add_argument('--json', action='store_true', help="print the games' full state as JSON")
+    parser.add_argument('games', nargs='*', help='game codes or ids (default: all)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store, count = replay(args.db)
+    elapsed = time.perf_counter() - start
+
+    if args.games:
+        game_ids = []
+        for key in args.games:
+            game = store.get_game(key) or store.get_game_by_code(key)
+            if not game:
+                sys.exit(f'no logged game {key!r}')
+            game_ids.append(game['game_id'])
+    else:
+        game_ids = store.game_ids()
+
+    if args.json:
+        print(json.dumps({g: game_state(store, g) for g in game_ids}, indent=2))
+        return
+
+    rate = count / elapsed if elapsed else 0
+    print(f'replayed {count} events for {len(store.game_ids())} games in {elapsed * 1000:.1f} ms '
+          f'({rate:,.0f} events/s)')
+    for game_id in game_ids:
+        game = store.get_game(game_id)
+        teams, unassigned = store.get_status_summary(game_id)
+        print(f"\n{game['game_code']}  {game['mode']}  phase={game['phase']}  version={game['version']}")
+        for team in teams:
+            names = ', '.join(p['player_name'] for p in team['players']) or '-'
+            print(f"  {team['team_name']:<12} swaps={team['swap_count']:<3} "
+                  f"fake flags={team['flag_count']:<3} players: {names}")
+        if unassigned:
+            print(f"  unassigned: {', '.join(p['player_name'] for p in unassigned)}")
+
+
+if __name__ == '__main__':
+    main()
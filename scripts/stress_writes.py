@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Hammer the swap/flag writes from many threads, with and without write-behind.
+
+Usage:
+    python3 scripts/stress_writes.py [threads] [writes_per_thread]
+
+Seeds a throwaway SQLite database with one game and one team per thread,
+then has every thread upsert flags as fast as it can (every fifth write is a
+swap, every tenth an unswap) in each mode: direct commits, then the
+write-behind queue with group commit. After each run it checks that every
+acknowledged write is in the database and the game's version went up once
+per write, and prints throughput plus the writer's batch and commit-latency
+counters. Defaults to 32 threads x 200 writes.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database as db  # noqa: E402
+
+CITATIONS = 23
+
+
+def worker(game_id, team_id, writes, barrier, errors):
+    """One client: cycle through the citations, flagging, swapping and unswapping."""
+    try:
+        barrier.wait()
+        for i in range(writes):
+            cid = f'cite_{i % CITATIONS:02d}'
+            if i % 10 == 9:
+                db.delete_swap(game_id, team_id, cid)
+            elif i % 5 == 4:
+                db.upsert_swap(game_id, team_id, cid, 'wrong_citation', f'{cid}_wc_1')
+            else:
+                db.upsert_flag(game_id, team_id, cid, 'fake' if i % 2 else 'legit')
+            # Hand the connection back like a request teardown would
+            db.close_db()
+    except Exception as e:
+        errors.append(e)
+    finally:
+        db.close_db()
+
+
+def expected_rows(writes):
+    """Flags and swaps one worker leaves behind, replaying its writes in order."""
+    flags, swaps = {}, set()
+    for i in range(writes):
+        cid = f'cite_{i % CITATIONS:02d}'
+        if i % 10 == 9:
+            swaps.discard(cid)
+        elif i % 5 == 4:
+            swaps.add(cid)
+        else:
+            flags[cid] = 'fake' if i % 2 else 'legit'
+    return flags, swaps
+
+
+def run(write_behind, num_threads, writes):
+    """Run one stress round and return writes per second."""
+    db.WRITE_BEHIND = write_behind
+    game_id, _ = db.create_game()
+    team_ids = [db.create_team(game_id, f'Team {t}') for t in range(num_threads)]
+    version_before = db.get_game_version(game_id)
+
+    barrier = threading.Barrier(num_threads + 1)
+    errors = []
+    threads = [threading.Thread(target=worker, args=(game_id, team_id, writes, barrier, errors))
+               for team_id in team_ids]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    if errors:
+        raise errors[0]
+    flags, swaps = expected_rows(writes)
+    for team_id in team_ids:
+        got_flags = {f['citation_id']: f['verdict'] for f in db.get_flags(game_id, team_id)}
+        got_swaps = {s['citation_id'] for s in db.get_swaps(game_id, team_id)}
+        assert got_flags == flags, f'team {team_id}: flags differ'
+        assert got_swaps == swaps, f'team {team_id}: swaps differ'
+    assert db.get_game_version(game_id) - version_before == num_threads * writes, 'version drifted'
+
+    return num_threads * writes / elapsed
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, not {number}')
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hammer the swap/flag writes from many threads.')
+    parser.add_argument('threads', type=positive_int, nargs='?', default=32,
+                        help='concurrent writers (default: 32)')
+    parser.add_argument('writes', type=positive_int, nargs='?', default=200,
+                        help='writes per thread (default: 200)')
+    args = parser.parse_args()
+    num_threads, writes = args.threads, args.writes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, 'stress.db')
+        db.init_db()
+
+        print(f'{num_threads} threads x {writes} writes')
+        direct = run(False, num_threads, writes)
+        print(f'  direct commits: {direct:>9.0f} writes/s')
+        queued = run(True, num_threads, writes)
+        db.stop_writer()
+        stats = db.write_stats()
+        print(f'  write-behind:   {queued:>9.0f} writes/s  ({queued / direct:.1f}x)')
+        print(f"  batches {stats['batches']}, avg {stats['avg_batch']:.1f} / max {stats['max_batch']} writes, "
+              f"commit avg {stats['commit_ms_avg']:.3f} ms / max {stats['commit_ms_max']:.3f} ms, "
+              f"failed {stats['failed']}, queue depth {stats['queue_depth']}")
+        db.close_db()
+
+
+if __name__ == '__main__':
+    main()
@@ -232,6 +232,39 @@ def main():
 
     print(f"  {GREEN}OK{RESET}: naming convention check complete")
 
+    # Option IDs must be unique across the brief (game_state indexes options by id)
+    seen_option_ids = {}
+    for cid, cite_data in hallucinations.items():
+        for htype, opts in cite_data.get("options", {}).items():
+            for opt in opts:
+                oid = opt["id"]
+                if oid in seen_option_ids:
+                    print(f"  {RED}ERROR{RESET}: {oid}: duplicate option id (under {seen_option_ids[oid]} and {cid})")
+                    errors += 1
+                seen_option_ids[oid] = cid
+
+    # A replaced text region must not overlap a citation in the first paragraph
+    # containing it (game_state can't render such an option and refuses the brief)
+    for cid, cite_data in hallucinations.items():
+        for htype, opts in cite_data.get("options", {}).items():
+            for opt in opts:
+                if opt.get("original_text") is None or opt.get("replacement_text") is None:
+                    continue
+                for para in paragraphs:
+                    start = para["text"].find(opt["original_text"])
+                    if start < 0:
+                        continue
+                    end = start + len(opt["original_text"])
+                    overlapping = [c["citation_id"] for c in para.get("citations", [])
+                                   if start < c["end"] and c["start"] < end]
+                    if overlapping:
+                        print(
+                            f"  {RED}ERROR{RESET}: {opt['id']}: original_text overlaps citation(s) "
+                            f"{', '.join(overlapping)} in {para['id']}"
+                        )
+                        errors += 1
+                    break
+
     # ---------------------------------------------------------------
     # Summary
     # ---------------------------------------------------------------
@@ -10,8 +10,8 @@ const API = {
         return h;
     },
 
-    async post(url, data) {
-        const res = await fetch(url, { method: 'POST', headers: this.headers(), body: JSON.stringify(data) });
+    async post(url, data, options = {}) {
+        const res = await fetch(url, { method: 'POST', headers: this.headers(), body: JSON.stringify(data), ...options });
         return res.json();
     },
 
@@ -27,15 +27,179 @@ function escapeHtml(text) {
     return div.innerHTML;
 }
 
+/* ── Batched writes ───────────────────────────────────────────────── */
+/* Collects changes keyed by citation_id (a later change to the same citation
+   replaces the earlier one) and posts them to a batch endpoint at most
+   delayMs after the first unsent change, however fast the clicks come.
+   Batches are sent one at a time, in order. When the tab is hidden or
+   closed, whatever is left goes out at once as a keepalive request, without
+   waiting for a batch still in flight. onError(message) is called for every
+   rejected batch; the optimistic state it covered is then wrong. */
+
+class BatchQueue {
+    constructor(url, field, { delayMs = 400, onError = null } = {}) {
+        this.url = url;
+        this.field = field;
+        this.delayMs = delayMs;
+        this.onError = onError;
+        this._pending = new Map();
+        this._inflight = new Map();  // citation_id -> number of unacknowledged sends
+        this._timer = null;
+        this._sending = Promise.resolve();
+        this._rejected = 0;
+
+        window.addEventListener('pagehide', () => this.flushNow());
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'hidden') this.flushNow();
+        });
+    }
+
+    add(change) {
+        this._pending.set(change.citation_id, change);
+        if (this._timer === null) this._timer = setTimeout(() => this.flush(), this.delayMs);
+    }
+
+    /* True while a change to this citation is queued or not yet acknowledged */
+    has(citationId) {
+        return this._pending.has(citationId) || this._inflight.has(citationId);
+    }
+
+    /* Send pending changes after any batch in flight. Resolves to true if no
+       batch this queue sent has been rejected. */
+    flush() {
+        const batch = this._take();
+        if (batch) this._sending = this._sending.then(() => this._send(batch));
+        return this._sending.then(() => this._rejected === 0);
+    }
+
+    /* Send pending changes right away, for when the page may not live to
+       see the batch in flight acknowledged */
+    flushNow() {
+        const batch = this._take();
+        if (batch) this._send(batch);
+    }
+
+    _take() {
+        clearTimeout(this._timer);
+        this._timer = null;
+        if (this._pending.size === 0) return null;
+        const batch = [...this._pending.values()];
+        this._pending.clear();
+        for (const c of batch) this._inflight.set(c.citation_id, (this._inflight.get(c.citation_id) || 0) + 1);
+        return batch;
+    }
+
+    async _send(batch) {
+        let error = null;
+        try {
+            const result = await API.post(this.url, { [this.field]: batch }, { keepalive: true });
+            error = result.error || null;
+        } catch (e) {
+            error = e.message;
+        } finally {
+            for (const c of batch) {
+                const n = this._inflight.get(c.citation_id) - 1;
+                if (n > 0) this._inflight.set(c.citation_id, n);
+                else this._inflight.delete(c.citation_id);
+            }
+        }
+        if (error) {
+            this._rejected++;
+            if (this.onError) this.onError(error);
+        }
+    }
+}
+
+/* How long pages keep a save failure on screen before moving to the next phase */
+const SAVE_ERROR_MS = 4000;
+
+/* Show a save failure in the page's #saveError element */
+function showSaveError(message) {
+    const el = document.getElementById('saveError');
+    if (el) { el.textContent = message; el.classList.remove('hidden'); }
+}
+
+/* ── Team sync ──────────────────────────────────────────────────────── */
+/* Polls /api/team/progress for teammates' changes. The first call fetches the
+   full lists; after that only the delta since the last seq is transferred.
+   onChange receives { full, swaps, flags } in the delta's compact form:
+   swaps maps citation_id -> [hallucination_type, option_id] (null = removed),
+   flags maps citation_id -> verdict. With full set, anything missing from
+   swaps/flags is gone. */
+
+const TeamSync = {
+    _onChange: null,
+    _interval: null,
+    _seq: null,
+    _wantFull: false,
+    _busy: false,
+    _again: false,
+
+    start(onChange, pollMs = 3000) {
+        this._onChange = onChange;
+        this._interval = setInterval(() => this.sync(), pollMs);
+        this.sync();
+    },
+
+    stop() {
+        clearInterval(this._interval);
+        this._interval = null;
+    },
+
+    /* Fetch the full lists on the next sync, e.g. after a rejected write */
+    resync() {
+        this._wantFull = true;
+        return this.sync();
+    },
+
+    async sync() {
+        if (this._busy) {
+            this._again = true;
+            return;
+        }
+        this._busy = true;
+        try {
+            const full = this._seq === null || this._wantFull;
+            this._wantFull = false;
+            const url = full ? '/api/team/progress' : `/api/team/progress?since=${this._seq}`;
+            const data = await API.get(url);
+            if (data.error) return;
+            this._seq = data.seq;
+            if (data.delta) {
+                this._onChange({ full: false, swaps: data.delta.swaps, flags: data.delta.flags });
+            } else {
+                this._onChange({
+                    full: true,
+                    swaps: Object.fromEntries(data.swaps.map(s => [s.citation_id, [s.hallucination_type, s.option_id]])),
+                    flags: Object.fromEntries(data.flags.map(f => [f.citation_id, f.verdict]))
+                });
+            }
+        } catch (e) {
+            // Ignore sync errors; the next poll retries
+        } finally {
+            this._busy = false;
+            if (this._again) {
+                this._again = false;
+                this.sync();
+            }
+        }
+    }
+};
+
 /* ── Timer ──────────────────────────────────────────────────────────── */
 
+/* onExpire, if given, runs once each time the countdown reaches zero */
+
 const Timer = {
     _end: null,
     _interval: null,
     _displayEl: null,
+    _onExpire: null,
+    _expired: null,
 
-    init(displaySelector) {
+    init(displaySelector, onExpire = null) {
         this._displayEl = document.querySelector(displaySelector);
+        this._onExpire = onExpire;
         this._interval = setInterval(() => this._tick(), 1000);
     },
 
@@ -55,5 +219,81 @@ const Timer = {
         const secs = diff % 60;
         el.textContent = `${mins}:${secs.toString().padStart(2, '0')}`;
         el.classList.toggle('warning', diff < 60);
+
+        if (diff === 0 && this._onExpire && this._expired !== this._end) {
+            this._expired = this._end;
+            this._onExpire();
+        }
+    }
+};
+
+/* ── Phase feed ─────────────────────────────────────────────────────── */
+/* Receives /api/game/phase payloads over Server-Sent Events, and polls
+   /api/game/phase instead whenever the stream is unavailable or reconnecting.
+   EventSource cannot send the session header, so the stream is authenticated
+   by a cookie that /api/game/stream-auth sets for the stream's path only. */
+
+const PhaseFeed = {
+    _handlers: null,
+    _source: null,
+    _pollInterval: null,
+    _pollMs: 2500,
+    _started: false,
+
+    start(handlers, pollMs = 2500) {
+        this._handlers = handlers;
+        this._pollMs = pollMs;
+        this._started = true;
+        this._startPolling();
+
+        if (!window.EventSource || !API.token) return;
+        API.post('/api/game/stream-auth', {}).then(result => {
+            if (!result.error && this._started && !this._source) this._openStream();
+        }).catch(() => {
+            // Keep polling
+        });
+    },
+
+    _openStream() {
+        const source = new EventSource('/api/game/stream');
+        source.addEventListener('open', () => this._stopPolling());
+        source.addEventListener('phase', (e) => this._handlers.onPhase(JSON.parse(e.data)));
+        source.addEventListener('roster', () => {
+            if (this._handlers.onRoster) this._handlers.onRoster();
+        });
+        // Fires while reconnecting and when the server refuses the stream (e.g. 503)
+        source.addEventListener('error', () => this._startPolling());
+        this._source = source;
+    },
+
+    stop() {
+        this._started = false;
+        this._stopPolling();
+        if (this._source) {
+            this._source.close();
+            this._source = null;
+        }
+    },
+
+    _startPolling() {
+        if (this._pollInterval) return;
+        this._pollInterval = setInterval(() => this._poll(), this._pollMs);
+        this._poll();
+    },
+
+    _stopPolling() {
+        clearInterval(this._pollInterval);
+        this._pollInterval = null;
+    },
+
+    async _poll() {
+        try {
+            const data = await API.get('/api/game/phase');
+            if (data.error) return;
+            this._handlers.onPhase(data);
+            if (this._handlers.onRoster) this._handlers.onRoster();
+        } catch (e) {
+            // Ignore poll errors
+        }
     }
 };
@@ -1,5 +1,5 @@
 /* fabrication.js — Phase 1: Citation swapping */
-/* Depends on: common.js (API, escapeHtml, Timer) */
+/* Depends on: common.js (API, escapeHtml, Timer, PhaseFeed, BatchQueue, TeamSync) */
 
 let briefData = null;
 let hallucinations = null;
@@ -274,7 +274,7 @@ function selectOption(citationId, type, optionId) {
     renderBrief();
 }
 
-async function confirmSwap(citationId) {
+function confirmSwap(citationId) {
     // Get selected option
     const typeSelect = document.getElementById('typeSelect');
     const type = typeSelect ? typeSelect.value : '';
@@ -296,32 +296,58 @@ async function confirmSwap(citationId) {
 
     if (!optionId) return;
 
-    const result = await API.post('/api/citation/swap', {
-        citation_id: citationId,
-        hallucination_type: type,
-        option_id: optionId
-    });
+    // Show the swap right away; the queue sends it with any other quick changes
+    currentSwaps[citationId] = { hallucination_type: type, option_id: optionId };
+    swapQueue.add({ citation_id: citationId, hallucination_type: type, option_id: optionId });
+    pendingOption = null;
+    previewHighlight = null;
+    renderBrief();
+    renderSidePanel(citationId);
+    updateSwapCount();
+}
 
-    if (result.ok) {
-        currentSwaps[citationId] = { hallucination_type: type, option_id: optionId };
-        pendingOption = null;
-        previewHighlight = null;
-        renderBrief();
-        renderSidePanel(citationId);
-        updateSwapCount();
-    }
+function undoSwap(citationId) {
+    delete currentSwaps[citationId];
+    swapQueue.add({ citation_id: citationId, unswap: true });
+    pendingOption = null;
+    previewHighlight = null;
+    renderBrief();
+    renderSidePanel(citationId);
+    updateSwapCount();
 }
 
-async function undoSwap(citationId) {
-    const result = await API.post('/api/citation/unswap', { citation_id: citationId });
-    if (result.ok) {
-        delete currentSwaps[citationId];
-        pendingOption = null;
-        previewHighlight = null;
-        renderBrief();
-        renderSidePanel(citationId);
-        updateSwapCount();
+// A rejected batch means our optimistic state is wrong: say so and refetch what the server stored
+const swapQueue = new BatchQueue('/api/citation/swaps/batch', 'changes', {
+    onError(message) {
+        showSaveError(`Some changes were not saved: ${message}`);
+        TeamSync.resync();
+    }
+});
+
+function mergeSwaps({ full, swaps }) {
+    // Apply teammates' changes from TeamSync; our own unacknowledged changes win
+    const next = full ? {} : { ...currentSwaps };
+    for (const [citationId, swap] of Object.entries(swaps)) {
+        if (swapQueue.has(citationId)) continue;
+        if (swap) next[citationId] = { hallucination_type: swap[0], option_id: swap[1] };
+        else delete next[citationId];
     }
+    if (full) {
+        for (const citationId of Object.keys(currentSwaps)) {
+            if (swapQueue.has(citationId)) next[citationId] = currentSwaps[citationId];
+        }
+    }
+
+    const changed = new Set([...Object.keys(next), ...Object.keys(currentSwaps)].filter(citationId => {
+        const a = next[citationId], b = currentSwaps[citationId];
+        return !a || !b || a.hallucination_type !== b.hallucination_type || a.option_id !== b.option_id;
+    }));
+    if (changed.size === 0) return;
+
+    currentSwaps = next;
+    renderBrief();
+    if (selectedCitation && changed.has(selectedCitation)) renderSidePanel(selectedCitation);
+    updateSwapCount();
 }
 
 function updateSwapCount() {
@@ -334,13 +360,14 @@ function updateSwapCount() {
 // ── Timer & Polling ─────────────────────────────────────────────────────
 
 function startTimer() {
-    Timer.init('#timerDisplay');
+    // Send last-second changes as time runs out rather than after the phase ends
+    Timer.init('#timerDisplay', () => swapQueue.flush());
 }
 
 function startPolling() {
-    setInterval(async () => {
-        try {
-            const data = await API.get('/api/game/phase');
+    TeamSync.start(mergeSwaps);
+    PhaseFeed.start({
+        onPhase(data) {
             Timer.setEnd(data.timer_end);
 
             if (data.team_name) {
@@ -348,16 +375,13 @@ function startPolling() {
             }
 
             if (data.phase === 'verification') {
-                window.location.href = `/game/${API.gameId}`;
+                PhaseFeed.stop();
+                TeamSync.stop();
+                // Leave a rejected last batch's message up long enough to read
+                swapQueue.flush().then(ok => {
+                    setTimeout(() => { window.location.href = `/game/${API.gameId}`; }, ok ? 0 : SAVE_ERROR_MS);
+                });
             }
-        } catch (e) {}
-    }, 2500);
-
-    // Initial phase fetch
-    API.get('/api/game/phase').then(data => {
-        Timer.setEnd(data.timer_end);
-        if (data.team_name) {
-            document.getElementById('teamBadge').textContent = data.team_name;
         }
     });
 }
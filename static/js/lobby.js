@@ -1,5 +1,5 @@
 /* lobby.js — Join game and wait for start */
-/* Depends on: common.js (API, escapeHtml) */
+/* Depends on: common.js (API, escapeHtml, PhaseFeed) */
 
 async function joinGame() {
     const code = document.getElementById('gameCode').value.trim().toUpperCase();
@@ -39,33 +39,29 @@ function showWaiting() {
     document.getElementById('waitingSection').classList.remove('hidden');
 }
 
-let pollInterval;
-
 function startPolling() {
-    pollInterval = setInterval(pollPhase, 2500);
-    pollPhase();
+    PhaseFeed.start({ onPhase: handlePhase, onRoster: refreshTeams });
 }
 
-async function pollPhase() {
-    if (!API.token) return;
-
-    try {
-        const phase = await API.get('/api/game/phase');
+function handlePhase(phase) {
+    if (phase.team_id) {
+        currentTeamId = phase.team_id;
+    }
+    if (phase.team_name) {
+        document.getElementById('waitingTeamInfo').innerHTML =
+            `<span class="team-badge">${phase.team_name}</span>`;
+    }
 
-        if (phase.team_id) {
-            currentTeamId = phase.team_id;
-        }
-        if (phase.team_name) {
-            document.getElementById('waitingTeamInfo').innerHTML =
-                `<span class="team-badge">${phase.team_name}</span>`;
-        }
+    if (phase.phase !== 'lobby') {
+        PhaseFeed.stop();
+        window.location.href = `/game/${API.gameId}`;
+    }
+}
 
-        if (phase.phase !== 'lobby') {
-            clearInterval(pollInterval);
-            window.location.href = `/game/${API.gameId}`;
-        }
+async function refreshTeams() {
+    if (!API.token) return;
 
-        // Also update team list
+    try {
         const status = await API.get('/api/game/status');
         if (status.teams) {
             renderTeams(status.teams);
@@ -105,10 +101,7 @@ async function chooseTeam(teamId) {
         currentTeamId = teamId;
         hideWaitingError();
         // Re-fetch status to update the team list immediately
-        const status = await API.get('/api/game/status');
-        if (status.teams) {
-            renderTeams(status.teams);
-        }
+        await refreshTeams();
     } catch (e) {
         showWaitingError('Failed to join team. Please try again.');
     }
@@ -1,5 +1,5 @@
 /* verification.js — Phase 2: Flag citations as real or fake */
-/* Depends on: common.js (API, escapeHtml, Timer) */
+/* Depends on: common.js (API, escapeHtml, Timer, PhaseFeed, BatchQueue, TeamSync) */
 
 let briefData = null;
 let currentFlags = {};  // citation_id -> verdict
@@ -138,14 +138,43 @@ function renderSidePanel(citationId) {
     panel.innerHTML = html;
 }
 
-async function flagCitation(citationId, verdict) {
-    const result = await API.post('/api/citation/flag', { citation_id: citationId, verdict: verdict });
-    if (result.ok) {
-        currentFlags[citationId] = verdict;
-        renderBrief();
-        renderSidePanel(citationId);
-        updateReviewCount();
+// A rejected batch means our optimistic state is wrong: say so and refetch what the server stored
+const flagQueue = new BatchQueue('/api/citation/flags/batch', 'flags', {
+    onError(message) {
+        showSaveError(`Some changes were not saved: ${message}`);
+        TeamSync.resync();
+    }
+});
+
+function flagCitation(citationId, verdict) {
+    // Show the verdict right away; the queue sends it with any other quick clicks
+    currentFlags[citationId] = verdict;
+    flagQueue.add({ citation_id: citationId, verdict: verdict });
+    renderBrief();
+    renderSidePanel(citationId);
+    updateReviewCount();
+}
+
+function mergeFlags({ full, flags }) {
+    // Apply teammates' verdicts from TeamSync; our own unacknowledged ones win
+    const next = full ? {} : { ...currentFlags };
+    for (const [citationId, verdict] of Object.entries(flags)) {
+        if (!flagQueue.has(citationId)) next[citationId] = verdict;
+    }
+    if (full) {
+        for (const citationId of Object.keys(currentFlags)) {
+            if (flagQueue.has(citationId)) next[citationId] = currentFlags[citationId];
+        }
     }
+
+    const changed = new Set([...Object.keys(next), ...Object.keys(currentFlags)]
+        .filter(citationId => next[citationId] !== currentFlags[citationId]));
+    if (changed.size === 0) return;
+
+    currentFlags = next;
+    renderBrief();
+    if (selectedCitation && changed.has(selectedCitation)) renderSidePanel(selectedCitation);
+    updateReviewCount();
 }
 
 function updateReviewCount() {
@@ -158,7 +187,8 @@ function updateReviewCount() {
 // ── Timer & Polling ─────────────────────────────────────────────────────
 
 function startTimer() {
-    Timer.init('#timerDisplay');
+    // Send last-second changes as time runs out rather than after the phase ends
+    Timer.init('#timerDisplay', () => flagQueue.flush());
 }
 
 function startPolling() {
@@ -176,21 +206,21 @@ function startPolling() {
         }
 
         if (data.phase === 'reveal') {
-            window.location.href = `/game/${API.gameId}`;
+            PhaseFeed.stop();
+            TeamSync.stop();
+            // Leave a rejected last batch's message up long enough to read
+            flagQueue.flush().then(ok => {
+                setTimeout(() => { window.location.href = `/game/${API.gameId}`; }, ok ? 0 : SAVE_ERROR_MS);
+            });
         }
     }
 
-    setInterval(async () => {
-        try {
-            const data = await API.get('/api/game/phase');
-            handlePhaseData(data);
-        } catch (e) {}
-    }, 2500);
-
-    API.get('/api/game/phase').then(handlePhaseData);
+    TeamSync.start(mergeFlags);
+    PhaseFeed.start({ onPhase: handlePhaseData });
 }
 
 async function finishSolitaire() {
+    await flagQueue.flush();
     const result = await API.post('/api/solitaire/reveal', {});
     if (result.ok) {
         window.location.href = `/game/${API.gameId}`;